@@ -0,0 +1 @@
+"""Benchmark suite (asv-style) for the data, statistics and modelling hot paths."""
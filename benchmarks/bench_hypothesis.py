@@ -0,0 +1,27 @@
+"""Hypothesis-testing benchmarks: summary backend, chi-squared and the batch runner."""
+
+from src.stats import hypothesis_testing as ht
+from src.stats.batch_testing import HypothesisSpec, run_hypothesis_batch
+from .common import ROWS, frame
+
+
+class HypothesisSuite:
+    params = ROWS
+    param_names = ['n_rows']
+
+    def setup(self, n_rows):
+        self.df = frame(n_rows)
+
+    def time_anova_postal_code(self, n_rows):
+        ht.test_hypothesis(self.df, 'PostalCode', 'TotalClaims', tukey='summary')
+
+    def time_ttest_gender(self, n_rows):
+        ht.test_hypothesis(self.df[self.df['Gender'].isin(['Male', 'Female'])], 'Gender', 'TotalClaims')
+
+    def time_chi2_province(self, n_rows):
+        ht.test_hypothesis(self.df, 'Province', 'TotalClaims', is_categorical=True)
+
+    def time_batch(self, n_rows):
+        specs = [HypothesisSpec(col, metric) for col in ('Province', 'PostalCode', 'Gender')
+                 for metric in ('claims', 'margin', 'frequency')]
+        run_hypothesis_batch(specs, df=self.df)
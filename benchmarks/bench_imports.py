@@ -0,0 +1,33 @@
+"""Import-time benchmark: package import cost with pandas already loaded."""
+
+import subprocess
+import sys
+
+# pandas is imported first so the measurement covers only this package's own import cost.
+PROBE = """
+import time
+import pandas
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+
+def _import_seconds(module: str, repeat: int = 3) -> float:
+    """Best import time of a module over fresh interpreters."""
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', PROBE.format(module=module)], capture_output=True,
+                                text=True, check=True).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return min(timings)
+
+
+class ImportSuite:
+    def track_import_data_loader(self):
+        return _import_seconds('src.utils.data_loader')
+    track_import_data_loader.unit = 'seconds'
+
+    def track_import_package(self):
+        return _import_seconds('src')
+    track_import_package.unit = 'seconds'
@@ -0,0 +1,36 @@
+"""Loader benchmarks: text parse, columnar cache and projection."""
+
+import shutil
+import tempfile
+from src.utils.data_loader import load_insurance_data, iter_insurance_chunks
+from .common import ROWS, data_file
+
+
+class LoaderSuite:
+    params = ROWS
+    param_names = ['n_rows']
+
+    def setup(self, n_rows):
+        self.path = data_file(n_rows)
+        self.cache_dir = tempfile.mkdtemp()
+        load_insurance_data(self.path, cache_dir=self.cache_dir)
+
+    def teardown(self, n_rows):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def time_load_text(self, n_rows):
+        load_insurance_data(self.path, use_cache=False)
+
+    def time_load_cached(self, n_rows):
+        load_insurance_data(self.path, cache_dir=self.cache_dir)
+
+    def time_load_cached_projection(self, n_rows):
+        load_insurance_data(self.path, columns=['Province', 'TotalPremium', 'TotalClaims'],
+                            filters=[('Province', '==', 'Gauteng')], cache_dir=self.cache_dir)
+
+    def time_iter_chunks(self, n_rows):
+        for _ in iter_insurance_chunks(self.path, columns=['TotalPremium', 'TotalClaims'], use_cache=False):
+            pass
+
+    def peakmem_load_text(self, n_rows):
+        load_insurance_data(self.path, use_cache=False)
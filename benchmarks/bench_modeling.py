@@ -0,0 +1,43 @@
+"""Model-training benchmarks on the sparse design matrix."""
+
+from sklearn.base import clone
+from src.models.pricing import FrequencySeverityModel
+from src.utils.data_preprocessing import DataPreprocessor
+from src.utils.modeling_utils import ModelEvaluator
+from .common import ROWS, frame
+from .bench_preprocessing import CATEGORICAL_COLS
+
+FEATURES = [*CATEGORICAL_COLS, 'PostalCode', 'SumInsured', 'CalculatedPremiumPerTerm', 'RegistrationYear', 'kilowatts']
+
+
+class ModelingSuite:
+    params = ROWS
+    param_names = ['n_rows']
+
+    def setup(self, n_rows):
+        df = frame(n_rows)
+        self.X, _ = DataPreprocessor(CATEGORICAL_COLS).fit(df[FEATURES]).transform_sparse(df[FEATURES])
+        claims = df['TotalClaims'].to_numpy()
+        self.has_claim = (claims > 0).astype(int)
+        self.X_severity, self.y_severity = self.X[claims > 0], claims[claims > 0]
+        self.claims = claims
+        self.evaluator = ModelEvaluator(n_jobs=1)
+        self.pricing = FrequencySeverityModel(n_jobs=1).fit(self.X, claims)
+
+    def time_fit_xgboost_probability(self, n_rows):
+        clone(self.evaluator.probability_models['XGBoost']).fit(self.X, self.has_claim)
+
+    def time_fit_linear_severity(self, n_rows):
+        clone(self.evaluator.severity_models['LinearRegression']).fit(self.X_severity, self.y_severity)
+
+    def time_fit_xgboost_severity(self, n_rows):
+        clone(self.evaluator.severity_models['XGBoost']).fit(self.X_severity, self.y_severity)
+
+    def peakmem_fit_xgboost_probability(self, n_rows):
+        clone(self.evaluator.probability_models['XGBoost']).fit(self.X, self.has_claim)
+
+    def time_fit_frequency_severity(self, n_rows):
+        FrequencySeverityModel(n_jobs=1).fit(self.X, self.claims)
+
+    def time_predict_premium_book(self, n_rows):
+        self.pricing.predict_premium(self.X)
@@ -0,0 +1,27 @@
+"""Preprocessing benchmarks: fit, dense and sparse transform."""
+
+from src.utils.data_preprocessing import DataPreprocessor
+from .common import ROWS, frame
+
+CATEGORICAL_COLS = ['Province', 'VehicleType', 'CoverType', 'Gender', 'make']
+
+
+class PreprocessingSuite:
+    params = ROWS
+    param_names = ['n_rows']
+
+    def setup(self, n_rows):
+        self.df = frame(n_rows)
+        self.preprocessor = DataPreprocessor(CATEGORICAL_COLS).fit(self.df)
+
+    def time_fit(self, n_rows):
+        DataPreprocessor(CATEGORICAL_COLS).fit(self.df)
+
+    def time_transform(self, n_rows):
+        self.preprocessor.transform(self.df)
+
+    def time_transform_sparse(self, n_rows):
+        self.preprocessor.transform_sparse(self.df)
+
+    def peakmem_transform_sparse(self, n_rows):
+        self.preprocessor.transform_sparse(self.df)
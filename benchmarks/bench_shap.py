@@ -0,0 +1,19 @@
+"""SHAP benchmarks on a fitted XGBoost claim-probability model."""
+
+from src.utils.model_interpretation import fast_shap_values
+from .bench_modeling import ModelingSuite
+from .common import ROWS
+
+
+class ShapSuite:
+    params = ROWS
+    param_names = ['n_rows']
+
+    def setup(self, n_rows):
+        modeling = ModelingSuite()
+        modeling.setup(n_rows)
+        self.X = modeling.X
+        self.model = modeling.evaluator.probability_models['XGBoost'].fit(self.X, modeling.has_claim)
+
+    def time_fast_shap_1000_rows(self, n_rows):
+        fast_shap_values(self.model, self.X, self.X, n_explain=1000)
@@ -0,0 +1,26 @@
+"""Shared synthetic datasets for the benchmarks."""
+
+import os
+import tempfile
+from src.utils.synthetic import generate_insurance_data, write_insurance_data
+
+# Row counts benchmarked by default; override with BENCHMARK_ROWS="10000,1000000".
+ROWS = [int(n) for n in os.getenv('BENCHMARK_ROWS', '100000').split(',')]
+
+_FRAMES = {}
+
+
+def data_file(n_rows: int) -> str:
+    """Path of a synthetic pipe-delimited file with n_rows rows, written once per machine."""
+    path = os.path.join(tempfile.gettempdir(), 'insurance-benchmarks', f'insurance_data-{n_rows}.txt')
+    if not os.path.exists(path):
+        write_insurance_data(path + '.tmp', n_rows, random_state=0)
+        os.replace(path + '.tmp', path)
+    return path
+
+
+def frame(n_rows: int):
+    """Typed synthetic frame with n_rows rows, generated once per process; callers must not mutate it."""
+    if n_rows not in _FRAMES:
+        _FRAMES[n_rows] = generate_insurance_data(n_rows, random_state=0)
+    return _FRAMES[n_rows]
@@ -0,0 +1,33 @@
+"""Render the EDA report figures headlessly into plots/.
+
+Usage (from the repository root):
+    python -m scripts.render_eda_report --out-dir plots --n-jobs 4
+    python -m scripts.render_eda_report --cube-only   # segment figures from the cached cube, no row load
+"""
+
+import argparse
+from src.core.cube import load_segment_cube
+from src.services.report import generate_eda_report
+from src.utils.data_loader import load_insurance_data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Render the EDA report figures.')
+    parser.add_argument('--data-path', help='Source file; defaults to DATA_PATH from .env')
+    parser.add_argument('--out-dir', default='plots', help='Directory the figures are written to')
+    parser.add_argument('--n-jobs', type=int, default=-1, help='Rendering processes')
+    parser.add_argument('--dpi', type=int, default=100, help='Output resolution')
+    parser.add_argument('--cube-only', action='store_true',
+                        help='Only draw the segment figures, from the cached segment cube')
+    args = parser.parse_args(argv)
+
+    cube = load_segment_cube(args.data_path)
+    df = None if args.cube_only else load_insurance_data(args.data_path)
+    report = generate_eda_report(df, cube, out_dir=args.out_dir, n_jobs=args.n_jobs, dpi=args.dpi)
+    for record in report.itertuples():
+        print(f'{record.render_s:8.2f}s  {record.path}')
+    print(f'{len(report)} figures written to {args.out_dir}')
+
+
+if __name__ == '__main__':
+    main()
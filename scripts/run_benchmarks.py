@@ -0,0 +1,121 @@
+"""Run the asv-style benchmarks in-process and compare them with a stored baseline.
+
+Discovers classes in benchmarks/bench_*.py, calls setup once per parameter, times
+each ``time_*`` method (best of --repeat runs), records the peak RSS growth of
+each ``peakmem_*`` method and the value returned by each ``track_*`` method, then
+calls teardown. The same files also run under ``asv run``.
+
+Usage (from the repository root):
+    python -m scripts.run_benchmarks                       # compare with benchmarks/baseline.json
+    python -m scripts.run_benchmarks --save-baseline       # refresh the baseline
+    BENCHMARK_ROWS=1000000 python -m scripts.run_benchmarks --filter Loader
+"""
+
+import argparse
+import importlib
+import inspect
+import json
+import os
+import pkgutil
+import platform
+import sys
+import time
+import benchmarks
+from src.utils.profiling import PeakMemorySampler
+
+BASELINE_PATH = os.path.join(os.path.dirname(benchmarks.__file__), 'baseline.json')
+
+
+def _suites(pattern):
+    for module_info in pkgutil.iter_modules(benchmarks.__path__):
+        if not module_info.name.startswith('bench_'):
+            continue
+        module = importlib.import_module(f'benchmarks.{module_info.name}')
+        for name, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ == module.__name__ and name.endswith('Suite') and (not pattern or pattern in name):
+                yield name, cls
+
+
+def run(pattern=None, repeat=3):
+    """Run every matching benchmark and return {name: {'kind', 'value'}}."""
+    results = {}
+    for suite_name, cls in _suites(pattern):
+        for param in getattr(cls, 'params', [None]):
+            suite = cls()
+            args = () if param is None else (param,)
+            if hasattr(suite, 'setup'):
+                suite.setup(*args)
+            for method_name in sorted(dir(suite)):
+                if not method_name.startswith(('time_', 'peakmem_', 'track_')):
+                    continue
+                method = getattr(suite, method_name)
+                key = f'{suite_name}.{method_name}' + ('' if param is None else f'({param})')
+                if method_name.startswith('time_'):
+                    timings = []
+                    for _ in range(repeat):
+                        start = time.perf_counter()
+                        method(*args)
+                        timings.append(time.perf_counter() - start)
+                    results[key] = {'kind': 'time_s', 'value': min(timings)}
+                elif method_name.startswith('track_'):
+                    results[key] = {'kind': getattr(method, 'unit', 'track'), 'value': float(method(*args))}
+                else:
+                    with PeakMemorySampler(interval=0.005) as memory:
+                        method(*args)
+                    peak = memory.peak_delta_bytes
+                    results[key] = {'kind': 'peakmem_mb', 'value': None if peak is None else peak / 2 ** 20}
+                print(f"{key:<70}{results[key]['value']:>12.4f} {results[key]['kind']}", flush=True)
+            if hasattr(suite, 'teardown'):
+                suite.teardown(*args)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Names of benchmarks slower (or bigger) than tolerance x the baseline."""
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get('results', {}).get(key)
+        if not reference or reference['value'] in (None, 0) or result['value'] is None:
+            continue
+        ratio = result['value'] / reference['value']
+        # Ignore memory noise below a few megabytes.
+        if result['kind'] == 'peakmem_mb' and result['value'] - reference['value'] < 8:
+            continue
+        if ratio > tolerance:
+            regressions.append(f'{key}: {reference["value"]:.4f} -> {result["value"]:.4f} ({ratio:.2f}x)')
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the benchmark suite.')
+    parser.add_argument('--filter', help='Only run suites whose class name contains this text')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per time_ benchmark (best is kept)')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='Baseline results file')
+    parser.add_argument('--tolerance', type=float, default=1.5, help='Allowed slowdown factor before failing')
+    parser.add_argument('--save-baseline', action='store_true', help='Write the results as the new baseline')
+    parser.add_argument('--output', help='Also write the results to this JSON file')
+    args = parser.parse_args(argv)
+
+    results = run(args.filter, args.repeat)
+    document = {'python': platform.python_version(), 'machine': platform.machine(),
+                'cpu_count': os.cpu_count(), 'results': results}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=2, sort_keys=True)
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=2, sort_keys=True)
+        print(f'Baseline written to {args.baseline}')
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f'No baseline at {args.baseline}; run with --save-baseline first')
+        return 0
+    with open(args.baseline, encoding='utf-8') as f:
+        regressions = compare(results, json.load(f), args.tolerance)
+    for line in regressions:
+        print(f'REGRESSION {line}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,39 @@
+"""Run the instrumented modelling pipeline and write a JSON run report.
+
+Usage (from the repository root):
+    python -m scripts.run_pipeline --sample-rows 100000 --profile train --report reports/pipeline_run.json
+"""
+
+import argparse
+from src.services.pipeline import build_insurance_pipeline
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the instrumented modelling pipeline.')
+    parser.add_argument('--data-path', help='Source file; defaults to DATA_PATH from .env')
+    parser.add_argument('--sample-rows', type=int, help='Random sample of rows to run on')
+    parser.add_argument('--models', nargs='+', help='Model names to train, e.g. XGBoost LinearRegression')
+    parser.add_argument('--n-jobs', type=int, default=-1, help='Core budget for model training')
+    parser.add_argument('--shap-rows', type=int, default=500, help='Rows to explain; 0 skips the SHAP stage')
+    parser.add_argument('--profile', nargs='+', default=[], metavar='STAGE', help='Stages to run under cProfile')
+    parser.add_argument('--tracemalloc', nargs='+', default=[], metavar='STAGE',
+                        help='Stages to run under tracemalloc')
+    parser.add_argument('--profile-dir', default='reports/profiles', help='Directory for .prof files')
+    parser.add_argument('--report', default='reports/pipeline_run.json', help='Path of the JSON run report')
+    args = parser.parse_args(argv)
+
+    pipeline = build_insurance_pipeline(args.data_path, args.sample_rows, models=args.models,
+                                        n_jobs=args.n_jobs, shap_rows=args.shap_rows or None)
+    _, report = pipeline.run(profile=args.profile, trace_memory=args.tracemalloc,
+                             report_path=args.report, profile_dir=args.profile_dir)
+
+    print(f"{'stage':<20}{'wall s':>10}{'cpu s':>10}{'peak +MB':>10}{'rows in':>10}{'rows out':>10}{'out MB':>10}")
+    for record in report['stages']:
+        cells = [record['wall_s'], record['cpu_s'], record['peak_rss_delta_mb'],
+                 record['rows_in'], record['rows_out'], record['output_mb']]
+        print(f"{record['stage']:<20}" + ''.join(f"{'-' if c is None else round(c, 2):>10}" for c in cells))
+    print(f"Total {report['total_wall_s']:.2f}s; report written to {args.report}")
+
+
+if __name__ == '__main__':
+    main()
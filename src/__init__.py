@@ -1,3 +1,22 @@
-"""Package initialization file."""
-from .utils import data_loader, visualizations
-from .core import eda
+"""Package initialization file.
+
+Submodules are imported on first attribute access, so ``import src`` stays
+light and plotting or modelling dependencies load only when used.
+"""
+import importlib
+
+_SUBMODULES = {
+    'data_loader': '.utils.data_loader',
+    'visualizations': '.utils.visualizations',
+    'eda': '.core.eda',
+}
+
+__all__ = list(_SUBMODULES)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        module = importlib.import_module(_SUBMODULES[name], __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,2 +1,5 @@
 """Package initialization file."""
 from .eda import InsuranceEDA
+from .cube import SegmentCube, load_segment_cube
+from .incremental import MonthlyStore
+from .outliers import QuantileSketch, StreamingOutlierDetector, detect_outliers_streaming
@@ -0,0 +1,290 @@
+"""Materialised aggregate cube of insurance measures over common segment dimensions."""
+
+import os
+from typing import Dict, Iterable, Optional, Sequence, Union
+import pandas as pd
+from dotenv import load_dotenv
+from ..utils.data_loader import get_cache_path, iter_insurance_chunks
+
+CUBE_DIMENSIONS = ('Province', 'PostalCode', 'Gender', 'VehicleType', 'make', 'CoverType', 'TransactionMonth')
+
+# Bump whenever CUBE_MEASURES or their definitions change so persisted cubes are rebuilt.
+CUBE_VERSION = 2
+
+# Additive measures: any roll-up is a plain sum over cube cells.
+CUBE_MEASURES = ('policy_count', 'claim_count', 'premium_sum', 'claims_sum', 'severity_sum',
+                 'premium_sumsq', 'claims_sumsq', 'severity_sumsq', 'margin_sumsq')
+
+
+def _cell_measures(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Row-level measure columns whose sums make up the cube.
+
+    Only rows with both TotalPremium and TotalClaims count, so every sum,
+    variance and per-policy ratio uses the same n.
+    """
+    premium = df['TotalPremium'].astype('float64')
+    claims = df['TotalClaims'].astype('float64')
+    valid = premium.notna() & claims.notna()
+    premium, claims = premium.where(valid, 0.0), claims.where(valid, 0.0)
+    has_claim = claims > 0
+    margin = premium - claims
+    return pd.DataFrame({
+        'policy_count': valid.astype('int64'),
+        'claim_count': has_claim.astype('int64'),
+        'premium_sum': premium,
+        'claims_sum': claims,
+        'severity_sum': claims.where(has_claim, 0.0),
+        'premium_sumsq': premium ** 2,
+        'claims_sumsq': claims ** 2,
+        'severity_sumsq': claims.where(has_claim, 0.0) ** 2,
+        'margin_sumsq': margin ** 2,
+    }, index=df.index)
+
+
+def _aggregate(df: pd.DataFrame, dimensions: Sequence[str]) -> pd.DataFrame:
+    """Sum the measures of one frame per combination of dimension values."""
+    missing = [col for col in (*dimensions, 'TotalPremium', 'TotalClaims') if col not in df.columns]
+    if missing:
+        raise ValueError(f"Columns not found in dataset: {missing}")
+    keys = {}
+    for col in dimensions:
+        values = df[col]
+        if col == 'TransactionMonth':
+            values = pd.to_datetime(values, errors='coerce').dt.to_period('M').dt.to_timestamp()
+        elif isinstance(values.dtype, pd.CategoricalDtype):
+            # Chunks carry different category sets, so group on plain values.
+            values = values.astype(values.cat.categories.dtype)
+        keys[col] = values
+    measures = _cell_measures(df)
+    return measures.groupby([keys[col] for col in dimensions], dropna=False).sum().reset_index()
+
+
+class SegmentCube:
+    """
+    Additive aggregates of policies, claims and premium per dimension combination.
+
+    Roll-ups, loss ratios and segment summaries are answered from the cells,
+    so they cost time proportional to the number of cells rather than rows.
+    Sums of squares allow exact per-segment variances.
+    """
+
+    def __init__(self, cells: pd.DataFrame, dimensions: Sequence[str] = CUBE_DIMENSIONS):
+        self.dimensions = list(dimensions)
+        self.cells = cells
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, dimensions: Sequence[str] = CUBE_DIMENSIONS) -> 'SegmentCube':
+        """Build a cube from an in-memory frame."""
+        return cls.from_chunks([df], dimensions)
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[pd.DataFrame], dimensions: Sequence[str] = CUBE_DIMENSIONS) -> 'SegmentCube':
+        """
+        Build a cube by aggregating chunks one at a time.
+
+        Args:
+            chunks (Iterable[pd.DataFrame]): Frames with the dimension columns, TotalPremium and TotalClaims.
+            dimensions (Sequence[str]): Dimensions to keep in the cube.
+
+        Returns:
+            SegmentCube: The cube.
+        """
+        dimensions = list(dimensions)
+        partials = [_aggregate(chunk, dimensions) for chunk in chunks]
+        if not partials:
+            raise ValueError("No data to aggregate")
+        cells = partials[0] if len(partials) == 1 else pd.concat(partials, ignore_index=True)
+        return cls(cls._compact(cells, dimensions), dimensions)
+
+    @staticmethod
+    def _compact(cells: pd.DataFrame, dimensions: Sequence[str]) -> pd.DataFrame:
+        """Merge duplicate cells and store string dimensions as categoricals."""
+        cells = cells.groupby(list(dimensions), dropna=False, observed=True)[list(CUBE_MEASURES)].sum().reset_index()
+        for col in dimensions:
+            if cells[col].dtype == object or pd.api.types.is_string_dtype(cells[col]):
+                cells[col] = cells[col].astype('category')
+        return cells
+
+    def merge(self, other: 'SegmentCube') -> 'SegmentCube':
+        """Combine two cubes over the same dimensions, e.g. an existing cube and a delta."""
+        if other.dimensions != self.dimensions:
+            raise ValueError("Cubes must have the same dimensions")
+        cells = pd.concat([self.cells, other.cells], ignore_index=True)
+        return SegmentCube(self._compact(cells, self.dimensions), self.dimensions)
+
+    def rollup(self, by: Optional[Sequence[str]] = None, include_variance: bool = False) -> pd.DataFrame:
+        """
+        Aggregate the cube to a coarser set of dimensions.
+
+        Args:
+            by (Sequence[str], optional): Dimensions to keep; None rolls up to a single total row.
+            include_variance (bool): Add sample variances of premium, claims and margin.
+
+        Returns:
+            pd.DataFrame: Measures plus loss_ratio, claim_frequency, claim_severity and margin per group.
+        """
+        by = [by] if isinstance(by, str) else list(by or [])
+        unknown = [col for col in by if col not in self.dimensions]
+        if unknown:
+            raise ValueError(f"Dimensions not in cube: {unknown}")
+        measures = self.cells[list(CUBE_MEASURES)]
+        if by:
+            totals = measures.groupby([self.cells[col] for col in by], dropna=False, observed=True).sum()
+        else:
+            totals = measures.sum().to_frame().T
+        count = totals['policy_count']
+        claims = totals['claim_count']
+        totals['loss_ratio'] = totals['claims_sum'] / totals['premium_sum'].where(totals['premium_sum'] != 0)
+        totals['claim_frequency'] = claims / count.where(count > 0)
+        totals['claim_severity'] = totals['severity_sum'] / claims.where(claims > 0)
+        totals['margin'] = totals['premium_sum'] - totals['claims_sum']
+        if include_variance:
+            dof = (count - 1).where(count > 1)
+            for name, total, sumsq in (('premium', totals['premium_sum'], totals['premium_sumsq']),
+                                       ('claims', totals['claims_sum'], totals['claims_sumsq']),
+                                       ('margin', totals['margin'], totals['margin_sumsq'])):
+                totals[f'{name}_var'] = (sumsq - total ** 2 / count) / dof
+        return totals.reset_index() if by else totals.reset_index(drop=True)
+
+    def loss_ratio(self, by: Optional[Sequence[str]] = None) -> Union[pd.Series, float]:
+        """Loss ratio (claims sum / premium sum) per group, or the overall float if by is None."""
+        ratio = self.rollup(by)
+        if not by:
+            return ratio['loss_ratio'].iloc[0]
+        by = [by] if isinstance(by, str) else list(by)
+        return ratio.set_index(by)['loss_ratio']
+
+    def drop_months(self, months: Iterable) -> 'SegmentCube':
+        """Return the cube without the cells of the given transaction months."""
+        if 'TransactionMonth' not in self.dimensions:
+            raise ValueError("Cube has no TransactionMonth dimension")
+        months = pd.to_datetime(pd.Index(list(months)))
+        keep = ~self.cells['TransactionMonth'].isin(months)
+        return SegmentCube(self.cells[keep].reset_index(drop=True), self.dimensions)
+
+    def metrics(self) -> Dict:
+        """Claim frequency, severity and margin of the whole cube, as calculate_metrics returns them."""
+        total = self.rollup().iloc[0]
+        return {'claim_frequency': total['claim_frequency'], 'claim_severity': total['claim_severity'],
+                'margin': total['margin']}
+
+    def moments(self, group_col: str, metric: str = 'claims') -> pd.DataFrame:
+        """
+        Per-group n, mean and variance of a metric, in the layout of group_moments.
+
+        Args:
+            group_col (str): Cube dimension to group by.
+            metric (str): 'claims', 'premium', 'margin', 'severity' (claims of claimants)
+                or 'frequency' (claim indicator).
+
+        Returns:
+            pd.DataFrame: Columns n, mean and var (ddof=1), indexed by group.
+        """
+        totals = self.rollup([group_col]).set_index(group_col)
+        if metric == 'frequency':
+            n = totals['policy_count']
+            total = sumsq = totals['claim_count']
+        elif metric == 'severity':
+            n, total, sumsq = totals['claim_count'], totals['severity_sum'], totals['severity_sumsq']
+        elif metric in ('claims', 'premium', 'margin'):
+            n = totals['policy_count']
+            total = totals['margin'] if metric == 'margin' else totals[f'{metric}_sum']
+            sumsq = totals[f'{metric}_sumsq']
+        else:
+            raise ValueError("metric must be 'claims', 'premium', 'margin', 'severity' or 'frequency'")
+        n = n.astype('int64')
+        mean = total / n.where(n > 0)
+        var = (sumsq - total * mean) / (n - 1).where(n > 1)
+        moments = pd.DataFrame({'n': n, 'mean': mean, 'var': var.clip(lower=0)})
+        return moments[moments['n'] > 0]
+
+    def claim_contingency(self, group_col: str) -> pd.DataFrame:
+        """Group x (no claim, claim) policy counts, in the layout of claim_contingency."""
+        totals = self.rollup([group_col]).set_index(group_col)
+        table = pd.DataFrame({False: totals['policy_count'] - totals['claim_count'], True: totals['claim_count']})
+        return table.loc[:, table.sum() > 0]
+
+    def segment_summary(self, column: str) -> pd.DataFrame:
+        """
+        Answer segment_data(df, column) from the cube, in the same layout.
+
+        Counts and means are over policies with both TotalClaims and TotalPremium,
+        so they match segment_data when neither has missing values.
+        """
+        totals = self.rollup([column])
+        count = totals['policy_count']
+        summary = pd.DataFrame({
+            column: totals[column],
+            ('TotalClaims', 'mean'): totals['claims_sum'] / count,
+            ('TotalClaims', 'count'): count,
+            ('TotalClaims', 'sum'): totals['claims_sum'],
+            ('TotalPremium', 'mean'): totals['premium_sum'] / count,
+            ('TotalPremium', 'sum'): totals['premium_sum'],
+        })
+        summary.columns = pd.MultiIndex.from_tuples([(column, '')] + list(summary.columns[1:]))
+        return summary
+
+    def save(self, path: str) -> None:
+        """Write the cube cells to Parquet atomically."""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        try:
+            self.cells.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @classmethod
+    def load(cls, path: str) -> 'SegmentCube':
+        """Read a cube written by save; a cube missing any of CUBE_MEASURES raises ValueError."""
+        cells = pd.read_parquet(path)
+        missing = [col for col in CUBE_MEASURES if col not in cells.columns]
+        if missing:
+            raise ValueError(f"Cube at {path} predates measures {missing}; rebuild it")
+        return cls(cells, [col for col in cells.columns if col not in CUBE_MEASURES])
+
+
+def get_cube_path(data_path: str, cache_dir: Optional[str] = None) -> str:
+    """Return the cube file stored next to the columnar cache of a source file, per CUBE_VERSION."""
+    return get_cache_path(data_path, cache_dir).replace('.parquet', f'-cube-v{CUBE_VERSION}.parquet')
+
+
+def load_segment_cube(data_path: Optional[str] = None, cache_dir: Optional[str] = None,
+                      dimensions: Sequence[str] = CUBE_DIMENSIONS, rebuild: bool = False,
+                      chunksize: int = 200_000) -> SegmentCube:
+    """
+    Load the persisted cube for a source file, building and saving it if needed.
+
+    The cube is keyed on the same source fingerprint and schema version as the
+    columnar cache plus CUBE_VERSION, and is rebuilt when the stored dimensions
+    or measures differ.
+
+    Args:
+        data_path (str, optional): Path to the data file. If None, uses DATA_PATH from .env.
+        cache_dir (str, optional): Cache directory. If None, uses DATA_CACHE_DIR from .env.
+        dimensions (Sequence[str]): Dimensions of the cube.
+        rebuild (bool): Ignore a persisted cube.
+        chunksize (int): Rows per chunk while building.
+
+    Returns:
+        SegmentCube: The cube.
+    """
+    load_dotenv()
+    data_path = data_path or os.getenv('DATA_PATH', 'data/raw/insurance_data.txt')
+    if not os.path.exists(data_path):
+        raise FileNotFoundError(f"Data file not found at {data_path}")
+    cube_path = get_cube_path(data_path, cache_dir)
+    if not rebuild and os.path.exists(cube_path):
+        try:
+            cube = SegmentCube.load(cube_path)
+        except ValueError:
+            cube = None
+        if cube is not None and cube.dimensions == list(dimensions):
+            return cube
+    chunks = iter_insurance_chunks(data_path, chunksize=chunksize, cache_dir=cache_dir,
+                                   columns=[*dimensions, 'TotalPremium', 'TotalClaims'])
+    cube = SegmentCube.from_chunks(chunks, dimensions)
+    cube.save(cube_path)
+    return cube
@@ -1,7 +1,10 @@
 """Module for exploratory data analysis of insurance data."""
 
+from typing import Union
 import pandas as pd
 import numpy as np
+from .cube import CUBE_DIMENSIONS, SegmentCube
+from .outliers import detect_outliers_frame
 
 class InsuranceEDA:
     """Class to perform EDA on insurance datasets."""
@@ -19,6 +22,7 @@ class InsuranceEDA:
                                 'Converted', 'CrossBorder', 'TermFrequency', 'ExcessSelected', 
                                 'CoverCategory', 'CoverType', 'CoverGroup', 'Section', 'Product', 
                                 'StatutoryClass', 'StatutoryRiskType']
+        self._cube = None
 
     def get_descriptive_stats(self) -> pd.DataFrame:
         """
@@ -59,6 +63,24 @@ class InsuranceEDA:
             return z_scores > threshold
         raise ValueError("Method must be 'iqr' or 'zscore'")
 
+    def detect_outliers_all(self, columns=None, method: str = 'iqr', threshold: float = 1.5,
+                            return_mask: bool = False):
+        """
+        Detect outliers in several numerical columns with one vectorised bound computation.
+        Args:
+            columns (List[str], optional): Columns to check; defaults to the numerical_cols present.
+            method (str): Method to use ('iqr' or 'zscore').
+            threshold (float): Threshold for outlier detection.
+            return_mask (bool): Also return per-row flags packed into bits (see outliers.unpack_mask).
+        Returns:
+            pd.DataFrame or Tuple[pd.DataFrame, np.ndarray]: Per-column bounds and outlier counts,
+                plus the packed mask if requested.
+        """
+        if columns is None:
+            columns = [col for col in self.numerical_cols
+                       if col in self.df.columns and pd.api.types.is_numeric_dtype(self.df[col])]
+        return detect_outliers_frame(self.df, columns, method, threshold, return_mask)
+
     def calculate_loss_ratio(self, total_claims, total_premium):
         """
         Calculate Loss Ratio (TotalClaims / TotalPremium).
@@ -69,4 +91,27 @@ class InsuranceEDA:
             pd.Series: Loss Ratio values.
         """
         return total_claims / total_premium.where(total_premium != 0, np.nan)
-    
\ No newline at end of file
+    
+    def segment_cube(self, dimensions=None) -> SegmentCube:
+        """
+        Build the segment cube once and reuse it for later roll-up queries.
+        Args:
+            dimensions (Sequence[str], optional): Cube dimensions; defaults to the CUBE_DIMENSIONS present in the data.
+        Returns:
+            SegmentCube: Aggregates of the DataFrame.
+        """
+        if dimensions is None:
+            dimensions = [col for col in CUBE_DIMENSIONS if col in self.df.columns]
+        if self._cube is None or self._cube.dimensions != list(dimensions):
+            self._cube = SegmentCube.build(self.df, dimensions)
+        return self._cube
+
+    def loss_ratio_by(self, *dimensions: str) -> Union[pd.Series, float]:
+        """
+        Portfolio loss ratio (sum of claims / sum of premium) per segment, answered from the cube.
+        Args:
+            dimensions (str): Segment dimensions, e.g. 'Province', 'Gender'.
+        Returns:
+            pd.Series | float: Loss ratio per segment, or the overall loss ratio without dimensions.
+        """
+        return self.segment_cube().loss_ratio(list(dimensions))
@@ -0,0 +1,202 @@
+"""Month-partitioned insurance data store with incremental ingestion."""
+
+import json
+import os
+import shutil
+import warnings
+from functools import reduce
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+import pandas as pd
+from dotenv import load_dotenv
+from ..utils.data_loader import SCHEMA_VERSION, INSURANCE_SCHEMA, iter_insurance_chunks
+from .cube import CUBE_DIMENSIONS, CUBE_VERSION, SegmentCube
+
+Source = Union[str, pd.DataFrame, Iterable[pd.DataFrame]]
+
+_MANIFEST = 'manifest.json'
+_CUBE = 'cube.parquet'
+
+
+def _month_key(values: pd.Series) -> pd.Series:
+    """'YYYY-MM' partition key per row, missing for rows without a transaction month."""
+    months = pd.to_datetime(values, errors='coerce')
+    return months.dt.strftime('%Y-%m').where(months.notna())
+
+
+class MonthlyStore:
+    """
+    Insurance rows stored as one Parquet partition per TransactionMonth.
+
+    A JSON manifest records which months are stored, and a SegmentCube over the
+    stored rows is kept beside the partitions. Ingesting a delivery only writes
+    the months that are not stored yet and merges their aggregates into the
+    cube, so a monthly refresh costs time proportional to the new data. Derived
+    totals (calculate_metrics) and per-segment moments (test_hypothesis) are read
+    from the cube instead of the rows, and only the new months need to go
+    through a fitted DataPreprocessor.transform (``store.read(new_months)``).
+    """
+
+    def __init__(self, root: Optional[str] = None, dimensions: Sequence[str] = CUBE_DIMENSIONS):
+        """
+        Args:
+            root (str, optional): Store directory. If None, uses DATA_STORE_DIR from .env.
+            dimensions (Sequence[str]): Cube dimensions; must include TransactionMonth.
+        """
+        load_dotenv()
+        if 'TransactionMonth' not in dimensions:
+            raise ValueError("dimensions must include TransactionMonth")
+        self.root = root or os.getenv('DATA_STORE_DIR', 'data/store')
+        self.dimensions = list(dimensions)
+        self.manifest = self._read_manifest()
+
+    def _read_manifest(self) -> Dict:
+        path = os.path.join(self.root, _MANIFEST)
+        if not os.path.exists(path):
+            return {'schema_version': SCHEMA_VERSION, 'cube_version': CUBE_VERSION, 'dimensions': self.dimensions,
+                    'months': {}}
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('schema_version') != SCHEMA_VERSION or manifest.get('dimensions') != self.dimensions:
+            raise ValueError(f"Store at {self.root} was written with a different schema or cube dimensions; "
+                             "rebuild it in a new directory")
+        return manifest
+
+    def _write_manifest(self) -> None:
+        path = os.path.join(self.root, _MANIFEST)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+
+    @property
+    def months(self) -> List[str]:
+        """Stored months as sorted 'YYYY-MM' keys."""
+        return sorted(self.manifest['months'])
+
+    def new_months(self, df: pd.DataFrame) -> List[str]:
+        """Months present in a frame that are not stored yet."""
+        present = _month_key(df['TransactionMonth']).dropna().unique()
+        return sorted(set(present) - set(self.manifest['months']))
+
+    def _partition_dir(self, month: str) -> str:
+        return os.path.join(self.root, f'month={month}')
+
+    def _chunks(self, source: Source) -> Iterable[pd.DataFrame]:
+        if isinstance(source, str):
+            return iter_insurance_chunks(source, use_cache=False)
+        if isinstance(source, pd.DataFrame):
+            return [source]
+        return source
+
+    def ingest(self, source: Source, replace: bool = False) -> Dict:
+        """
+        Append the months of a delivery that are not stored yet.
+
+        Args:
+            source (str, pd.DataFrame or iterable of pd.DataFrame): Path of a pipe-delimited
+                file (streamed in chunks), a frame, or frame chunks.
+            replace (bool): Rewrite months that are already stored instead of skipping them.
+
+        Returns:
+            Dict: new_months and skipped_months (sorted keys), rows written and
+                rows_without_month (rows dropped because TransactionMonth is missing).
+        """
+        stored = set(self.manifest['months'])
+        if stored and self.manifest.get('cube_version', 1) != CUBE_VERSION:
+            # Bring an older cube up to date while the partitions still match the manifest.
+            self._rebuild_cube()
+        written: Dict[str, Dict] = {}
+        skipped, missing_rows = set(), 0
+        deltas = []
+        for chunk in self._chunks(source):
+            keys = _month_key(chunk['TransactionMonth'])
+            missing_rows += int(keys.isna().sum())
+            chunk_months = []
+            for month, rows in chunk.groupby(keys, sort=True):
+                if month in stored and not replace:
+                    skipped.add(month)
+                    continue
+                if month not in written:
+                    # Clear leftovers of an interrupted ingest or the partition being replaced.
+                    shutil.rmtree(self._partition_dir(month), ignore_errors=True)
+                    os.makedirs(self._partition_dir(month))
+                    written[month] = {'rows': 0, 'parts': 0}
+                entry = written[month]
+                rows.to_parquet(os.path.join(self._partition_dir(month), f"part-{entry['parts']:05d}.parquet"),
+                                index=False)
+                entry['rows'] += len(rows)
+                entry['parts'] += 1
+                chunk_months.append(month)
+            if chunk_months:
+                # Only the aggregates of the new rows are kept in memory.
+                deltas.append(SegmentCube.build(chunk[keys.isin(chunk_months)], self.dimensions))
+        if missing_rows:
+            warnings.warn(f"{missing_rows} rows without TransactionMonth were not stored")
+
+        if written:
+            cube = reduce(SegmentCube.merge, deltas)
+            if self.manifest['months']:
+                previous = self.cube().drop_months(month for month in written if month in stored)
+                cube = previous.merge(cube)
+            cube.save(os.path.join(self.root, _CUBE))
+            self.manifest['months'].update(written)
+            self._write_manifest()
+        return {'new_months': sorted(written), 'skipped_months': sorted(skipped),
+                'rows': sum(entry['rows'] for entry in written.values()), 'rows_without_month': missing_rows}
+
+    def read(self, months: Optional[Sequence[str]] = None, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Read stored rows.
+
+        Args:
+            months (Sequence[str], optional): 'YYYY-MM' keys to read; None reads every stored month.
+            columns (Sequence[str], optional): Columns to read.
+
+        Returns:
+            pd.DataFrame: Rows of the requested months, in month order.
+        """
+        months = self.months if months is None else sorted(months)
+        unknown = [month for month in months if month not in self.manifest['months']]
+        if unknown:
+            raise ValueError(f"Months not in store: {unknown}")
+        columns = list(columns) if columns is not None else None
+        parts = [pd.read_parquet(os.path.join(self._partition_dir(month), f'part-{part:05d}.parquet'), columns=columns)
+                 for month in months for part in range(self.manifest['months'][month]['parts'])]
+        if not parts:
+            raise ValueError("Store is empty")
+        df = pd.concat(parts, ignore_index=True)
+        # Partitions carry different category sets; re-unify them.
+        for col in df.columns:
+            if INSURANCE_SCHEMA.get(col) == 'category' and not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype('category')
+        return df
+
+    def cube(self) -> SegmentCube:
+        """Segment cube over every stored month, rebuilt from the partitions if written by an older CUBE_VERSION."""
+        path = os.path.join(self.root, _CUBE)
+        if not os.path.exists(path):
+            raise ValueError("Store is empty")
+        if self.manifest.get('cube_version', 1) != CUBE_VERSION:
+            return self._rebuild_cube()
+        return SegmentCube.load(path)
+
+    def _rebuild_cube(self) -> SegmentCube:
+        """Aggregate the stored partitions month by month into a current cube."""
+        columns = [*self.dimensions, 'TotalPremium', 'TotalClaims']
+        cube = SegmentCube.from_chunks((self.read([month], columns) for month in self.months), self.dimensions)
+        cube.save(os.path.join(self.root, _CUBE))
+        self.manifest['cube_version'] = CUBE_VERSION
+        self._write_manifest()
+        return cube
+
+    def metrics(self) -> Dict:
+        """calculate_metrics totals over every stored month, from the cube."""
+        return self.cube().metrics()
+
+    def moments(self, group_col: str, metric: str = 'claims') -> pd.DataFrame:
+        """Per-segment n/mean/var used by the test_hypothesis summary backend, from the cube."""
+        return self.cube().moments(group_col, metric)
+
+    def claim_contingency(self, group_col: str) -> pd.DataFrame:
+        """Per-segment claim/no-claim counts used by the chi-squared test, from the cube."""
+        return self.cube().claim_contingency(group_col)
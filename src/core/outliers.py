@@ -0,0 +1,271 @@
+"""Multi-column outlier detection for in-memory and chunked insurance data."""
+
+from typing import Callable, Iterable, Optional, Sequence, Tuple, Union
+import numpy as np
+import pandas as pd
+
+OutlierResult = Union[pd.DataFrame, Tuple[pd.DataFrame, np.ndarray]]
+
+
+def _as_matrix(df: pd.DataFrame, columns: Sequence[str]) -> np.ndarray:
+    """float64 matrix of the given columns with missing values as NaN."""
+    return df[list(columns)].to_numpy(dtype='float64', na_value=np.nan)
+
+
+def bounds_from_quartiles(q1, q3, threshold: float = 1.5) -> Tuple[np.ndarray, np.ndarray]:
+    """IQR fences q1 - threshold x IQR and q3 + threshold x IQR."""
+    iqr = np.asarray(q3) - np.asarray(q1)
+    return np.asarray(q1) - threshold * iqr, np.asarray(q3) + threshold * iqr
+
+
+def bounds_from_moments(mean, std, threshold: float = 3.0) -> Tuple[np.ndarray, np.ndarray]:
+    """Z-score fences: |x - mean| / std > threshold exactly when x is outside mean -/+ threshold x std."""
+    return np.asarray(mean) - threshold * np.asarray(std), np.asarray(mean) + threshold * np.asarray(std)
+
+
+def outlier_bounds(X: np.ndarray, method: str = 'iqr', threshold: float = 1.5) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-column lower and upper outlier bounds of a matrix in one vectorised pass.
+
+    Args:
+        X (np.ndarray): Values, one column per feature; NaN is ignored.
+        method (str): 'iqr' (quartile fences) or 'zscore' (mean -/+ threshold x std, ddof=1).
+        threshold (float): IQR multiplier or z-score cut-off.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Lower and upper bound per column.
+    """
+    method = method.lower()
+    if method == 'iqr':
+        q1, q3 = np.nanquantile(X, [0.25, 0.75], axis=0)
+        return bounds_from_quartiles(q1, q3, threshold)
+    if method == 'zscore':
+        return bounds_from_moments(np.nanmean(X, axis=0), np.nanstd(X, axis=0, ddof=1), threshold)
+    raise ValueError("Method must be 'iqr' or 'zscore'")
+
+
+def _flag(X: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Below-lower and above-upper flags; NaN values are never outliers."""
+    return X < lower, X > upper
+
+
+def _summary(columns, lower, upper, n_valid, n_below, n_above) -> pd.DataFrame:
+    summary = pd.DataFrame({
+        'lower': lower, 'upper': upper, 'n_valid': n_valid,
+        'n_below': n_below, 'n_above': n_above,
+    }, index=pd.Index(list(columns), name='column'))
+    summary['n_outliers'] = summary['n_below'] + summary['n_above']
+    summary['outlier_rate'] = summary['n_outliers'] / summary['n_valid'].where(summary['n_valid'] > 0)
+    return summary
+
+
+def pack_mask(mask: np.ndarray) -> np.ndarray:
+    """Pack a rows x columns boolean mask into bits along the columns (ceil(k / 8) bytes per row)."""
+    return np.packbits(mask, axis=1)
+
+
+def unpack_mask(packed: np.ndarray, n_columns: int) -> np.ndarray:
+    """Inverse of pack_mask."""
+    return np.unpackbits(packed, axis=1, count=n_columns).astype(bool)
+
+
+def detect_outliers_frame(df: pd.DataFrame, columns: Sequence[str], method: str = 'iqr', threshold: float = 1.5,
+                          return_mask: bool = False) -> OutlierResult:
+    """
+    Flag outliers in several columns at once.
+
+    Args:
+        df (pd.DataFrame): Input data.
+        columns (Sequence[str]): Numerical columns to check.
+        method (str): 'iqr' or 'zscore'.
+        threshold (float): IQR multiplier or z-score cut-off.
+        return_mask (bool): Also return the per-row flags packed by pack_mask.
+
+    Returns:
+        pd.DataFrame or Tuple[pd.DataFrame, np.ndarray]: Per-column lower/upper bounds, n_valid,
+            n_below, n_above, n_outliers and outlier_rate; plus the packed mask if requested.
+    """
+    X = _as_matrix(df, columns)
+    lower, upper = outlier_bounds(X, method, threshold)
+    below, above = _flag(X, lower, upper)
+    summary = _summary(columns, lower, upper, (~np.isnan(X)).sum(axis=0), below.sum(axis=0), above.sum(axis=0))
+    if return_mask:
+        return summary, pack_mask(below | above)
+    return summary
+
+
+class QuantileSketch:
+    """
+    Mergeable KLL-style quantile sketch.
+
+    Values go into a hierarchy of compactors; level h holds items of weight
+    2**h. A level over its capacity is sorted and every other item (random
+    offset) is promoted, so memory stays around 3 x k items while rank error is
+    roughly 1.7 / k.
+    """
+
+    def __init__(self, k: int = 200, random_state: Optional[int] = None):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(random_state)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if items.size > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # An odd item out stays behind at full weight.
+                kept, items = (items[-1:], items[:-1]) if items.size % 2 else (np.empty(0), items)
+                promoted = items[self._rng.integers(2)::2]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                self.levels[level] = kept
+                # Adding a level shrinks the capacities below it.
+                level = 0
+                continue
+            level += 1
+
+    def update(self, values) -> 'QuantileSketch':
+        """Add values, ignoring NaN."""
+        values = np.asarray(values, dtype='float64').ravel()
+        values = values[~np.isnan(values)]
+        self.n += values.size
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        """Fold another sketch into this one."""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def quantile(self, q):
+        """Approximate quantile(s) of the values seen so far (NaN if empty)."""
+        q = np.asarray(q, dtype='float64')
+        if self.n == 0:
+            return np.full(q.shape, np.nan) if q.ndim else np.nan
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(items.size, 2.0 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, cumulative = items[order], np.cumsum(weights[order])
+        index = np.searchsorted(cumulative, q * cumulative[-1], side='left')
+        return items[np.minimum(index, items.size - 1)]
+
+
+class StreamingOutlierDetector:
+    """
+    Outlier detection over chunked data in two passes.
+
+    The first pass (update) folds each chunk into per-column quantile sketches
+    (IQR) or running sums (z-score); the second pass (summarize) counts values
+    outside the resulting bounds. Memory does not grow with the number of rows,
+    except for the optional packed mask (ceil(k / 8) bytes per row).
+    """
+
+    def __init__(self, columns: Sequence[str], method: str = 'iqr', threshold: float = 1.5,
+                 sketch_size: int = 200, random_state: Optional[int] = 42):
+        method = method.lower()
+        if method not in ('iqr', 'zscore'):
+            raise ValueError("Method must be 'iqr' or 'zscore'")
+        self.columns = list(columns)
+        self.method = method
+        self.threshold = threshold
+        self.sketches = [QuantileSketch(sketch_size, None if random_state is None else random_state + i)
+                         for i in range(len(self.columns))]
+        self._count = np.zeros(len(self.columns))
+        # Sums are shifted by the first chunk's means to keep the variance numerically stable.
+        self._shift = None
+        self._sum = np.zeros(len(self.columns))
+        self._sumsq = np.zeros(len(self.columns))
+
+    def update(self, chunk: pd.DataFrame) -> 'StreamingOutlierDetector':
+        """Fold one chunk into the column statistics."""
+        X = _as_matrix(chunk, self.columns)
+        if self.method == 'iqr':
+            for sketch, values in zip(self.sketches, X.T):
+                sketch.update(values)
+        else:
+            if self._shift is None:
+                self._shift = np.nan_to_num(np.nanmean(X, axis=0)) if len(X) else np.zeros(len(self.columns))
+            centred = X - self._shift
+            self._count += (~np.isnan(X)).sum(axis=0)
+            self._sum += np.nansum(centred, axis=0)
+            self._sumsq += np.nansum(centred ** 2, axis=0)
+        return self
+
+    def bounds(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Lower and upper bound per column from the statistics folded so far."""
+        if self.method == 'iqr':
+            q1, q3 = np.array([sketch.quantile([0.25, 0.75]) for sketch in self.sketches]).T
+            return bounds_from_quartiles(q1, q3, self.threshold)
+        count = np.where(self._count > 0, self._count, np.nan)
+        mean = self._sum / count
+        var = (self._sumsq - self._sum * mean) / np.where(self._count > 1, self._count - 1, np.nan)
+        shift = self._shift if self._shift is not None else 0.0
+        return bounds_from_moments(mean + shift, np.sqrt(np.maximum(var, 0)), self.threshold)
+
+    def summarize(self, chunks: Iterable[pd.DataFrame], return_mask: bool = False) -> OutlierResult:
+        """
+        Count outliers per column over a second pass of the chunks.
+
+        Args:
+            chunks (Iterable[pd.DataFrame]): The same data that was passed to update.
+            return_mask (bool): Also return the per-row flags packed by pack_mask, in chunk order.
+
+        Returns:
+            pd.DataFrame or Tuple[pd.DataFrame, np.ndarray]: Same layout as detect_outliers_frame.
+        """
+        lower, upper = self.bounds()
+        n_valid = np.zeros(len(self.columns), dtype='int64')
+        n_below = np.zeros(len(self.columns), dtype='int64')
+        n_above = np.zeros(len(self.columns), dtype='int64')
+        packed = []
+        for chunk in chunks:
+            X = _as_matrix(chunk, self.columns)
+            below, above = _flag(X, lower, upper)
+            n_valid += (~np.isnan(X)).sum(axis=0)
+            n_below += below.sum(axis=0)
+            n_above += above.sum(axis=0)
+            if return_mask:
+                packed.append(pack_mask(below | above))
+        summary = _summary(self.columns, lower, upper, n_valid, n_below, n_above)
+        if return_mask:
+            width = (len(self.columns) + 7) // 8
+            return summary, np.concatenate(packed) if packed else np.empty((0, width), dtype=np.uint8)
+        return summary
+
+
+def detect_outliers_streaming(chunk_source: Callable[[], Iterable[pd.DataFrame]], columns: Sequence[str],
+                              method: str = 'iqr', threshold: float = 1.5, return_mask: bool = False,
+                              sketch_size: int = 200) -> OutlierResult:
+    """
+    Detect outliers in chunked data with approximate streaming quantiles.
+
+    Args:
+        chunk_source (Callable): Returns a fresh iterable of chunks each time it is called,
+            e.g. ``lambda: iter_insurance_chunks(columns=cols)``; it is called twice.
+        columns (Sequence[str]): Numerical columns to check.
+        method (str): 'iqr' (sketched quartiles) or 'zscore' (exact streaming moments).
+        threshold (float): IQR multiplier or z-score cut-off.
+        return_mask (bool): Also return the packed per-row flags.
+        sketch_size (int): Quantile sketch size k; larger is more accurate.
+
+    Returns:
+        pd.DataFrame or Tuple[pd.DataFrame, np.ndarray]: Same layout as detect_outliers_frame.
+    """
+    detector = StreamingOutlierDetector(columns, method, threshold, sketch_size)
+    for chunk in chunk_source():
+        detector.update(chunk)
+    return detector.summarize(chunk_source(), return_mask)
@@ -1 +1,2 @@
 """Package initialization file."""
+from .pricing import FrequencySeverityModel, loaded_premium
@@ -0,0 +1,129 @@
+"""Two-part frequency-severity model for risk-based pricing."""
+
+from typing import Optional
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from xgboost import XGBClassifier, XGBRegressor
+from ..utils.modeling_utils import ModelEvaluator, to_model_matrix
+
+
+def loaded_premium(probability, severity, expense_loading: float = 0.10, profit_margin: float = 0.05):
+    """
+    Premium as expected loss with a proportional loading.
+
+    premium = probability x severity x (1 + expense_loading + profit_margin)
+
+    Args:
+        probability (array-like): Claim probability per policy.
+        severity (array-like): Expected claim amount given a claim.
+        expense_loading (float): Expense loading as a fraction of expected loss.
+        profit_margin (float): Profit margin as a fraction of expected loss.
+
+    Returns:
+        np.ndarray: Premium per policy.
+    """
+    expected_loss = np.asarray(probability, dtype=float) * np.asarray(severity, dtype=float)
+    return expected_loss * (1 + expense_loading + profit_margin)
+
+
+def _take(X, mask):
+    """Rows of a frame, array or sparse matrix selected by a boolean mask."""
+    return X.loc[mask] if isinstance(X, pd.DataFrame) else X[mask]
+
+
+class FrequencySeverityModel:
+    """
+    Claim frequency classifier over all policies combined with a severity regressor over claimants.
+
+    The severity model only sees policies with TotalClaims > 0, so it learns
+    the claim amount given a claim (and trains on a small fraction of the
+    rows), while the frequency model supplies the claim probability. Their
+    product is the expected loss that predict_premium loads for expenses and
+    profit, for the whole book in one vectorised call.
+    """
+
+    def __init__(self, frequency_model=None, severity_model=None, expense_loading: float = 0.10,
+                 profit_margin: float = 0.05, n_jobs: Optional[int] = None):
+        """
+        Args:
+            frequency_model: Unfitted classifier with predict_proba; defaults to the XGBoost
+                probability model of ModelEvaluator.
+            severity_model: Unfitted regressor; defaults to the XGBoost severity model of ModelEvaluator.
+            expense_loading (float): Expense loading as a fraction of expected loss.
+            profit_margin (float): Profit margin as a fraction of expected loss.
+            n_jobs (int, optional): Threads of the default models.
+        """
+        self.frequency_model = frequency_model if frequency_model is not None else XGBClassifier(
+            n_estimators=50, max_depth=3, random_state=42, n_jobs=n_jobs)
+        self.severity_model = severity_model if severity_model is not None else XGBRegressor(
+            random_state=42, n_jobs=n_jobs)
+        self.expense_loading = expense_loading
+        self.profit_margin = profit_margin
+
+    @classmethod
+    def from_evaluator(cls, evaluator: ModelEvaluator, frequency: str = 'XGBoost', severity: str = 'XGBoost',
+                       **kwargs) -> 'FrequencySeverityModel':
+        """Build from the (possibly tuned) models of a ModelEvaluator, by name."""
+        return cls(evaluator.probability_models[frequency], evaluator.severity_models[severity], **kwargs)
+
+    def fit(self, X, claims) -> 'FrequencySeverityModel':
+        """
+        Fit both parts.
+
+        Args:
+            X: Features of every policy (DataFrame, array or CSR).
+            claims (array-like): TotalClaims per policy; claimants are rows with claims > 0.
+
+        Returns:
+            FrequencySeverityModel: self, with fitted frequency_model_ and severity_model_.
+        """
+        X = to_model_matrix(X)
+        claims = np.asarray(claims, dtype=float)
+        has_claim = claims > 0
+        if not has_claim.any():
+            raise ValueError("No policies with claims to fit the severity model on")
+        self.frequency_model_ = clone(self.frequency_model).fit(X, has_claim.astype(int))
+        self.severity_model_ = clone(self.severity_model).fit(_take(X, has_claim), claims[has_claim])
+        self.n_policies_ = int(len(claims))
+        self.n_claimants_ = int(has_claim.sum())
+        return self
+
+    def predict_frequency(self, X) -> np.ndarray:
+        """Claim probability per policy."""
+        return self.frequency_model_.predict_proba(to_model_matrix(X))[:, 1]
+
+    def predict_severity(self, X) -> np.ndarray:
+        """Expected claim amount given a claim, floored at zero."""
+        return np.maximum(self.severity_model_.predict(to_model_matrix(X)), 0.0)
+
+    def predict_expected_loss(self, X) -> np.ndarray:
+        """Claim probability x severity per policy (the pure premium)."""
+        X = to_model_matrix(X)
+        return self.predict_frequency(X) * self.predict_severity(X)
+
+    def predict_premium(self, X, expense_loading: Optional[float] = None,
+                        profit_margin: Optional[float] = None) -> np.ndarray:
+        """Expected loss x (1 + expense_loading + profit_margin); loadings default to the model's."""
+        X = to_model_matrix(X)
+        return loaded_premium(self.predict_frequency(X), self.predict_severity(X),
+                              self.expense_loading if expense_loading is None else expense_loading,
+                              self.profit_margin if profit_margin is None else profit_margin)
+
+    def price(self, X) -> pd.DataFrame:
+        """
+        Price a book of policies.
+
+        Returns:
+            pd.DataFrame: claim_probability, predicted_severity, expected_loss and premium
+                per policy, on X's index when X is a DataFrame.
+        """
+        index = X.index if isinstance(X, pd.DataFrame) else None
+        X = to_model_matrix(X)
+        probability, severity = self.predict_frequency(X), self.predict_severity(X)
+        return pd.DataFrame({
+            'claim_probability': probability,
+            'predicted_severity': severity,
+            'expected_loss': probability * severity,
+            'premium': loaded_premium(probability, severity, self.expense_loading, self.profit_margin),
+        }, index=index)
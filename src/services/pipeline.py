@@ -0,0 +1,270 @@
+"""Declared-DAG pipeline runner with per-stage timing and memory instrumentation."""
+
+import cProfile
+import io
+import json
+import os
+import platform
+import pstats
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from scipy import sparse as sp
+from sklearn.model_selection import train_test_split
+from ..utils.data_loader import load_insurance_data
+from ..utils.data_preprocessing import DataPreprocessor
+from ..utils.model_interpretation import fast_shap_values, get_top_features
+from ..utils.modeling_utils import ModelEvaluator, to_model_matrix
+from ..utils.profiling import PeakMemorySampler
+
+
+class Stage(NamedTuple):
+    """
+    One pipeline step.
+
+    name: Unique stage name.
+    func: Called with the outputs of deps, in order.
+    deps: Names of the stages whose outputs func receives.
+    """
+    name: str
+    func: Callable
+    deps: Tuple[str, ...] = ()
+
+
+def _rows(obj) -> Optional[int]:
+    """Row count of a frame, array or sparse matrix; for containers, of their first such item."""
+    if isinstance(obj, (pd.DataFrame, pd.Series, np.ndarray)) or sp.issparse(obj):
+        return int(obj.shape[0]) if obj.ndim else None
+    if isinstance(obj, dict):
+        obj = list(obj.values())
+    if isinstance(obj, (tuple, list)):
+        for item in obj:
+            rows = _rows(item)
+            if rows is not None:
+                return rows
+    return None
+
+
+def _nbytes(obj) -> Optional[int]:
+    """Allocated size of frames, arrays and sparse matrices (summed over containers), None if unknown."""
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        usage = obj.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(obj, pd.DataFrame) else usage)
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if sp.issparse(obj):
+        obj = obj.tocsr() if obj.format not in ('csr', 'csc') else obj
+        return int(obj.data.nbytes + obj.indices.nbytes + obj.indptr.nbytes)
+    if isinstance(obj, dict):
+        obj = list(obj.values())
+    if isinstance(obj, (tuple, list)):
+        sizes = [size for size in map(_nbytes, obj) if size is not None]
+        return sum(sizes) if sizes else None
+    return None
+
+
+def _mb(nbytes: Optional[int]) -> Optional[float]:
+    return None if nbytes is None else nbytes / 2 ** 20
+
+
+class Pipeline:
+    """
+    Runs stages in dependency order and records what each one costs.
+
+    For every stage the report holds wall and CPU time, peak RSS growth, rows in
+    (first input) and out, and the allocated size of the output. Chosen stages
+    can additionally run under cProfile or tracemalloc.
+    """
+
+    def __init__(self, stages: Sequence[Stage]):
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Stage names must be unique")
+        for stage in stages:
+            unknown = [dep for dep in stage.deps if dep not in self.stages]
+            if unknown:
+                raise ValueError(f"Stage {stage.name} depends on unknown stages: {unknown}")
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        """Kahn's algorithm, keeping declaration order among ready stages."""
+        remaining = {name: set(stage.deps) for name, stage in self.stages.items()}
+        order = []
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"Pipeline has a dependency cycle among: {sorted(remaining)}")
+            for name in ready:
+                order.append(name)
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return order
+
+    def _run_stage(self, stage: Stage, inputs: List[Any], profile: bool, trace_memory: bool,
+                   profile_dir: Optional[str]) -> Tuple[Any, Dict]:
+        profiler = cProfile.Profile() if profile else None
+        if trace_memory:
+            tracemalloc.start()
+        with PeakMemorySampler() as memory:
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            if profiler:
+                profiler.enable()
+            try:
+                output = stage.func(*inputs)
+            finally:
+                if profiler:
+                    profiler.disable()
+            wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+
+        record = {
+            'stage': stage.name,
+            'deps': list(stage.deps),
+            'wall_s': wall,
+            'cpu_s': cpu,
+            'peak_rss_mb': _mb(memory.peak_bytes),
+            'peak_rss_delta_mb': _mb(memory.peak_delta_bytes),
+            'rows_in': _rows(inputs[0]) if inputs else None,
+            'rows_out': _rows(output),
+            'output_mb': _mb(_nbytes(output)),
+        }
+        if trace_memory:
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            record['tracemalloc_peak_mb'] = _mb(peak)
+            record['tracemalloc_top'] = [str(stat) for stat in snapshot.statistics('lineno')[:10]]
+        if profiler:
+            stream = io.StringIO()
+            stats = pstats.Stats(profiler, stream=stream).sort_stats('cumulative')
+            stats.print_stats(15)
+            record['profile_top'] = stream.getvalue().strip().splitlines()
+            if profile_dir:
+                os.makedirs(profile_dir, exist_ok=True)
+                path = os.path.join(profile_dir, f'{stage.name}.prof')
+                stats.dump_stats(path)
+                record['profile_path'] = path
+        return output, record
+
+    def run(self, profile: Sequence[str] = (), trace_memory: Sequence[str] = (),
+            report_path: Optional[str] = None, profile_dir: Optional[str] = None) -> Tuple[Dict[str, Any], Dict]:
+        """
+        Execute every stage once.
+
+        Args:
+            profile (Sequence[str]): Stages to run under cProfile.
+            trace_memory (Sequence[str]): Stages to run under tracemalloc (slows Python allocations).
+            report_path (str, optional): Where to write the JSON run report.
+            profile_dir (str, optional): Where to dump .prof files of profiled stages.
+
+        Returns:
+            Tuple[Dict[str, Any], Dict]: Output of every stage by name, and the run report.
+        """
+        unknown = [name for name in (*profile, *trace_memory) if name not in self.stages]
+        if unknown:
+            raise ValueError(f"Unknown stages: {unknown}")
+        outputs: Dict[str, Any] = {}
+        records = []
+        started = datetime.now(timezone.utc)
+        total_start = time.perf_counter()
+        for name in self.order:
+            stage = self.stages[name]
+            outputs[name], record = self._run_stage(stage, [outputs[dep] for dep in stage.deps],
+                                                    name in profile, name in trace_memory, profile_dir)
+            records.append(record)
+        report = {
+            'started_at': started.isoformat(),
+            'total_wall_s': time.perf_counter() - total_start,
+            'python': platform.python_version(),
+            'cpu_count': os.cpu_count(),
+            'stages': records,
+        }
+        if report_path:
+            os.makedirs(os.path.dirname(report_path) or '.', exist_ok=True)
+            with open(report_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+        return outputs, report
+
+
+# Columns that leak the target or identify rows, left out of the model matrix.
+_NON_FEATURES = ['TotalClaims', 'PremiumToClaimsRatio', 'PolicyID', 'UnderwrittenCoverID']
+
+DEFAULT_CATEGORICAL_COLS = ['Province', 'VehicleType', 'CoverType', 'Gender', 'make']
+
+
+def _model_matrix(df: pd.DataFrame):
+    """Numeric, boolean and encoded columns of a preprocessed frame as a CSR matrix, minus non-features."""
+    features = df.drop(columns=[col for col in _NON_FEATURES if col in df.columns])
+    keep = [col for col in features.columns
+            if isinstance(features[col].dtype, pd.SparseDtype) or pd.api.types.is_numeric_dtype(features[col])
+            or pd.api.types.is_bool_dtype(features[col])]
+    matrix = to_model_matrix(features[keep])
+    return (matrix if sp.issparse(matrix) else sp.csr_matrix(matrix.astype('float64').to_numpy())), features[keep].columns
+
+
+def build_insurance_pipeline(data_path: Optional[str] = None, sample_rows: Optional[int] = None,
+                             categorical_cols: Optional[List[str]] = None, models: Optional[Sequence[str]] = None,
+                             n_jobs: int = -1, shap_rows: Optional[int] = 500) -> Pipeline:
+    """
+    Declare the task-4 modelling flow as a pipeline.
+
+    Stages: load -> handle_missing -> feature_engineering -> encode -> split -> train -> shap.
+
+    Args:
+        data_path (str, optional): Path to the data file. If None, uses DATA_PATH from .env.
+        sample_rows (int, optional): Random sample of rows to run on.
+        categorical_cols (List[str], optional): Columns to encode.
+        models (Sequence[str], optional): Model names to train (e.g. 'XGBoost'); all if None.
+        n_jobs (int): Core budget of ModelEvaluator.run_all.
+        shap_rows (int, optional): Rows explained for the XGBoost probability model; None skips SHAP.
+
+    Returns:
+        Pipeline: The declared pipeline.
+    """
+    preprocessor = DataPreprocessor(categorical_cols or DEFAULT_CATEGORICAL_COLS)
+
+    def load():
+        df = load_insurance_data(data_path)
+        return df.sample(sample_rows, random_state=42) if sample_rows and sample_rows < len(df) else df
+
+    def split(df):
+        X, feature_names = _model_matrix(df)
+        claims = df['TotalClaims'].to_numpy(dtype='float64')
+        has_claim = claims > 0
+        severity = train_test_split(X[has_claim], claims[has_claim], test_size=0.2, random_state=42)
+        probability = train_test_split(X, has_claim.astype(int), test_size=0.2, random_state=42)
+        # train_test_split returns X_train, X_test, y_train, y_test.
+        return {'probability': tuple(probability), 'severity': tuple(severity), 'feature_names': list(feature_names)}
+
+    def train(data):
+        evaluator = ModelEvaluator()
+        if models is not None:
+            evaluator.severity_models = {k: v for k, v in evaluator.severity_models.items() if k in models}
+            evaluator.probability_models = {k: v for k, v in evaluator.probability_models.items() if k in models}
+        severity = data['severity'] if evaluator.severity_models and data['severity'][0].shape[0] else None
+        results = evaluator.run_all(severity, data['probability'] if evaluator.probability_models else None,
+                                    n_jobs=n_jobs)
+        return {'results': results, 'evaluator': evaluator}
+
+    def shap(data, trained):
+        model = trained['evaluator'].probability_models.get('XGBoost')
+        if model is None or not hasattr(model, 'get_booster'):
+            return None
+        X_train, X_test = data['probability'][0], data['probability'][1]
+        values = fast_shap_values(model, X_train, X_test, feature_names=data['feature_names'], n_explain=shap_rows)
+        return get_top_features(values)
+
+    stages = [
+        Stage('load', load),
+        Stage('handle_missing', preprocessor.handle_missing_data, ('load',)),
+        Stage('feature_engineering', preprocessor.feature_engineering, ('handle_missing',)),
+        Stage('encode', preprocessor.encode_categorical, ('feature_engineering',)),
+        Stage('split', split, ('encode',)),
+        Stage('train', train, ('split',)),
+    ]
+    if shap_rows:
+        stages.append(Stage('shap', shap, ('split', 'train')))
+    return Pipeline(stages)
@@ -0,0 +1,249 @@
+"""Headless, parallel rendering of the EDA report from pre-aggregated data."""
+
+import os
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from matplotlib.figure import Figure
+from ..core.cube import CUBE_DIMENSIONS, SegmentCube
+from ..utils.visualizations import box_stats, proportion_ci, ratio_ci
+
+DEFAULT_SEGMENTS = ('Province', 'VehicleType', 'Gender', 'CoverType')
+DEFAULT_NUMERIC_COLS = ('TotalPremium', 'TotalClaims', 'SumInsured', 'CustomValueEstimate')
+
+
+class FigureSpec(NamedTuple):
+    """
+    One report figure: what to draw and the (small) data to draw it from.
+
+    name: File stem of the figure.
+    kind: 'bar', 'line', 'heatmap', 'hist' or 'box'.
+    data: Pre-aggregated frame (or box statistics) the drawer reads.
+    title, xlabel, ylabel: Axis text.
+    """
+    name: str
+    kind: str
+    data: Any
+    title: str
+    xlabel: str = ''
+    ylabel: str = ''
+
+
+def _errors(value, lower, upper) -> np.ndarray:
+    """Error bar lengths below and above value, clipped at zero against rounding."""
+    return np.maximum([np.asarray(value - lower), np.asarray(upper - value)], 0)
+
+
+def _draw_bar(ax, data: pd.DataFrame):
+    """Horizontal bars of value with lower/upper interval; a hue column gives grouped bars."""
+    if 'hue' in data.columns:
+        values = data.pivot(index='label', columns='hue', values='value')
+        lower = data.pivot(index='label', columns='hue', values='lower')
+        upper = data.pivot(index='label', columns='hue', values='upper')
+        height = 0.8 / max(len(values.columns), 1)
+        positions = np.arange(len(values))
+        for i, hue in enumerate(values.columns):
+            ax.barh(positions + i * height, values[hue], height=height, label=str(hue), capsize=2,
+                    xerr=_errors(values[hue], lower[hue], upper[hue]))
+        ax.set_yticks(positions + height * (len(values.columns) - 1) / 2, values.index.astype(str))
+        ax.legend()
+    else:
+        ax.barh(data['label'].astype(str), data['value'], capsize=3,
+                xerr=_errors(data['value'], data['lower'], data['upper']))
+    ax.invert_yaxis()
+
+
+def _draw_line(ax, data: pd.DataFrame):
+    """Line of value over label with a shaded interval band."""
+    ax.plot(data['label'], data['value'])
+    ax.fill_between(data['label'], data['lower'], data['upper'], alpha=0.3)
+    ax.figure.autofmt_xdate()
+
+
+def _draw_heatmap(ax, data: pd.DataFrame):
+    """Annotated heatmap of a pivot table."""
+    image = ax.imshow(data.to_numpy(dtype='float64'), cmap='YlGnBu', aspect='auto')
+    ax.figure.colorbar(image, ax=ax)
+    ax.set_xticks(range(data.shape[1]), [str(col) for col in data.columns])
+    ax.set_yticks(range(data.shape[0]), [str(row) for row in data.index])
+    for (i, j), value in np.ndenumerate(data.to_numpy(dtype='float64')):
+        if np.isfinite(value):
+            ax.text(j, i, f'{value:.0f}', ha='center', va='center', fontsize=8)
+
+
+def _draw_hist(ax, data: Dict):
+    """Histogram from precomputed bin edges and counts."""
+    ax.stairs(data['counts'], data['edges'], fill=True)
+
+
+def _draw_box(ax, data: List[Dict]):
+    """Box plot from precomputed box statistics."""
+    ax.bxp(data, showfliers=False)
+    ax.tick_params(axis='x', labelrotation=45)
+
+
+_DRAWERS = {'bar': _draw_bar, 'line': _draw_line, 'heatmap': _draw_heatmap, 'hist': _draw_hist, 'box': _draw_box}
+
+
+def render_figure(spec: FigureSpec, out_dir: str = 'plots', dpi: int = 100, fmt: str = 'png') -> Dict:
+    """
+    Draw one figure without pyplot and write it to out_dir.
+
+    Figures are built on the Agg canvas directly, so rendering needs no
+    display and keeps no global pyplot state between figures.
+
+    Returns:
+        Dict: name, path and render_s of the figure.
+    """
+    start = time.perf_counter()
+    if spec.kind not in _DRAWERS:
+        raise ValueError(f"Unknown figure kind: {spec.kind}")
+    fig = Figure(figsize=(10, 6))
+    ax = fig.add_subplot()
+    _DRAWERS[spec.kind](ax, spec.data)
+    ax.set_title(spec.title)
+    ax.set_xlabel(spec.xlabel)
+    ax.set_ylabel(spec.ylabel)
+    fig.tight_layout()
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f'{spec.name}.{fmt}')
+    fig.savefig(path, dpi=dpi)
+    return {'name': spec.name, 'path': path, 'render_s': time.perf_counter() - start}
+
+
+def _segment_frame(totals: pd.DataFrame, label_col: str, value, lower, upper) -> pd.DataFrame:
+    return pd.DataFrame({'label': totals[label_col].astype(str).to_numpy(), 'value': np.asarray(value),
+                         'lower': np.asarray(lower), 'upper': np.asarray(upper)})
+
+
+def _loss_ratio_interval(totals: pd.DataFrame):
+    """Delta-method loss ratio interval from cube roll-up sums."""
+    # sum(premium * claims) follows from the squares of premium, claims and margin.
+    cross = (totals['premium_sumsq'] + totals['claims_sumsq'] - totals['margin_sumsq']) / 2
+    return ratio_ci(totals['claims_sum'], totals['premium_sum'], totals['claims_sumsq'],
+                    totals['premium_sumsq'], cross, totals['policy_count'])
+
+
+def cube_figure_specs(cube: SegmentCube, segments: Sequence[str] = DEFAULT_SEGMENTS) -> List[FigureSpec]:
+    """
+    Report figures answered from a segment cube.
+
+    Per segment column: loss ratio (delta-method interval) and claim frequency
+    (Wilson interval). With TransactionMonth in the cube: the monthly claim
+    frequency trend and a month x year claim count heatmap. With Province and
+    Gender: loss ratio by both.
+    """
+    specs = []
+    for col in [col for col in segments if col in cube.dimensions]:
+        totals = cube.rollup([col]).sort_values('policy_count', ascending=False)
+        ratio, lower, upper = _loss_ratio_interval(totals)
+        specs.append(FigureSpec(f'loss_ratio_by_{col}', 'bar', _segment_frame(totals, col, ratio, lower, upper),
+                                f'Loss Ratio by {col}', 'Loss Ratio (Claims/Premium)', col))
+        lower, upper = proportion_ci(totals['claim_count'], totals['policy_count'])
+        specs.append(FigureSpec(f'claim_frequency_by_{col}', 'bar',
+                                _segment_frame(totals, col, totals['claim_frequency'], lower, upper),
+                                f'Claim Frequency by {col}', 'Share of policies with a claim', col))
+
+    if 'Province' in cube.dimensions and 'Gender' in cube.dimensions:
+        totals = cube.rollup(['Province', 'Gender'])
+        ratio, lower, upper = _loss_ratio_interval(totals)
+        data = _segment_frame(totals, 'Province', ratio, lower, upper).assign(hue=totals['Gender'].astype(str).to_numpy())
+        specs.append(FigureSpec('loss_ratio_province_gender', 'bar', data, 'Loss Ratio by Province and Gender',
+                                'Loss Ratio (Claims/Premium)', 'Province'))
+
+    if 'TransactionMonth' in cube.dimensions:
+        monthly = cube.rollup(['TransactionMonth']).dropna(subset=['TransactionMonth']).sort_values('TransactionMonth')
+        lower, upper = proportion_ci(monthly['claim_count'], monthly['policy_count'])
+        specs.append(FigureSpec('monthly_claim_frequency', 'line',
+                                pd.DataFrame({'label': monthly['TransactionMonth'].to_numpy(),
+                                              'value': monthly['claim_frequency'].to_numpy(),
+                                              'lower': lower, 'upper': upper}),
+                                'Monthly Claim Frequency', 'Month', 'Share of policies with a claim'))
+        months = pd.to_datetime(monthly['TransactionMonth'])
+        heatmap = monthly['claim_count'].groupby([months.dt.month.rename('Month'),
+                                                  months.dt.year.rename('Year')]).sum().unstack('Year')
+        specs.append(FigureSpec('claim_frequency_heatmap', 'heatmap', heatmap,
+                                'Claim Count by Month and Year', 'Year', 'Month'))
+    return specs
+
+
+def frame_figure_specs(df: pd.DataFrame, numeric_cols: Sequence[str] = DEFAULT_NUMERIC_COLS,
+                       bins: int = 50, top_makes: int = 10) -> List[FigureSpec]:
+    """
+    Report figures that need row-level data, reduced to bin counts and box statistics.
+
+    Histograms are exact (np.histogram over every finite value); the claim
+    severity boxes use the claimants of the most common makes.
+    """
+    specs = []
+    for col in [col for col in numeric_cols if col in df.columns]:
+        values = df[col].to_numpy(dtype='float64', na_value=np.nan)
+        values = values[np.isfinite(values)]
+        if values.size:
+            counts, edges = np.histogram(values, bins=bins)
+            specs.append(FigureSpec(f'distribution_{col}', 'hist', {'counts': counts, 'edges': edges},
+                                    f'Distribution of {col}', col, 'Frequency'))
+    if {'make', 'TotalClaims'} <= set(df.columns):
+        claimants = df.loc[df['TotalClaims'] > 0, ['make', 'TotalClaims']]
+        makes = df['make'].value_counts().index[:top_makes]
+        stats = box_stats(claimants, 'make', 'TotalClaims', groups=makes)
+        if stats:
+            specs.append(FigureSpec('claim_severity_make_box', 'box', stats,
+                                    'Claim Severity by Top Vehicle Makes (claimants)', 'Vehicle Make',
+                                    'Total Claims (Rand)'))
+    return specs
+
+
+def render_report(specs: Sequence[FigureSpec], out_dir: str = 'plots', n_jobs: int = -1, dpi: int = 100,
+                  fmt: str = 'png') -> pd.DataFrame:
+    """
+    Render figures in a process pool.
+
+    Only the pre-aggregated spec data is sent to the workers.
+
+    Args:
+        specs (Sequence[FigureSpec]): Figures to draw.
+        out_dir (str): Output directory.
+        n_jobs (int): Worker processes; 1 renders in this process.
+        dpi (int): Output resolution.
+        fmt (str): Image format.
+
+    Returns:
+        pd.DataFrame: name, path and render_s per figure.
+    """
+    records = Parallel(n_jobs=n_jobs)(delayed(render_figure)(spec, out_dir, dpi, fmt) for spec in specs)
+    return pd.DataFrame(records, columns=['name', 'path', 'render_s'])
+
+
+def generate_eda_report(df: Optional[pd.DataFrame] = None, cube: Optional[SegmentCube] = None,
+                        out_dir: str = 'plots', segments: Sequence[str] = DEFAULT_SEGMENTS,
+                        numeric_cols: Sequence[str] = DEFAULT_NUMERIC_COLS, n_jobs: int = -1,
+                        dpi: int = 100) -> pd.DataFrame:
+    """
+    Write the EDA report figures to out_dir.
+
+    Segment figures come from the cube (built from df if not given);
+    distribution figures need df and are skipped without it.
+
+    Args:
+        df (pd.DataFrame, optional): Row-level data.
+        cube (SegmentCube, optional): Pre-aggregated data, e.g. load_segment_cube() or MonthlyStore.cube().
+        out_dir (str): Output directory.
+        segments (Sequence[str]): Segment columns for the loss ratio and claim frequency bars.
+        numeric_cols (Sequence[str]): Columns to draw histograms of.
+        n_jobs (int): Worker processes for rendering.
+        dpi (int): Output resolution.
+
+    Returns:
+        pd.DataFrame: name, path and render_s per figure.
+    """
+    if df is None and cube is None:
+        raise ValueError("Provide df, cube or both")
+    if cube is None:
+        cube = SegmentCube.build(df, [col for col in CUBE_DIMENSIONS if col in df.columns])
+    specs = cube_figure_specs(cube, segments)
+    if df is not None:
+        specs += frame_figure_specs(df, numeric_cols)
+    return render_report(specs, out_dir, n_jobs, dpi)
@@ -0,0 +1,239 @@
+"""Batch scoring service for claim-probability, severity and risk-based premium."""
+
+import argparse
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Optional, Union
+import joblib
+import numpy as np
+import pandas as pd
+from ..models.pricing import loaded_premium
+
+Records = Union[pd.DataFrame, Iterable[Dict]]
+
+
+def risk_premium(probability, severity, expense_loading: float = 0.10, profit_margin: float = 0.05):
+    """
+    Risk-based premium as priced in the task-4 notebook, kept to reproduce it;
+    ScoringService prices with loaded_premium instead.
+
+    premium = probability x severity + (expense_loading + profit_margin) x severity
+
+    Args:
+        probability (array-like): Predicted claim probability.
+        severity (array-like): Predicted claim amount.
+        expense_loading (float): Expense loading as a fraction of severity.
+        profit_margin (float): Profit margin as a fraction of severity.
+
+    Returns:
+        np.ndarray: Premium per policy.
+    """
+    probability = np.asarray(probability, dtype=float)
+    severity = np.asarray(severity, dtype=float)
+    return probability * severity + (expense_loading + profit_margin) * severity
+
+
+class ScoringService:
+    """
+    Keeps a fitted preprocessor and models in memory and scores records in micro-batches.
+
+    Each batch is transformed and predicted as one vectorised call; per-batch
+    latencies are kept in a bounded window for latency_report. Models come
+    either as a separate severity and probability pair or as a fitted
+    FrequencySeverityModel, and both are priced the same way, with
+    loaded_premium: premium = probability x severity x (1 + expense_loading
+    + profit_margin), severity floored at zero. The loadings are fractions of
+    expected loss.
+    """
+
+    def __init__(self, preprocessor, severity_model=None, probability_model=None, expense_loading=None,
+                 profit_margin=None, batch_size=1024, matrix='csr', latency_window=10_000, pricing_model=None):
+        """
+        Args:
+            preprocessor (DataPreprocessor): Fitted preprocessor.
+            severity_model: Fitted regressor predicting claim amount.
+            probability_model: Fitted classifier with predict_proba.
+            expense_loading (float, optional): Expense loading; defaults to the pricing_model's, else 0.10.
+            profit_margin (float, optional): Profit margin; defaults to the pricing_model's, else 0.05.
+            batch_size (int): Maximum rows per vectorised call.
+            matrix (str): 'csr' to score on transform_sparse output, 'frame' on transform output;
+                must match how the models were trained.
+            latency_window (int): Number of recent batches kept for latency statistics.
+            pricing_model (FrequencySeverityModel, optional): Fitted two-part model used instead of
+                severity_model and probability_model.
+        """
+        if matrix not in ('csr', 'frame'):
+            raise ValueError("matrix must be 'csr' or 'frame'")
+        if pricing_model is None and (severity_model is None or probability_model is None):
+            raise ValueError("Provide severity_model and probability_model, or pricing_model")
+        self.preprocessor = preprocessor
+        self.severity_model = severity_model
+        self.probability_model = probability_model
+        self.pricing_model = pricing_model
+        if pricing_model is not None:
+            expense_loading = pricing_model.expense_loading if expense_loading is None else expense_loading
+            profit_margin = pricing_model.profit_margin if profit_margin is None else profit_margin
+        self.expense_loading = 0.10 if expense_loading is None else expense_loading
+        self.profit_margin = 0.05 if profit_margin is None else profit_margin
+        self.batch_size = batch_size
+        self.matrix = matrix
+        self._latencies = deque(maxlen=latency_window)
+        self._rows = deque(maxlen=latency_window)
+        self._lock = threading.Lock()
+
+    def save(self, path):
+        """Persist the preprocessor, models and pricing settings as one joblib bundle."""
+        joblib.dump({
+            'preprocessor': self.preprocessor,
+            'severity_model': self.severity_model,
+            'probability_model': self.probability_model,
+            'pricing_model': self.pricing_model,
+            'expense_loading': self.expense_loading,
+            'profit_margin': self.profit_margin,
+            'matrix': self.matrix,
+        }, path)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """Load a bundle written by save; keyword arguments override the stored settings."""
+        bundle = joblib.load(path)
+        bundle.update(kwargs)
+        return cls(**bundle)
+
+    def _design_matrix(self, frame: pd.DataFrame):
+        if self.matrix == 'csr':
+            return self.preprocessor.transform_sparse(frame)[0]
+        return self.preprocessor.transform(frame, sparse=False)
+
+    def _score_batch(self, frame: pd.DataFrame) -> pd.DataFrame:
+        start = time.perf_counter()
+        X = self._design_matrix(frame)
+        if self.pricing_model is not None:
+            probability = self.pricing_model.predict_frequency(X)
+            severity = self.pricing_model.predict_severity(X)
+        else:
+            probability = self.probability_model.predict_proba(X)[:, 1]
+            severity = np.maximum(self.severity_model.predict(X), 0.0)
+        scored = pd.DataFrame({
+            'claim_probability': probability,
+            'predicted_severity': severity,
+            'premium': loaded_premium(probability, severity, self.expense_loading, self.profit_margin),
+        }, index=frame.index)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._latencies.append(elapsed)
+            self._rows.append(len(frame))
+        return scored
+
+    def score(self, records: Records) -> pd.DataFrame:
+        """
+        Score policy records.
+
+        Args:
+            records (pd.DataFrame or iterable of dict): Policies in the raw dataset layout.
+
+        Returns:
+            pd.DataFrame: claim_probability, predicted_severity and premium per record,
+                on the input index.
+        """
+        frame = records if isinstance(records, pd.DataFrame) else pd.DataFrame(list(records))
+        if frame.empty:
+            return pd.DataFrame(columns=['claim_probability', 'predicted_severity', 'premium'])
+        batches = [self._score_batch(frame.iloc[start:start + self.batch_size])
+                   for start in range(0, len(frame), self.batch_size)]
+        return pd.concat(batches)
+
+    def warm_up(self, records: Records, repeats: int = 3):
+        """Run a few scoring calls so lazy model initialisation happens before serving, then reset stats."""
+        for _ in range(repeats):
+            self.score(records)
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Forget recorded batch latencies."""
+        with self._lock:
+            self._latencies.clear()
+            self._rows.clear()
+
+    def latency_report(self) -> Dict:
+        """
+        Summarise recent batch latencies.
+
+        Returns:
+            Dict: batches, rows, p50_ms, p99_ms (per batch) and rows_per_sec.
+        """
+        with self._lock:
+            latencies = np.array(self._latencies)
+            rows = np.array(self._rows)
+        if latencies.size == 0:
+            return {'batches': 0, 'rows': 0, 'p50_ms': np.nan, 'p99_ms': np.nan, 'rows_per_sec': np.nan}
+        return {
+            'batches': int(latencies.size),
+            'rows': int(rows.sum()),
+            'p50_ms': float(np.percentile(latencies, 50) * 1000),
+            'p99_ms': float(np.percentile(latencies, 99) * 1000),
+            'rows_per_sec': float(rows.sum() / latencies.sum()),
+        }
+
+
+def make_server(service: ScoringService, host: str = '127.0.0.1', port: int = 8000) -> ThreadingHTTPServer:
+    """
+    Build a minimal JSON HTTP server around a scoring service.
+
+    POST /score with a JSON list of records (or {"records": [...]}) returns the
+    scored rows; GET /stats returns latency_report.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/stats':
+                self._send(200, service.latency_report())
+            else:
+                self._send(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if self.path != '/score':
+                self._send(404, {'error': 'not found'})
+                return
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                records = payload['records'] if isinstance(payload, dict) else payload
+                scored = service.score(records)
+            except (ValueError, KeyError, TypeError) as exc:
+                self._send(400, {'error': str(exc)})
+                return
+            self._send(200, scored.to_dict(orient='records'))
+
+        def log_message(self, *args):
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def main(argv: Optional[list] = None):
+    """Serve a saved scoring bundle over HTTP."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('bundle', help='Path written by ScoringService.save')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--batch-size', type=int, default=1024)
+    args = parser.parse_args(argv)
+    service = ScoringService.load(args.bundle, batch_size=args.batch_size)
+    server = make_server(service, args.host, args.port)
+    print(f"Scoring service listening on http://{args.host}:{server.server_port}")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
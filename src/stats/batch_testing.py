@@ -0,0 +1,186 @@
+"""Batch runner for many hypothesis tests over one shared pre-aggregation."""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Sequence
+import numpy as np
+import pandas as pd
+from ..utils.data_loader import load_insurance_data
+from .sufficient_stats import (
+    ttest_from_moments,
+    anova_from_moments,
+    chi2_from_counts
+)
+
+# Derived metrics understood by the batch runner; any other name is read as a column.
+METRICS = ('claims', 'severity', 'margin', 'frequency')
+TESTS = ('auto', 'ttest', 'welch', 'anova', 'chi2')
+
+
+class HypothesisSpec(NamedTuple):
+    """
+    One test in a batch.
+
+    group_col: Column to segment by.
+    metric: 'claims' (TotalClaims), 'severity' (TotalClaims of claimants), 'margin'
+        (TotalPremium - TotalClaims), 'frequency' (claim indicator) or a column name.
+    test: 'auto' (t-test for two groups, ANOVA otherwise), 'ttest' or 'welch' (exactly two groups),
+        'anova' or 'chi2' (claim occurrence, so metric must be 'frequency' or the default 'claims').
+    groups: Optional subset of group levels to compare, e.g. an A/B pair.
+    """
+    group_col: str
+    metric: str = 'claims'
+    test: str = 'auto'
+    groups: Optional[Sequence] = None
+
+
+def _metric_series(df: pd.DataFrame, metric: str) -> pd.Series:
+    """Return the row-level values of a metric, computed once per batch."""
+    if metric == 'claims':
+        return df['TotalClaims']
+    if metric == 'severity':
+        return df['TotalClaims'].where(df['TotalClaims'] > 0)
+    if metric == 'margin':
+        return df['TotalPremium'] - df['TotalClaims']
+    if metric == 'frequency':
+        return (df['TotalClaims'] > 0).astype(float)
+    return df[metric]
+
+
+def _required_columns(specs: List[HypothesisSpec]) -> List[str]:
+    """Columns the batch needs from the loader."""
+    columns = ['TotalClaims']
+    for spec in specs:
+        columns.append(spec.group_col)
+        if spec.metric == 'margin':
+            columns.append('TotalPremium')
+        elif spec.metric not in METRICS:
+            columns.append(spec.metric)
+    return list(dict.fromkeys(columns))
+
+
+def _aggregate(df: pd.DataFrame, group_col: str, metrics: List[str], values: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """One grouped pass per segment column giving n/mean/var for every metric plus claim counts."""
+    grouped = values[metrics + ['_has_claim']].groupby(df[group_col], observed=True)
+    summary = grouped.agg(['count', 'mean', 'var', 'sum'])
+    moments = {}
+    for metric in metrics:
+        part = summary[metric][['count', 'mean', 'var']].rename(columns={'count': 'n'})
+        moments[metric] = part[part['n'] > 0]
+    claims = summary['_has_claim']
+    moments['_contingency'] = pd.DataFrame({False: claims['count'] - claims['sum'], True: claims['sum']})
+    return moments
+
+
+def _check_spec(spec: HypothesisSpec) -> None:
+    """Reject specs whose test cannot use their metric or groups."""
+    if spec.test not in TESTS:
+        raise ValueError(f"Unknown test '{spec.test}'; expected one of {TESTS}")
+    if spec.test == 'chi2' and spec.metric not in ('frequency', 'claims'):
+        raise ValueError(f"chi2 tests claim occurrence and cannot use metric '{spec.metric}': {spec}")
+    if spec.test in ('ttest', 'welch') and spec.groups is not None and len(spec.groups) != 2:
+        raise ValueError(f"{spec.test} needs exactly two groups: {spec}")
+
+
+def _check_two_groups(spec: HypothesisSpec, summaries: Dict[str, Dict[str, pd.DataFrame]]) -> None:
+    """Reject a t-test whose column (or group subset) does not have exactly two groups with data."""
+    moments = summaries[spec.group_col][spec.metric]
+    if spec.groups is not None:
+        moments = moments.loc[moments.index.isin(list(spec.groups))]
+    if len(moments) != 2:
+        raise ValueError(f"{spec.test} needs exactly two groups with data, {spec.group_col} has "
+                         f"{len(moments)}: {spec}")
+
+
+def _run_one(spec: HypothesisSpec, summaries: Dict[str, Dict[str, pd.DataFrame]]) -> Dict:
+    """Run a single test from the pre-aggregated summaries."""
+    row = {'group_col': spec.group_col, 'metric': spec.metric, 'test': spec.test,
+           'n_groups': 0, 'n_obs': 0, 'statistic': np.nan, 'p_value': np.nan}
+    by_group = summaries[spec.group_col]
+    if spec.test == 'chi2':
+        table = by_group['_contingency']
+        if spec.groups is not None:
+            table = table.loc[table.index.isin(list(spec.groups))]
+        table = table.loc[:, table.sum() > 0]
+        row.update(n_groups=len(table), n_obs=int(table.to_numpy().sum()))
+        if len(table) > 1 and table.shape[1] > 1:
+            result = chi2_from_counts(table)
+            row.update(statistic=result['statistic'], p_value=result['p_value'])
+        return row
+
+    moments = by_group[spec.metric]
+    if spec.groups is not None:
+        moments = moments.loc[moments.index.isin(list(spec.groups))]
+    row.update(n_groups=len(moments), n_obs=int(moments['n'].sum()))
+    test = spec.test
+    if test == 'auto':
+        test = 'ttest' if len(moments) == 2 else 'anova'
+        row['test'] = test
+    if test in ('ttest', 'welch') and len(moments) == 2:
+        result = ttest_from_moments(moments, equal_var=test == 'ttest')
+        row.update(statistic=result['statistic'], p_value=result['p_value'])
+    elif test == 'anova' and len(moments) >= 2:
+        result = anova_from_moments(moments)
+        row.update(statistic=result['anova_statistic'], p_value=result['p_value'])
+    return row
+
+
+def run_hypothesis_batch(specs: Sequence, df: Optional[pd.DataFrame] = None, data_path: Optional[str] = None,
+                         alpha: float = 0.05, correction: str = 'fdr_bh',
+                         n_jobs: Optional[int] = None) -> pd.DataFrame:
+    """
+    Run many hypothesis tests over one load and one pre-aggregation pass.
+
+    Each distinct segment column is grouped once for all metrics that use it;
+    the tests themselves then run on the small summaries in a thread pool, and
+    p-values are corrected for multiple comparisons across the whole batch.
+
+    Args:
+        specs (Sequence): HypothesisSpec objects or (group_col, metric, test[, groups]) tuples.
+        df (pd.DataFrame, optional): Data to test. If None, loaded with only the needed columns.
+        data_path (str, optional): Passed to load_insurance_data when df is None.
+        alpha (float): Family-wise / false-discovery significance level.
+        correction (str): Any statsmodels multipletests method, e.g. 'fdr_bh',
+            'holm' or 'bonferroni'; None disables correction.
+        n_jobs (int, optional): Worker threads for aggregation and tests.
+
+    Returns:
+        pd.DataFrame: One row per spec with group_col, metric, test, n_groups, n_obs,
+            statistic, p_value, p_adjusted and reject.
+
+    Raises:
+        ValueError: For an unknown test, a chi2 spec with a metric other than claim
+            occurrence, or a ttest/welch spec without exactly two groups with data.
+    """
+    specs = [spec if isinstance(spec, HypothesisSpec) else HypothesisSpec(*spec) for spec in specs]
+    for spec in specs:
+        _check_spec(spec)
+    if df is None:
+        df = load_insurance_data(data_path, columns=_required_columns(specs))
+
+    metrics = list(dict.fromkeys(spec.metric for spec in specs if spec.test != 'chi2'))
+    values = pd.DataFrame({metric: _metric_series(df, metric) for metric in metrics}, index=df.index)
+    values['_has_claim'] = (df['TotalClaims'] > 0).astype(float)
+    metrics_by_col = {}
+    for spec in specs:
+        metrics_by_col.setdefault(spec.group_col, [])
+        if spec.test != 'chi2' and spec.metric not in metrics_by_col[spec.group_col]:
+            metrics_by_col[spec.group_col].append(spec.metric)
+
+    with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+        futures = {col: pool.submit(_aggregate, df, col, col_metrics, values)
+                   for col, col_metrics in metrics_by_col.items()}
+        summaries = {col: future.result() for col, future in futures.items()}
+        for spec in specs:
+            if spec.test in ('ttest', 'welch'):
+                _check_two_groups(spec, summaries)
+        rows = list(pool.map(lambda spec: _run_one(spec, summaries), specs))
+
+    results = pd.DataFrame(rows)
+    results['p_adjusted'] = results['p_value']
+    tested = results['p_value'].notna()
+    if correction and tested.any():
+        from statsmodels.stats.multitest import multipletests  # pylint: disable=import-outside-toplevel
+        results.loc[tested, 'p_adjusted'] = multipletests(results.loc[tested, 'p_value'], alpha=alpha,
+                                                          method=correction)[1]
+    results['reject'] = results['p_adjusted'] <= alpha
+    return results
@@ -2,10 +2,15 @@ import os
 import pandas as pd
 import numpy as np
 from scipy import stats
-from statsmodels.stats.multicomp import pairwise_tukeyhsd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from typing import Dict, Optional, Tuple
+from typing import Dict, Iterable, Optional, Tuple
+from .sufficient_stats import (
+    group_moments,
+    claim_contingency,
+    ttest_from_moments,
+    anova_from_moments,
+    tukey_hsd_from_moments,
+    chi2_from_counts
+)
 
 def calculate_metrics(df: pd.DataFrame) -> Dict:
     """Calculate claim frequency, severity, and margin."""
@@ -21,8 +26,109 @@ def segment_data(df: pd.DataFrame, column: str) -> pd.DataFrame:
         'TotalPremium': ['mean', 'sum']
     }).reset_index()
 
-def test_hypothesis(df: pd.DataFrame, group_col: str, metric_col: str, is_categorical: bool = False, alpha: float = 0.05) -> Tuple[Dict, pd.DataFrame]:
-    """Perform t-test, ANOVA, or chi-squared test based on data type and return results and modified DataFrame."""
+def calculate_metrics_streaming(chunks: Iterable[pd.DataFrame]) -> Dict:
+    """Calculate claim frequency, severity, and margin by folding running totals over chunks."""
+    n_rows = n_claims = 0
+    severity_sum = premium_sum = claims_sum = 0.0
+    for chunk in chunks:
+        claims = chunk['TotalClaims']
+        has_claim = claims > 0
+        n_rows += len(chunk)
+        n_claims += int(has_claim.sum())
+        severity_sum += claims[has_claim].sum()
+        premium_sum += chunk['TotalPremium'].sum()
+        claims_sum += claims.sum()
+    return {
+        'claim_frequency': n_claims / n_rows if n_rows else np.nan,
+        'claim_severity': severity_sum / n_claims if n_claims else np.nan,
+        'margin': premium_sum - claims_sum,
+    }
+
+def _segment_partial(df: pd.DataFrame, column: str) -> pd.DataFrame:
+    """Per-group non-null counts, sums and sums of squares of TotalClaims and TotalPremium."""
+    values = df[['TotalClaims', 'TotalPremium']]
+    keys = df[column]
+    grouped = values.groupby(keys, observed=True)
+    partial = pd.concat([
+        grouped.count().add_suffix('_count'),
+        grouped.sum().add_suffix('_sum'),
+        (values ** 2).groupby(keys, observed=True).sum().add_suffix('_sumsq'),
+    ], axis=1)
+    # Chunks carry different category sets, so merge on plain values.
+    partial.index = pd.Index(partial.index.to_numpy(), name=column)
+    return partial
+
+def segment_data_streaming(chunks: Iterable[pd.DataFrame], column: str, include_variance: bool = False) -> pd.DataFrame:
+    """
+    Segment chunked data by a given column, matching the layout of segment_data.
+
+    Counts, sums and sums of squares are folded per chunk, so memory is bounded
+    by the number of segments rather than the number of rows.
+    """
+    totals = None
+    for chunk in chunks:
+        partial = _segment_partial(chunk, column)
+        totals = partial if totals is None else totals.add(partial, fill_value=0)
+    if totals is None:
+        raise ValueError("No data to segment")
+    totals = totals.sort_index()
+
+    result = pd.DataFrame(index=totals.index)
+    for metric, stats_ in (('TotalClaims', ('mean', 'count', 'sum')), ('TotalPremium', ('mean', 'sum'))):
+        count = totals[f'{metric}_count'].astype('int64')
+        total = totals[f'{metric}_sum']
+        computed = {'mean': total / count.where(count > 0), 'count': count, 'sum': total}
+        for stat in stats_:
+            result[(metric, stat)] = computed[stat]
+        if include_variance:
+            sumsq = totals[f'{metric}_sumsq']
+            result[(metric, 'var')] = (sumsq - total ** 2 / count) / (count - 1).where(count > 1)
+    result.columns = pd.MultiIndex.from_tuples(result.columns)
+    return result.reset_index()
+
+def test_hypothesis(df: pd.DataFrame, group_col: str, metric_col: str, is_categorical: bool = False, alpha: float = 0.05,
+                    equal_var: bool = True, backend: str = 'summary', tukey: str = 'statsmodels') -> Tuple[Dict, pd.DataFrame]:
+    """
+    Perform t-test, ANOVA, or chi-squared test based on data type and return results and modified DataFrame.
+
+    The default 'summary' backend derives every statistic from per-group n/mean/variance
+    (or claim counts) computed in one grouped pass. A Series metric is aligned on df's
+    index and df is returned unchanged (visualize_results takes the Series directly).
+    The 'rows' backend keeps the original per-group row lists and adds temp_metric to a copy of df.
+
+    With more than two groups, tukey='statsmodels' returns the statsmodels TukeyHSDResults
+    as before; tukey='summary' derives Tukey-Kramer HSD from the group moments and returns
+    it as a DataFrame, without another pass over the rows.
+    """
+    if backend == 'rows':
+        return _test_hypothesis_rows(df, group_col, metric_col, is_categorical, alpha, equal_var)
+    if backend != 'summary':
+        raise ValueError("backend must be 'summary' or 'rows'")
+    if tukey not in ('statsmodels', 'summary'):
+        raise ValueError("tukey must be 'statsmodels' or 'summary'")
+
+    if is_categorical:
+        table = claim_contingency(df[group_col], df['TotalClaims'] > 0)
+        return chi2_from_counts(table), df
+    metric = metric_col.reindex(df.index) if isinstance(metric_col, pd.Series) else df[metric_col]
+    moments = group_moments(metric, df[group_col])
+    if len(moments) == 2:
+        return ttest_from_moments(moments, equal_var=equal_var), df
+    if len(moments) < 2:
+        return None, df
+    anova = anova_from_moments(moments)
+    if tukey == 'summary':
+        tukey_results = tukey_hsd_from_moments(moments, alpha)
+    else:
+        from statsmodels.stats.multicomp import pairwise_tukeyhsd
+        valid = metric.notna() & df[group_col].notna()
+        tukey_results = pairwise_tukeyhsd(metric[valid], df[group_col][valid], alpha=alpha)
+    return {'anova_statistic': anova['anova_statistic'], 'p_value': anova['p_value'],
+            'tukey_results': tukey_results}, df
+
+def _test_hypothesis_rows(df: pd.DataFrame, group_col: str, metric_col: str, is_categorical: bool,
+                          alpha: float, equal_var: bool) -> Tuple[Dict, pd.DataFrame]:
+    """Row-level implementation of test_hypothesis kept for comparison and statsmodels output."""
     # If metric_col is a Series, create a temporary column and track it
     temp_col = None
     if isinstance(metric_col, pd.Series):
@@ -38,25 +144,39 @@ def test_hypothesis(df: pd.DataFrame, group_col: str, metric_col: str, is_catego
     else:
         groups = [group[metric_col].dropna() for name, group in df.groupby(group_col, observed=True) if not group[metric_col].dropna().empty]
         if len(groups) == 2:
-            t_stat, p_value = stats.ttest_ind(groups[0], groups[1])
+            t_stat, p_value = stats.ttest_ind(groups[0], groups[1], equal_var=equal_var)
             return {'statistic': t_stat, 'p_value': p_value}, df
         elif len(groups) > 2:
             anova = stats.f_oneway(*groups)
-            tukey = pairwise_tukeyhsd(df[metric_col].dropna(), df[group_col].dropna())
+            valid = df[[metric_col, group_col]].dropna()
+            from statsmodels.stats.multicomp import pairwise_tukeyhsd
+            tukey = pairwise_tukeyhsd(valid[metric_col], valid[group_col], alpha=alpha)
             return {'anova_statistic': anova.statistic, 'p_value': anova.pvalue, 'tukey_results': tukey}, df
         return None, df
 
-def visualize_results(df: pd.DataFrame, group_col: str, metric_col: str, title: str, plot_type: str = 'box'):
-    """Visualize hypothesis test results with various plot types."""
-    plt.figure(figsize=(12, 6))
+def visualize_results(df: pd.DataFrame, group_col: str, metric_col: str, title: str, plot_type: str = 'box',
+                      save_dir: str = 'notebooks/plots'):
+    """
+    Visualize hypothesis test results with various plot types.
+
+    Rendering is headless: the figure is written to save_dir and closed. Box
+    plots omit individual outlier points, which dominate drawing time on full data.
+    """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    fig, ax = plt.subplots(figsize=(12, 6))
     if plot_type == 'box':
-        sns.boxplot(x=group_col, y=metric_col if isinstance(metric_col, str) else "temp_metric", data=df)
+        if isinstance(metric_col, pd.Series):
+            sns.boxplot(x=df[group_col], y=metric_col.reindex(df.index), showfliers=False, ax=ax)
+        else:
+            sns.boxplot(x=group_col, y=metric_col, data=df, showfliers=False, ax=ax)
     elif plot_type == 'heatmap' and metric_col == 'TransactionMonth':
         pivot = df.pivot_table(values=metric_col if isinstance(metric_col, str) else "temp_metric", index=group_col, aggfunc='mean')
-        sns.heatmap(pivot, annot=True, cmap='YlOrRd')
-    plt.title(title)
-    plt.xticks(rotation=45)
-    os.makedirs('notebooks/plots', exist_ok=True)
+        sns.heatmap(pivot, annot=True, cmap='YlOrRd', ax=ax)
+    ax.set_title(title)
+    ax.tick_params(axis='x', labelrotation=45)
+    os.makedirs(save_dir, exist_ok=True)
     save_metric_col = "temp_metric" if isinstance(metric_col, pd.Series) else metric_col
-    plt.savefig(f'notebooks/plots/{group_col}_vs_{save_metric_col}_{plot_type}.png')
-    plt.close()
\ No newline at end of file
+    fig.savefig(os.path.join(save_dir, f'{group_col}_vs_{save_metric_col}_{plot_type}.png'))
+    plt.close(fig)
@@ -0,0 +1,154 @@
+"""Hypothesis tests computed from per-group sufficient statistics.
+
+Each test works on a small per-group summary (n, mean, variance) or a count
+table built in a single grouped pass, so no per-group row copies are made and
+the cost of a test no longer grows with the number of rows once the summary
+exists.
+"""
+
+from typing import Dict
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+# Above this many pairwise comparisons, Tukey p-values are interpolated from a
+# grid of studentized-range tail probabilities instead of one integral per pair.
+_TUKEY_EXACT_PAIRS = 1000
+_TUKEY_GRID_POINTS = 256
+
+
+def group_moments(metric: pd.Series, groups: pd.Series) -> pd.DataFrame:
+    """
+    Compute per-group count, mean and variance of a metric in one grouped pass.
+
+    Args:
+        metric (pd.Series): Metric values; missing values are ignored.
+        groups (pd.Series): Group labels aligned on the metric index.
+
+    Returns:
+        pd.DataFrame: Columns n, mean and var (ddof=1), indexed by group, for groups
+            with at least one non-missing value.
+    """
+    moments = metric.groupby(groups, observed=True).agg(['count', 'mean', 'var'])
+    moments = moments.rename(columns={'count': 'n'})
+    return moments[moments['n'] > 0]
+
+
+def claim_contingency(groups: pd.Series, has_claim: pd.Series) -> pd.DataFrame:
+    """
+    Build the group x (no claim, claim) count table without a crosstab.
+
+    Args:
+        groups (pd.Series): Group labels.
+        has_claim (pd.Series): Boolean claim indicator aligned on the group index.
+
+    Returns:
+        pd.DataFrame: Columns False/True holding counts, indexed by group. Columns whose
+            total is zero are dropped, as pd.crosstab would.
+    """
+    counts = has_claim.astype(bool).groupby(groups, observed=True).agg(['count', 'sum'])
+    table = pd.DataFrame({False: counts['count'] - counts['sum'], True: counts['sum']})
+    return table.loc[:, table.sum() > 0]
+
+
+def ttest_from_moments(moments: pd.DataFrame, equal_var: bool = True) -> Dict:
+    """
+    Two-sample t-test (Student or Welch) from the summaries of exactly two groups.
+
+    Args:
+        moments (pd.DataFrame): Output of group_moments with two rows.
+        equal_var (bool): Pooled-variance Student test if True, Welch test otherwise.
+
+    Returns:
+        Dict: statistic and p_value.
+    """
+    if len(moments) != 2:
+        raise ValueError("A t-test needs exactly two groups")
+    a, b = moments.iloc[0], moments.iloc[1]
+    result = stats.ttest_ind_from_stats(a['mean'], np.sqrt(a['var']), a['n'],
+                                        b['mean'], np.sqrt(b['var']), b['n'],
+                                        equal_var=equal_var)
+    return {'statistic': result.statistic, 'p_value': result.pvalue}
+
+
+def _within_group_ss(moments: pd.DataFrame) -> float:
+    """Pooled within-group sum of squares; singleton groups contribute zero."""
+    return float(((moments['n'] - 1) * moments['var'].fillna(0)).sum())
+
+
+def anova_from_moments(moments: pd.DataFrame) -> Dict:
+    """
+    One-way ANOVA F-test from per-group summaries.
+
+    Args:
+        moments (pd.DataFrame): Output of group_moments with two or more rows.
+
+    Returns:
+        Dict: anova_statistic, p_value, df_between and df_within.
+    """
+    n = moments['n'].to_numpy(dtype=float)
+    means = moments['mean'].to_numpy(dtype=float)
+    k, total = len(n), n.sum()
+    grand_mean = (n * means).sum() / total
+    ss_between = (n * (means - grand_mean) ** 2).sum()
+    df_between, df_within = k - 1, total - k
+    f_stat = (ss_between / df_between) / (_within_group_ss(moments) / df_within)
+    return {'anova_statistic': f_stat, 'p_value': stats.f.sf(f_stat, df_between, df_within),
+            'df_between': df_between, 'df_within': df_within}
+
+
+def _studentized_range_sf(q: np.ndarray, k: int, df: float) -> np.ndarray:
+    """Tail probability of the studentized range, interpolated for large inputs."""
+    if q.size <= _TUKEY_EXACT_PAIRS:
+        return stats.studentized_range.sf(q, k, df)
+    grid = np.linspace(q.min(), q.max(), _TUKEY_GRID_POINTS)
+    log_sf = np.log(np.clip(stats.studentized_range.sf(grid, k, df), 1e-300, 1.0))
+    return np.exp(np.interp(q, grid, log_sf))
+
+
+def tukey_hsd_from_moments(moments: pd.DataFrame, alpha: float = 0.05) -> pd.DataFrame:
+    """
+    Tukey-Kramer HSD on all pairs of groups from per-group summaries.
+
+    Args:
+        moments (pd.DataFrame): Output of group_moments with two or more rows.
+        alpha (float): Family-wise significance level.
+
+    Returns:
+        pd.DataFrame: One row per pair with group1, group2, meandiff (group2 - group1),
+            p-adj, lower, upper and reject, as in the statsmodels summary table.
+    """
+    n = moments['n'].to_numpy(dtype=float)
+    means = moments['mean'].to_numpy(dtype=float)
+    k = len(n)
+    df_within = n.sum() - k
+    mse = _within_group_ss(moments) / df_within
+    i, j = np.triu_indices(k, 1)
+    meandiff = means[j] - means[i]
+    std_err = np.sqrt(mse / 2 * (1 / n[i] + 1 / n[j]))
+    q = np.abs(meandiff) / std_err
+    q_crit = stats.studentized_range.ppf(1 - alpha, k, df_within)
+    labels = moments.index.to_numpy()
+    return pd.DataFrame({
+        'group1': labels[i],
+        'group2': labels[j],
+        'meandiff': meandiff,
+        'p-adj': np.clip(_studentized_range_sf(q, k, df_within), 0.0, 1.0),
+        'lower': meandiff - q_crit * std_err,
+        'upper': meandiff + q_crit * std_err,
+        'reject': q > q_crit,
+    })
+
+
+def chi2_from_counts(table: pd.DataFrame) -> Dict:
+    """
+    Chi-squared test of independence on a count table.
+
+    Args:
+        table (pd.DataFrame): Contingency table, e.g. from claim_contingency.
+
+    Returns:
+        Dict: statistic, p_value and dof.
+    """
+    chi2, p, dof, _ = stats.chi2_contingency(table.to_numpy())
+    return {'statistic': chi2, 'p_value': p, 'dof': dof}
@@ -1,11 +1,27 @@
-"""Package initialization file."""
-from .data_loader import load_insurance_data
-from .visualizations import (
-    setup_plot_style,
-    plot_numerical_distribution,
-    plot_categorical_distribution,
-    plot_loss_ratio_by_category,
-    plot_temporal_trend,
-    plot_correlation_matrix,
-    plot_creative_visualizations
-)
+"""Package initialization file.
+
+Plotting helpers are resolved on first access, so importing the package (or
+data_loader) does not load matplotlib and seaborn.
+"""
+import importlib
+from .data_loader import load_insurance_data, iter_insurance_chunks
+
+_LAZY = {
+    'setup_plot_style': '.visualizations',
+    'plot_numerical_distribution': '.visualizations',
+    'plot_categorical_distribution': '.visualizations',
+    'plot_loss_ratio_by_category': '.visualizations',
+    'plot_temporal_trend': '.visualizations',
+    'plot_correlation_matrix': '.visualizations',
+    'plot_creative_visualizations': '.visualizations',
+}
+
+__all__ = ['load_insurance_data', 'iter_insurance_chunks', *_LAZY]
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,233 @@
+"""Content-addressed, size-bounded disk cache for expensive pipeline artefacts."""
+
+import functools
+import hashlib
+import inspect
+import os
+import sys
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+import joblib
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+from scipy import sparse as sp
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+_MISSING = object()
+_SUFFIX = '.joblib'
+
+
+def fingerprint(obj: Any) -> str:
+    """
+    Content hash of an input.
+
+    Frames and series are hashed row-wise with their columns and dtypes, arrays
+    and sparse matrices from their buffers, and anything else with joblib.hash
+    (which covers estimators, dicts, lists and scalars).
+    """
+    digest = hashlib.md5()
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        digest.update(b'pandas')
+        digest.update(repr(obj.dtypes.to_dict() if isinstance(obj, pd.DataFrame) else (obj.name, obj.dtype)).encode())
+        digest.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, np.ndarray) and obj.dtype != object:
+        digest.update(f'ndarray{obj.shape}{obj.dtype}'.encode())
+        digest.update(np.ascontiguousarray(obj).data)
+    elif sp.issparse(obj):
+        obj = obj.tocsr()
+        digest.update(f'csr{obj.shape}{obj.dtype}'.encode())
+        for part in (obj.data, obj.indices, obj.indptr):
+            digest.update(np.ascontiguousarray(part).data)
+    elif isinstance(obj, (tuple, list)):
+        digest.update(type(obj).__name__.encode())
+        for item in obj:
+            digest.update(fingerprint(item).encode())
+    else:
+        digest.update(joblib.hash(obj).encode())
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def _file_digest(path: str, mtime_ns: int) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.md5(f.read()).hexdigest()
+
+
+def code_fingerprint(obj: Any) -> str:
+    """
+    Hash of the source module defining a function or class.
+
+    Any edit to that module invalidates entries computed with its code, which
+    also covers helpers the function calls within the same module.
+    """
+    module = sys.modules.get(getattr(obj, '__module__', None) or '')
+    path = getattr(module, '__file__', None)
+    if path and os.path.exists(path):
+        return _file_digest(path, os.stat(path).st_mtime_ns)
+    try:
+        return hashlib.md5(inspect.getsource(obj).encode()).hexdigest()
+    except (OSError, TypeError):
+        return hashlib.md5(getattr(obj, '__qualname__', repr(obj)).encode()).hexdigest()
+
+
+class ArtifactCache:
+    """
+    Disk cache of pickled results keyed on input content plus code and parameters.
+
+    Entries are written atomically (temporary file + rename) so readers never
+    see partial files, and a per-key file lock makes concurrent processes
+    compute a missing entry once. When the cache grows past max_bytes the least
+    recently used entries (by last hit or write) are evicted.
+
+    Attributes:
+        hits (int): Entries served from disk by this instance.
+        misses (int): Entries computed by this instance.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        """
+        Args:
+            cache_dir (str, optional): Cache directory. If None, uses ARTIFACT_CACHE_DIR from .env.
+            max_bytes (int, optional): Size bound. If None, uses ARTIFACT_CACHE_MAX_BYTES from .env (default 2 GiB).
+        """
+        load_dotenv()
+        self.cache_dir = cache_dir or os.getenv('ARTIFACT_CACHE_DIR', 'data/cache/artifacts')
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.getenv('ARTIFACT_CACHE_MAX_BYTES', 2 ** 31))
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, namespace: str, *parts: Any) -> str:
+        """Build a key from a namespace and the fingerprints of any inputs, parameters or code objects."""
+        digest = hashlib.md5(namespace.encode())
+        for part in parts:
+            digest.update(fingerprint(part).encode())
+        return f'{namespace}-{digest.hexdigest()}'
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + _SUFFIX)
+
+    @contextmanager
+    def _lock(self, name: str):
+        """Exclusive inter-process lock on a lock file (no-op where fcntl is unavailable)."""
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.cache_dir, name + '.lock'), 'a+') as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a cached value, or default if absent or unreadable."""
+        path = self._path(key)
+        try:
+            value = joblib.load(path)
+        except (OSError, EOFError, ValueError):
+            return default
+        # Mark as recently used for eviction.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a value atomically, then evict old entries if the cache is over its size bound."""
+        path = self._path(key)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        try:
+            joblib.dump(value, tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.evict()
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for key, computing and storing it if missing.
+
+        Concurrent callers with the same key wait for the first one instead of
+        computing the value again.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+        with self._lock(key):
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+            value = compute()
+            self.put(key, value)
+            self.misses += 1
+        return value
+
+    def memoize(self, func: Optional[Callable] = None, *, namespace: Optional[str] = None, version: str = ''):
+        """
+        Decorator caching a function on its arguments, its module's source and an optional version tag.
+
+        Usage: ``@cache.memoize`` or ``cache.memoize(namespace='shap')(func)``.
+        """
+        def decorate(func):
+            name = namespace or f'{func.__module__}.{func.__qualname__}'
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                key = self.key(name, code_fingerprint(func), version, args, sorted(kwargs.items()))
+                return self.get_or_compute(key, lambda: func(*args, **kwargs))
+            return wrapper
+        return decorate(func) if func is not None else decorate
+
+    def entries(self) -> pd.DataFrame:
+        """Stored entries with their size in bytes and last use time, most recent first."""
+        rows = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(_SUFFIX):
+                try:
+                    stat = os.stat(os.path.join(self.cache_dir, name))
+                except FileNotFoundError:
+                    continue
+                rows.append({'key': name[:-len(_SUFFIX)], 'bytes': stat.st_size,
+                             'last_used': pd.Timestamp(stat.st_mtime, unit='s')})
+        entries = pd.DataFrame(rows, columns=['key', 'bytes', 'last_used'])
+        return entries.sort_values('last_used', ascending=False, ignore_index=True)
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the cache fits max_bytes; return the number removed."""
+        with self._lock('.evict'):
+            entries = self.entries()
+            total = entries['bytes'].sum()
+            removed = 0
+            # Oldest first; the newest entry is always kept.
+            for row in entries.iloc[:0:-1].itertuples():
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(self._path(row.key))
+                except FileNotFoundError:
+                    pass
+                total -= row.bytes
+                removed += 1
+            return removed
+
+    def clear(self) -> None:
+        """Remove every entry and lock file."""
+        for name in os.listdir(self.cache_dir):
+            if name.endswith((_SUFFIX, '.lock')):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except FileNotFoundError:
+                    pass
@@ -1,16 +1,295 @@
 """Utilities for loading and preprocessing data."""
 
+import hashlib
+import operator
 import os
-from typing import Optional
+import re
+import warnings
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 import pandas as pd
 from dotenv import load_dotenv
 
-def load_insurance_data(data_path: Optional[str] = None) -> pd.DataFrame:
+# Bump whenever INSURANCE_SCHEMA changes so stale columnar caches are ignored.
+SCHEMA_VERSION = 1
+
+# Explicit column types for insurance_data.txt. Money columns stay float64 so
+# portfolio totals are unaffected; everything else is sized down.
+INSURANCE_SCHEMA: Dict[str, str] = {
+    'UnderwrittenCoverID': 'Int32',
+    'PolicyID': 'Int32',
+    'TransactionMonth': 'datetime64[ns]',
+    'IsVATRegistered': 'boolean',
+    'Citizenship': 'category',
+    'LegalType': 'category',
+    'Title': 'category',
+    'Language': 'category',
+    'Bank': 'category',
+    'AccountType': 'category',
+    'MaritalStatus': 'category',
+    'Gender': 'category',
+    'Country': 'category',
+    'Province': 'category',
+    'PostalCode': 'Int32',
+    'MainCrestaZone': 'category',
+    'SubCrestaZone': 'category',
+    'ItemType': 'category',
+    'mmcode': 'Int32',
+    'VehicleType': 'category',
+    'RegistrationYear': 'Int16',
+    'make': 'category',
+    'Model': 'category',
+    'Cylinders': 'float32',
+    'cubiccapacity': 'float32',
+    'kilowatts': 'float32',
+    'bodytype': 'category',
+    'NumberOfDoors': 'float32',
+    'VehicleIntroDate': 'category',
+    'CustomValueEstimate': 'float64',
+    'AlarmImmobiliser': 'boolean',
+    'TrackingDevice': 'boolean',
+    'CapitalOutstanding': 'float64',
+    'NewVehicle': 'boolean',
+    'WrittenOff': 'boolean',
+    'Rebuilt': 'boolean',
+    'Converted': 'boolean',
+    'CrossBorder': 'boolean',
+    'NumberOfVehiclesInFleet': 'float32',
+    'SumInsured': 'float64',
+    'TermFrequency': 'category',
+    'CalculatedPremiumPerTerm': 'float64',
+    'ExcessSelected': 'category',
+    'CoverCategory': 'category',
+    'CoverType': 'category',
+    'CoverGroup': 'category',
+    'Section': 'category',
+    'Product': 'category',
+    'StatutoryClass': 'category',
+    'StatutoryRiskType': 'category',
+    'TotalPremium': 'float64',
+    'TotalClaims': 'float64',
+}
+
+_BOOLEAN_TOKENS = {'Yes': True, 'No': False, 'True': True, 'False': False, '1': True, '0': False}
+
+# Rows parsed per block when filtering the text file without a cache.
+_FILTER_CHUNKSIZE = 200_000
+
+_COMPARISONS = {
+    '==': operator.eq, '=': operator.eq, '!=': operator.ne,
+    '<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge,
+}
+
+# A row filter is (column, op, value), e.g. ('Province', '==', 'Gauteng') or
+# ('TransactionMonth', '>=', '2015-01-01'); a list of filters is ANDed, as in
+# the pyarrow/pandas ``read_parquet(filters=...)`` convention.
+Filter = Tuple[str, str, Any]
+
+
+def _read_header(data_path: str) -> list:
+    """Return the column names of a pipe-delimited file without parsing rows."""
+    return pd.read_csv(data_path, sep='|', nrows=0).columns.tolist()
+
+
+def _read_options(header: list, usecols: Optional[List[str]] = None) -> dict:
+    """Build ``pd.read_csv`` keyword arguments from the schema for the given header."""
+    header = [col for col in header if usecols is None or col in usecols]
+    dtype = {}
+    for col in header:
+        kind = INSURANCE_SCHEMA.get(col)
+        if kind == 'category':
+            dtype[col] = 'category'
+        elif kind == 'boolean':
+            # Parsed as text first; tokens are mapped in _apply_schema.
+            dtype[col] = 'string'
+    parse_dates = [col for col in header if INSURANCE_SCHEMA.get(col, '').startswith('datetime')]
+    return {'sep': '|', 'dtype': dtype, 'parse_dates': parse_dates, 'usecols': usecols}
+
+
+def _to_boolean(series: pd.Series) -> pd.Series:
+    """Map Yes/No style tokens to the nullable boolean dtype, keeping unknown vocabularies as category."""
+    values = series.astype('string').str.strip()
+    unknown = values.notna() & ~values.isin(list(_BOOLEAN_TOKENS))
+    if unknown.any():
+        return series.astype('category')
+    return values.map(_BOOLEAN_TOKENS).astype('boolean')
+
+
+def _apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast columns in place to the dtypes declared in INSURANCE_SCHEMA."""
+    for col in df.columns:
+        kind = INSURANCE_SCHEMA.get(col)
+        if kind is None or kind == 'category' or kind.startswith('datetime'):
+            continue
+        if kind == 'boolean':
+            df[col] = _to_boolean(df[col])
+            continue
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+        try:
+            df[col] = df[col].astype(kind)
+        except (TypeError, ValueError):
+            # Non-integral values in a nominally integer column: keep them as floats.
+            df[col] = df[col].astype('float64')
+    return df
+
+
+def _normalize_filters(filters: Optional[Sequence[Filter]]) -> Optional[List[Filter]]:
+    """Validate filter operators and coerce values on date columns to timestamps."""
+    if not filters:
+        return None
+    normalized = []
+    for col, op, value in filters:
+        if op not in _COMPARISONS and op not in ('in', 'not in'):
+            raise ValueError(f"Unsupported filter operator '{op}' on {col}")
+        if INSURANCE_SCHEMA.get(col, '').startswith('datetime'):
+            value = [pd.Timestamp(v) for v in value] if op in ('in', 'not in') else pd.Timestamp(value)
+        normalized.append((col, op, value))
+    return normalized
+
+
+def _filter_mask(df: pd.DataFrame, filters: List[Filter]) -> pd.Series:
+    """Evaluate ANDed (column, op, value) filters on a frame; missing values never match."""
+    mask = pd.Series(True, index=df.index)
+    for col, op, value in filters:
+        series = df[col]
+        if op in ('in', 'not in'):
+            matched = series.isin(list(value))
+            matched = ~matched if op == 'not in' else matched
+            matched &= series.notna()
+        else:
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                series = series.astype(series.cat.categories.dtype)
+            matched = _COMPARISONS[op](series, value)
+        mask &= matched.fillna(False).astype(bool)
+    return mask
+
+
+def _check_columns(requested: Optional[Sequence[str]], available: Sequence[str]) -> None:
+    """Raise ValueError naming any requested column that is not in the dataset."""
+    missing = [col for col in requested or [] if col not in available]
+    if missing:
+        raise ValueError(f"Columns not found in dataset: {missing}")
+
+
+def _needed_columns(header: list, columns: Optional[List[str]],
+                    filters: Optional[List[Filter]]) -> Optional[List[str]]:
+    """Return the columns to parse for a projection plus its filters, or None for all."""
+    needed = list(columns) if columns is not None else list(header)
+    needed += [col for col, _, _ in filters or [] if col not in needed]
+    return needed if len(needed) < len(header) else None
+
+
+def _read_text(data_path: str, header: list, columns: Optional[List[str]],
+               filters: Optional[List[Filter]]) -> pd.DataFrame:
+    """
+    Parse the text file, reading only the needed columns.
+
+    With filters the file is parsed in blocks and non-matching rows are dropped
+    per block, so the unfiltered frame is never held in memory.
+    """
+    options = _read_options(header, _needed_columns(header, columns, filters))
+    if not filters:
+        df = pd.read_csv(data_path, **options)
+        if df.empty:
+            raise ValueError("Loaded dataset is empty")
+        return _apply_schema(df)[columns or df.columns]
+
+    parts, rows_seen = [], 0
+    for chunk in pd.read_csv(data_path, chunksize=_FILTER_CHUNKSIZE, **options):
+        rows_seen += len(chunk)
+        chunk = _apply_schema(chunk)
+        parts.append(chunk.loc[_filter_mask(chunk, filters), columns or chunk.columns])
+    if rows_seen == 0:
+        raise ValueError("Loaded dataset is empty")
+    df = pd.concat(parts, ignore_index=True)
+    # Per-block categoricals can disagree on their categories; re-unify them.
+    for col in df.columns:
+        if INSURANCE_SCHEMA.get(col) == 'category' and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    return df
+
+
+def _read_cache(cache_path: str, columns: Optional[List[str]],
+                filters: Optional[List[Filter]]) -> pd.DataFrame:
+    """Read the Parquet cache with projection and predicates pushed into pyarrow."""
+    import pyarrow.parquet as pq  # pylint: disable=import-outside-toplevel
+    available = pq.read_schema(cache_path).names
+    _check_columns(columns, available)
+    _check_columns([col for col, _, _ in filters or []], available)
+    return pd.read_parquet(cache_path, columns=columns, filters=filters)
+
+
+def _source_fingerprint(data_path: str) -> str:
+    """
+    Identify the contents of the source file cheaply.
+
+    Uses the md5 recorded in the DVC pointer file (``<data_path>.dvc``) when it
+    matches the file on disk, otherwise falls back to the file size and mtime.
+    """
+    size = os.path.getsize(data_path)
+    dvc_path = data_path + '.dvc'
+    if os.path.exists(dvc_path):
+        with open(dvc_path, encoding='utf-8') as f:
+            text = f.read()
+        md5 = re.search(r'md5:\s*([0-9a-f]{32})', text)
+        dvc_size = re.search(r'size:\s*(\d+)', text)
+        if md5 and (dvc_size is None or int(dvc_size.group(1)) == size):
+            return md5.group(1)
+    stat = os.stat(data_path)
+    return hashlib.md5(f'{size}:{stat.st_mtime_ns}'.encode()).hexdigest()
+
+
+def get_cache_path(data_path: str, cache_dir: Optional[str] = None) -> str:
+    """
+    Return the columnar cache file used for a given source file.
+
+    Args:
+        data_path (str): Path to the pipe-delimited source file.
+        cache_dir (str, optional): Cache directory. If None, uses DATA_CACHE_DIR from .env.
+
+    Returns:
+        str: Path of the Parquet cache file keyed on the source fingerprint and schema version.
+    """
+    cache_dir = cache_dir or os.getenv('DATA_CACHE_DIR', 'data/cache')
+    stem = os.path.splitext(os.path.basename(data_path))[0]
+    fingerprint = _source_fingerprint(data_path)
+    return os.path.join(cache_dir, f'{stem}-{fingerprint[:16]}-v{SCHEMA_VERSION}.parquet')
+
+
+def _write_cache(df: pd.DataFrame, cache_path: str) -> None:
+    """Write the typed frame to Parquet atomically, warning instead of failing if pyarrow is missing."""
+    os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+    tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+    try:
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, cache_path)
+    except ImportError as exc:
+        warnings.warn(f"Columnar cache disabled: {exc}")
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_insurance_data(data_path: Optional[str] = None, columns: Optional[Sequence[str]] = None,
+                        filters: Optional[Sequence[Filter]] = None, use_cache: bool = True,
+                        cache_dir: Optional[str] = None) -> pd.DataFrame:
     """
     Load insurance dataset from a text file with pipe (|) delimiter.
 
+    Columns are typed according to INSURANCE_SCHEMA. The typed frame is cached
+    as Parquet keyed on the source md5, so repeat loads skip the text parse.
+    Column projection and row filters are pushed into the Parquet reader (or
+    into a block-wise text parse when the cache is disabled), so unneeded
+    columns and rows are never materialised.
+
     Args:
         data_path (str, optional): Path to the text file. If None, uses DATA_PATH from .env.
+        columns (Sequence[str], optional): Columns to return. If None, returns all columns.
+        filters (Sequence[tuple], optional): ANDed (column, op, value) row filters with op in
+            ==, !=, <, <=, >, >=, in, not in, e.g. [('Province', '==', 'Gauteng'),
+            ('TransactionMonth', '>=', '2015-01-01')].
+        use_cache (bool): Read from / write to the columnar cache.
+        cache_dir (str, optional): Cache directory. If None, uses DATA_CACHE_DIR from .env.
 
     Returns:
         pd.DataFrame: Loaded dataset with date columns parsed.
@@ -21,19 +300,92 @@ def load_insurance_data(data_path: Optional[str] = None) -> pd.DataFrame:
     """
     load_dotenv()
     data_path = data_path or os.getenv('DATA_PATH', 'data/raw/insurance_data.txt')
-    
+
     if not os.path.exists(data_path):
         raise FileNotFoundError(f"Data file not found at {data_path}")
-    
-    df = pd.read_csv(data_path, sep='|', parse_dates=['TransactionMonth'])
-    
-    if df.empty:
-        raise ValueError("Loaded dataset is empty")
-    
-    numerical_cols = ['TotalPremium', 'TotalClaims', 'SumInsured', 'CustomValueEstimate', 
-                      'CalculatedPremiumPerTerm']
-    for col in numerical_cols:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-    
-    return df
+
+    columns = list(columns) if columns is not None else None
+    filters = _normalize_filters(filters)
+
+    cache_path = get_cache_path(data_path, cache_dir) if use_cache else None
+    if cache_path and os.path.exists(cache_path):
+        return _read_cache(cache_path, columns, filters)
+
+    header = _read_header(data_path)
+    _check_columns(columns, header)
+    _check_columns([col for col, _, _ in filters or []], header)
+    if not cache_path:
+        return _read_text(data_path, header, columns, filters)
+
+    # Cache miss: parse everything once so later projections are served from Parquet.
+    df = _read_text(data_path, header, None, None)
+    _write_cache(df, cache_path)
+    if os.path.exists(cache_path):
+        del df
+        return _read_cache(cache_path, columns, filters)
+    if filters:
+        df = df.loc[_filter_mask(df, filters)].reset_index(drop=True)
+    return df[columns] if columns is not None else df
+
+
+def iter_insurance_chunks(data_path: Optional[str] = None, chunksize: int = 100_000,
+                          columns: Optional[Sequence[str]] = None,
+                          filters: Optional[Sequence[Filter]] = None, use_cache: bool = True,
+                          cache_dir: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """
+    Stream the insurance dataset as typed DataFrame chunks in bounded memory.
+
+    Reads record batches from the columnar cache when it exists, otherwise parses
+    the text file block by block. A missing cache is not built here, since that
+    would require materialising the full frame.
+
+    Args:
+        data_path (str, optional): Path to the text file. If None, uses DATA_PATH from .env.
+        chunksize (int): Maximum number of rows per chunk.
+        columns (Sequence[str], optional): Columns to return. If None, returns all columns.
+        filters (Sequence[tuple], optional): ANDed (column, op, value) row filters,
+            as for load_insurance_data.
+        use_cache (bool): Read from the columnar cache if it exists.
+        cache_dir (str, optional): Cache directory. If None, uses DATA_CACHE_DIR from .env.
+
+    Yields:
+        pd.DataFrame: Non-empty chunks typed according to INSURANCE_SCHEMA.
+
+    Raises:
+        FileNotFoundError: If the data file is not found.
+        ValueError: If a requested column does not exist or a filter is invalid.
+    """
+    load_dotenv()
+    data_path = data_path or os.getenv('DATA_PATH', 'data/raw/insurance_data.txt')
+
+    if not os.path.exists(data_path):
+        raise FileNotFoundError(f"Data file not found at {data_path}")
+
+    columns = list(columns) if columns is not None else None
+    filters = _normalize_filters(filters)
+
+    cache_path = get_cache_path(data_path, cache_dir) if use_cache else None
+    if cache_path and os.path.exists(cache_path):
+        import pyarrow.dataset as ds  # pylint: disable=import-outside-toplevel
+        import pyarrow.parquet as pq  # pylint: disable=import-outside-toplevel
+        dataset = ds.dataset(cache_path, format='parquet')
+        _check_columns(columns, dataset.schema.names)
+        _check_columns([col for col, _, _ in filters or []], dataset.schema.names)
+        expression = pq.filters_to_expression(filters) if filters else None
+        for batch in dataset.to_batches(columns=columns, filter=expression, batch_size=chunksize):
+            if batch.num_rows:
+                yield batch.to_pandas()
+        return
+
+    header = _read_header(data_path)
+    _check_columns(columns, header)
+    _check_columns([col for col, _, _ in filters or []], header)
+    options = _read_options(header, _needed_columns(header, columns, filters))
+    for chunk in pd.read_csv(data_path, chunksize=chunksize, **options):
+        chunk = _apply_schema(chunk)
+        if filters:
+            chunk = chunk.loc[_filter_mask(chunk, filters)]
+        if columns is not None:
+            chunk = chunk[columns]
+        if not chunk.empty:
+            yield chunk
@@ -1,59 +1,279 @@
 import pandas as pd
 import numpy as np
+import joblib
+from scipy import sparse as sp
 from sklearn.preprocessing import LabelEncoder
+from .cache import code_fingerprint
 
 class DataPreprocessor:
-    def __init__(self):
+    """
+    Impute, engineer and encode insurance data.
+
+    ``fit`` learns impute values, category vocabularies and the output column
+    layout once; ``transform`` then maps any batch into that fixed layout without
+    rescanning it. The legacy step methods still work unfitted, recomputing their
+    statistics on the frame they are given.
+    """
+
+    def __init__(self, categorical_cols=None, max_cardinality=50):
         # Define categorical columns (adjust based on your dataset)
-        self.categorical_cols = ['Region', 'VehicleType', 'CoverageType', 'PolicyType']  # Example columns
-        self.max_cardinality = 50  # Maximum unique values to one-hot encode
+        self.categorical_cols = categorical_cols or ['Region', 'VehicleType', 'CoverageType', 'PolicyType']  # Example columns
+        self.max_cardinality = max_cardinality  # Maximum unique values to one-hot encode
+        self.fill_values_ = None
+        self.encoders_ = None
+        self.columns_ = None
 
-    def handle_missing_data(self, df):
-        """Impute missing values with median for numerical and mode for categorical, with fallback."""
+    @property
+    def is_fitted(self):
+        """Whether fit has learned the preprocessing state."""
+        return self.columns_ is not None
+
+    @staticmethod
+    def _learn_fill_values(df):
+        """Median for numerical columns (0 if all NaN), mode for others ('Unknown' if no mode)."""
+        fill_values = {}
         for col in df.columns:
-            if df[col].dtype in ['int64', 'float64']:
-                # Use median for numerical, fallback to 0 if all NaN
-                df[col] = df[col].fillna(df[col].median())
+            if pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col]):
+                median = df[col].median()
+                fill_values[col] = 0 if pd.isna(median) else median
             else:
-                # Use mode for categorical, fallback to 'Unknown' if no mode
-                mode_value = df[col].mode()[0] if not df[col].mode().empty else 'Unknown'
-                df[col] = df[col].fillna(mode_value)
+                mode = df[col].mode()
+                fill_values[col] = mode.iloc[0] if not mode.empty else 'Unknown'
+        return fill_values
+
+    @staticmethod
+    def _fill(df, fill_values):
+        """Fill missing values in place from a column -> value mapping."""
+        for col, value in fill_values.items():
+            if col not in df.columns or not df[col].hasnans:
+                continue
+            if isinstance(df[col].dtype, pd.CategoricalDtype) and value not in df[col].cat.categories:
+                df[col] = df[col].cat.add_categories([value])
+            df[col] = df[col].fillna(value)
         return df
 
+    def handle_missing_data(self, df):
+        """Impute missing values with median for numerical and mode for categorical, with fallback."""
+        fill_values = self.fill_values_ if self.is_fitted else self._learn_fill_values(df)
+        return self._fill(df, fill_values)
+
     def feature_engineering(self, df):
         """Create new features like PolicyAge and PremiumToClaimsRatio."""
-        df['PolicyAge'] = pd.to_datetime('2025-06-17') - pd.to_datetime(df['RegistrationYear'], errors='coerce')
-        df['PolicyAge'] = df['PolicyAge'].dt.days // 365  # Approximate years
-        df['PremiumToClaimsRatio'] = df['TotalPremium'] / (df['TotalClaims'] + 1)  # Avoid division by zero
+        if 'RegistrationYear' in df.columns:
+            df['PolicyAge'] = pd.to_datetime('2025-06-17') - pd.to_datetime(df['RegistrationYear'], errors='coerce')
+            df['PolicyAge'] = df['PolicyAge'].dt.days // 365  # Approximate years
+        if 'TotalPremium' in df.columns and 'TotalClaims' in df.columns:
+            df['PremiumToClaimsRatio'] = df['TotalPremium'] / (df['TotalClaims'] + 1)  # Avoid division by zero
         return df
 
+    def _learn_encoders(self, df):
+        """Choose one-hot or label encoding per column and record its vocabulary."""
+        encoders = {}
+        for col in self.categorical_cols:
+            if col not in df.columns:
+                continue
+            values = df[col].dropna()
+            if values.nunique() > self.max_cardinality:
+                print(f"Warning: {col} has {values.nunique()} unique values, exceeding max_cardinality {self.max_cardinality}. Using LabelEncoder instead.")
+                encoders[col] = ('label', LabelEncoder().fit(values.astype(str)).classes_.tolist())
+            else:
+                categories = values.unique().tolist()
+                try:
+                    categories = sorted(categories)
+                except TypeError:
+                    categories = sorted(categories, key=str)
+                encoders[col] = ('onehot', categories)
+        high_cardinality_cols = [col for col, (kind, _) in encoders.items() if kind == 'label']
+        if high_cardinality_cols:
+            print(f"High cardinality columns handled: {high_cardinality_cols}")
+        return encoders
+
+    @staticmethod
+    def _one_hot_names(col, categories):
+        """Dummy column names for a one-hot column, first level dropped as in get_dummies(drop_first=True)."""
+        return [f'{col}_{category}' for category in categories[1:]]
+
+    @staticmethod
+    def _codes(series, categories):
+        """Positions of values in a learned vocabulary, -1 for missing or unseen values."""
+        index = pd.Index(categories)
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Translate the (small) category table once instead of hashing every row.
+            lookup = np.append(index.get_indexer(series.cat.categories), -1)
+            return lookup[series.cat.codes.to_numpy()]
+        return index.get_indexer(series)
+
+    def _encode(self, df, encoders, sparse):
+        """Encode categorical columns from learned vocabularies via category codes."""
+        dummy_frames = []
+        for col, (kind, categories) in encoders.items():
+            if col not in df.columns:
+                continue
+            if kind == 'label':
+                # Unseen labels map to -1.
+                df[col] = self._codes(df[col].astype(str), categories)
+                continue
+            codes = self._codes(df[col], categories)
+            onehot = codes[:, None] == np.arange(1, len(categories))[None, :]
+            names = self._one_hot_names(col, categories)
+            if sparse:
+                dummies = pd.DataFrame({name: pd.arrays.SparseArray(onehot[:, i], fill_value=False)
+                                        for i, name in enumerate(names)}, index=df.index)
+            else:
+                dummies = pd.DataFrame(onehot, columns=names, index=df.index)
+            dummy_frames.append(dummies)
+            df = df.drop(columns=[col])
+        return pd.concat([df] + dummy_frames, axis=1) if dummy_frames else df
+
     def encode_categorical(self, df, sparse=True):
         """Apply one-hot encoding to categorical variables with cardinality check."""
-        encoded_df = df.copy()
-        high_cardinality_cols = []
+        encoders = self.encoders_ if self.is_fitted else self._learn_encoders(df)
+        return self._encode(df.copy(), encoders, sparse)
 
-        # Identify high-cardinality columns
-        for col in self.categorical_cols:
+    def fit(self, df):
+        """
+        Learn impute values, category vocabularies and the output column layout.
+
+        Args:
+            df (pd.DataFrame): Training data; it is not modified.
+
+        Returns:
+            DataPreprocessor: The fitted preprocessor.
+        """
+        self.fill_values_ = self._learn_fill_values(df)
+        engineered = self.feature_engineering(self._fill(df.copy(deep=False), self.fill_values_))
+        self.encoders_ = self._learn_encoders(engineered)
+        columns = []
+        for col in engineered.columns:
+            kind = self.encoders_.get(col, ('passthrough',))[0]
+            if kind != 'onehot':
+                columns.append(col)
+        for col, (kind, categories) in self.encoders_.items():
+            if kind == 'onehot':
+                columns.extend(self._one_hot_names(col, categories))
+        self.columns_ = columns
+        return self
+
+    def transform(self, df, sparse=True):
+        """
+        Map a batch into the fitted layout using the learned state only.
+
+        Missing columns are added as NaN, unseen categories encode as all-zero
+        dummies (one-hot) or -1 (label), and extra columns are dropped.
+
+        Args:
+            df (pd.DataFrame): Data to transform; it is not modified.
+            sparse (bool): Store one-hot columns as pandas sparse arrays.
+
+        Returns:
+            pd.DataFrame: Preprocessed data with columns in the fitted order.
+        """
+        if not self.is_fitted:
+            raise ValueError("DataPreprocessor is not fitted; call fit first")
+        df = self.feature_engineering(self._fill(df.copy(deep=False), self.fill_values_))
+        df = self._encode(df, self.encoders_, sparse)
+        return df.reindex(columns=self.columns_)
+
+    def transform_sparse(self, df):
+        """
+        Build a CSR design matrix in one pass from category codes.
+
+        Numeric passthrough and label-encoded columns come first, followed by the
+        one-hot blocks, whose nonzeros are placed directly from the codes without
+        materialising dummy columns. Non-numeric passthrough columns (strings,
+        dates) are left out.
+
+        Args:
+            df (pd.DataFrame): Data to transform; it is not modified.
+
+        Returns:
+            Tuple[sp.csr_matrix, pd.Index]: float64 design matrix and its feature names.
+        """
+        if not self.is_fitted:
+            raise ValueError("DataPreprocessor is not fitted; call fit first")
+        df = self.feature_engineering(self._fill(df.copy(deep=False), self.fill_values_))
+        n_rows = len(df)
+        names, blocks = [], []
+
+        onehot_names = {name for col, (kind, categories) in self.encoders_.items() if kind == 'onehot'
+                        for name in self._one_hot_names(col, categories)}
+        dense_cols = []
+        for col in self.columns_:
+            kind = self.encoders_.get(col, ('passthrough',))[0]
+            if col in onehot_names:
+                continue
+            if kind == 'label':
+                source = df[col] if col in df.columns else pd.Series(np.nan, index=df.index)
+                df[col] = self._codes(source.astype(str), self.encoders_[col][1])
+                dense_cols.append(col)
+            elif kind == 'passthrough' and (col not in df.columns or (
+                    pd.api.types.is_numeric_dtype(df[col]) or pd.api.types.is_bool_dtype(df[col]))):
+                dense_cols.append(col)
+        if dense_cols:
+            dense = df.reindex(columns=dense_cols).astype('float64').to_numpy()
+            blocks.append(sp.csr_matrix(dense))
+            names.extend(dense_cols)
+
+        rows, cols, offset = [], [], 0
+        for col, (kind, categories) in self.encoders_.items():
+            if kind != 'onehot':
+                continue
+            width = len(categories) - 1
             if col in df.columns:
-                unique_values = df[col].nunique()
-                if unique_values > self.max_cardinality:
-                    high_cardinality_cols.append(col)
-                    print(f"Warning: {col} has {unique_values} unique values, exceeding max_cardinality {self.max_cardinality}. Using LabelEncoder instead.")
-                    le = LabelEncoder()
-                    encoded_df[col] = le.fit_transform(df[col].astype(str))
-                else:
-                    # One-hot encode low-cardinality columns
-                    dummies = pd.get_dummies(df[col], prefix=col, drop_first=True, sparse=sparse)
-                    encoded_df = pd.concat([encoded_df.drop(columns=[col]), dummies], axis=1)
+                codes = self._codes(df[col], categories)
+                present = np.flatnonzero(codes >= 1)
+                rows.append(present)
+                cols.append(offset + codes[present] - 1)
+            names.extend(self._one_hot_names(col, categories))
+            offset += width
+        if offset:
+            rows = np.concatenate(rows) if rows else np.array([], dtype=np.int64)
+            cols = np.concatenate(cols) if cols else np.array([], dtype=np.int64)
+            blocks.append(sp.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n_rows, offset)))
 
-        if high_cardinality_cols:
-            print(f"High cardinality columns handled: {high_cardinality_cols}")
+        matrix = sp.hstack(blocks, format='csr') if blocks else sp.csr_matrix((n_rows, 0))
+        return matrix, pd.Index(names)
+
+    def fit_transform(self, df, sparse=True):
+        """Fit on a frame and transform it."""
+        return self.fit(df).transform(df, sparse=sparse)
+
+    def preprocess(self, df, cache=None):
+        """
+        Full preprocessing pipeline.
+
+        With an ArtifactCache, the fitted state and output are stored under the
+        input content, the settings and this module's code, and restored on a hit.
+        """
+        if cache is None:
+            return self.fit_transform(df)
+        key = cache.key('preprocess', df, self.categorical_cols, self.max_cardinality, code_fingerprint(DataPreprocessor))
+
+        def compute():
+            output = self.fit_transform(df)
+            return (self.fill_values_, self.encoders_, self.columns_), output
+
+        (self.fill_values_, self.encoders_, self.columns_), output = cache.get_or_compute(key, compute)
+        return output
 
-        return encoded_df
+    def save(self, path):
+        """Persist the fitted state to disk with joblib."""
+        if not self.is_fitted:
+            raise ValueError("DataPreprocessor is not fitted; call fit first")
+        joblib.dump({
+            'categorical_cols': self.categorical_cols,
+            'max_cardinality': self.max_cardinality,
+            'fill_values': self.fill_values_,
+            'encoders': self.encoders_,
+            'columns': self.columns_,
+        }, path)
 
-    def preprocess(self, df):
-        """Full preprocessing pipeline."""
-        df = self.handle_missing_data(df)
-        df = self.feature_engineering(df)
-        df = self.encode_categorical(df)
-        return df
\ No newline at end of file
+    @classmethod
+    def load(cls, path):
+        """Load a preprocessor saved with save."""
+        state = joblib.load(path)
+        preprocessor = cls(state['categorical_cols'], state['max_cardinality'])
+        preprocessor.fill_values_ = state['fill_values']
+        preprocessor.encoders_ = state['encoders']
+        preprocessor.columns_ = state['columns']
+        return preprocessor
@@ -1,16 +1,175 @@
 import pandas as pd
-import shap
 import numpy as np
+from joblib import Parallel, delayed
+from scipy import sparse as sp
+from .cache import code_fingerprint
 
-def shap_analysis(model, X_train, X_test):
-      """Perform SHAP analysis to identify top features."""
-      explainer = shap.Explainer(model, X_train)
-      shap_values = explainer(X_test)
+def shap_analysis(model, X_train, X_test, cache=None):
+      """Perform SHAP analysis to identify top features; with an ArtifactCache, SHAP values are reused."""
+      import shap
+      def compute():
+            explainer = shap.Explainer(model, X_train)
+            return explainer(X_test)
+      if cache is None:
+            shap_values = compute()
+      else:
+            key = cache.key('shap-analysis', model, X_train, X_test, code_fingerprint(shap_analysis), shap.__version__)
+            shap_values = cache.get_or_compute(key, compute)
       shap_summary = shap.summary_plot(shap_values, X_test, plot_type="bar")
       return shap_values, shap_summary
 
-def get_top_features(shap_values, feature_names, top_n=10):
+def _take_rows(X, rows):
+      """Select rows from a DataFrame, array or sparse matrix as a dense array."""
+      if isinstance(X, pd.DataFrame):
+            return X.iloc[rows].to_numpy(dtype=float)
+      subset = X[rows]
+      return subset.toarray() if sp.issparse(subset) else np.asarray(subset, dtype=float)
+
+def _is_tree_model(model):
+      """Whether a model can use the tree-path SHAP algorithm."""
+      return (hasattr(model, 'tree_') or hasattr(model, 'estimators_')
+              or type(model).__module__.startswith('xgboost'))
+
+def summarize_background(X, size=100, method='kmeans', random_state=42):
+      """
+      Summarise training data into a small background set for SHAP.
+
+      Args:
+            X: Training features (DataFrame, array or sparse matrix).
+            size (int): Number of background rows.
+            method (str): 'kmeans' for k-means centres of a row sample, 'random' for a row sample.
+            random_state (int): Seed for the row sample.
+
+      Returns:
+            np.ndarray: Background rows.
+      """
+      rng = np.random.default_rng(random_state)
+      n_rows = X.shape[0]
+      if method == 'random':
+            return _take_rows(X, np.sort(rng.choice(n_rows, min(size, n_rows), replace=False)))
+      if method != 'kmeans':
+            raise ValueError("method must be 'kmeans' or 'random'")
+      # Cluster a bounded sample rather than the full training set.
+      sample = _take_rows(X, np.sort(rng.choice(n_rows, min(size * 20, n_rows), replace=False)))
+      import shap
+      return shap.kmeans(sample, min(size, len(sample))).data
+
+def sample_rows(n_rows, n_samples, strata=None, random_state=42):
+      """
+      Pick row positions to explain, stratified so that rare strata (e.g. claimants) are kept.
+
+      Args:
+            n_rows (int): Number of candidate rows.
+            n_samples (int): Number of rows to return.
+            strata (array-like, optional): Stratum label per row; allocation is proportional
+                  with at least one row per stratum.
+            random_state (int): Seed.
+
+      Returns:
+            np.ndarray: Sorted row positions.
+      """
+      rng = np.random.default_rng(random_state)
+      if n_samples >= n_rows:
+            return np.arange(n_rows)
+      if strata is None:
+            return np.sort(rng.choice(n_rows, n_samples, replace=False))
+      codes = np.unique(np.asarray(strata), return_inverse=True)[1]
+      counts = np.bincount(codes)
+      quota = np.maximum(1, np.round(counts / n_rows * n_samples)).astype(int)
+      chosen = [rng.choice(np.flatnonzero(codes == k), min(quota[k], counts[k]), replace=False)
+                for k in range(len(counts))]
+      return np.sort(np.concatenate(chosen))
+
+def select_explainer(model, background=None):
+      """
+      Choose a SHAP explainer by model type.
+
+      Tree models use the tree-path-dependent TreeExplainer (no background
+      needed), linear models the LinearExplainer on the background, and anything
+      else the model-agnostic explainer on the background.
+      """
+      import shap
+      if _is_tree_model(model):
+            return shap.TreeExplainer(model, feature_perturbation='tree_path_dependent')
+      if background is None:
+            raise ValueError("A background set is required for non-tree models")
+      if hasattr(model, 'coef_'):
+            return shap.LinearExplainer(model, background)
+      predict = model.predict_proba if hasattr(model, 'predict_proba') else model.predict
+      return shap.Explainer(predict, background)
+
+def _explain_batch(explainer, rows):
+      """SHAP values and base values for one batch, keeping the positive class for classifiers."""
+      explanation = explainer(rows)
+      values, base_values = explanation.values, np.asarray(explanation.base_values)
+      if values.ndim == 3:
+            values, base_values = values[..., -1], base_values[..., -1]
+      return values, np.broadcast_to(base_values, (len(rows),))
+
+def fast_shap_values(model, X_train, X_test, feature_names=None, n_explain=1000, background_size=100,
+                     background_method='kmeans', strata=None, batch_size=256, n_jobs=1, random_state=42,
+                     cache=None):
+      """
+      Compute SHAP values for a sample of rows without plotting.
+
+      Args:
+            model: Fitted model.
+            X_train: Training features, only used to build the background set for non-tree models.
+            X_test: Rows to explain (DataFrame, array or sparse matrix).
+            feature_names (list, optional): Names for array/sparse input; taken from DataFrame columns otherwise.
+            n_explain (int): Number of rows of X_test to explain.
+            background_size (int): Size of the summarised background set.
+            background_method (str): 'kmeans' or 'random'.
+            strata (array-like, optional): Per-row labels of X_test for stratified sampling.
+            batch_size (int): Rows per explainer call.
+            n_jobs (int): Threads evaluating batches in parallel.
+            random_state (int): Seed for sampling.
+            cache (ArtifactCache, optional): Reuse the explanation for the same model, data and settings.
+
+      Returns:
+            shap.Explanation: Values, base values, data and feature names of the explained rows.
+      """
+      import shap
+      if cache is not None:
+            # X_train only matters through the background set of non-tree models.
+            key = cache.key('fast-shap', model, None if _is_tree_model(model) else X_train, X_test, feature_names,
+                            n_explain, background_size, background_method, strata, random_state,
+                            code_fingerprint(fast_shap_values), shap.__version__)
+            return cache.get_or_compute(key, lambda: fast_shap_values(
+                  model, X_train, X_test, feature_names, n_explain, background_size, background_method,
+                  strata, batch_size, n_jobs, random_state))
+      if feature_names is None and isinstance(X_test, pd.DataFrame):
+            feature_names = X_test.columns.tolist()
+      background = None
+      if not _is_tree_model(model):
+            background = summarize_background(X_train, background_size, background_method, random_state)
+      explainer = select_explainer(model, background)
+      rows = _take_rows(X_test, sample_rows(X_test.shape[0], n_explain, strata, random_state))
+      batches = [rows[start:start + batch_size] for start in range(0, len(rows), batch_size)]
+      results = Parallel(n_jobs=n_jobs, prefer='threads')(delayed(_explain_batch)(explainer, batch) for batch in batches)
+      return shap.Explanation(values=np.concatenate([values for values, _ in results]),
+                              base_values=np.concatenate([base for _, base in results]),
+                              data=rows, feature_names=feature_names)
+
+def plot_shap_summary(shap_values, max_display=20, save_path=None, show=True):
+      """Render a bar summary of SHAP values computed separately, optionally saving it; show=False closes it instead."""
+      import matplotlib.pyplot as plt
+      import shap
+      shap.summary_plot(shap_values, plot_type="bar", max_display=max_display, show=False)
+      if save_path:
+            plt.savefig(save_path, bbox_inches='tight')
+      if show:
+            plt.show()
+      else:
+            plt.close()
+
+def get_top_features(shap_values, feature_names=None, top_n=10):
       """Extract top N features based on mean absolute SHAP value."""
-      vals = np.abs(shap_values.values).mean(0)
+      vals = np.abs(getattr(shap_values, 'values', shap_values))
+      if vals.ndim == 3:
+            vals = vals[..., -1]
+      vals = vals.mean(0)
+      if feature_names is None:
+            feature_names = getattr(shap_values, 'feature_names', None) or [f'feature_{i}' for i in range(len(vals))]
       feature_importance = pd.DataFrame(list(zip(feature_names, vals)), columns=['feature_name', 'mean_shap_value'])
-      return feature_importance.sort_values('mean_shap_value', ascending=False).head(top_n)
\ No newline at end of file
+      return feature_importance.sort_values('mean_shap_value', ascending=False).head(top_n)
@@ -1,45 +1,228 @@
+import os
+import time
 import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from scipy import sparse as sp
+from sklearn.base import clone
 from sklearn.linear_model import LinearRegression, LogisticRegression
 from sklearn.tree import DecisionTreeRegressor, DecisionTreeClassifier
 from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
 from xgboost import XGBRegressor, XGBClassifier
 from sklearn.metrics import mean_squared_error, r2_score, accuracy_score, precision_score, recall_score, f1_score
 from sklearn.model_selection import train_test_split
+from .cache import code_fingerprint
+from .profiling import PeakMemorySampler
+from .tuning import SEARCH_SPACES, random_folds, time_folds, tune_model
+
+# Models whose n_jobs controls real intra-model parallelism.
+_PARALLEL_MODELS = (RandomForestRegressor, RandomForestClassifier, XGBRegressor, XGBClassifier)
+
+def to_model_matrix(X):
+    """
+    Convert model input without densifying sparse data.
+
+    scipy sparse matrices are returned as CSR; DataFrames holding pandas sparse
+    columns become CSR with the columns in X.columns order, so feature names
+    taken from the frame still line up; anything else is passed through unchanged.
+    """
+    if sp.issparse(X):
+        return X.tocsr()
+    if isinstance(X, pd.DataFrame):
+        is_sparse = [isinstance(dtype, pd.SparseDtype) for dtype in X.dtypes]
+        if any(is_sparse):
+            # Convert each run of adjacent dense or sparse columns in one call.
+            blocks, start = [], 0
+            for end in range(1, len(is_sparse) + 1):
+                if end == len(is_sparse) or is_sparse[end] != is_sparse[start]:
+                    block = X.iloc[:, start:end]
+                    blocks.append(block.sparse.to_coo().astype('float64') if is_sparse[start]
+                                  else sp.csr_matrix(block.astype('float64').to_numpy()))
+                    start = end
+            return sp.hstack(blocks, format='csr')
+    return X
+
+def _severity_metrics(y_test, y_pred):
+    """RMSE and R² of a severity prediction."""
+    return {'rmse': np.sqrt(mean_squared_error(y_test, y_pred)), 'r2': r2_score(y_test, y_pred)}
+
+def _probability_metrics(y_test, y_pred):
+    """Accuracy, precision, recall and F1 of a claim/no-claim prediction."""
+    return {'accuracy': accuracy_score(y_test, y_pred), 'precision': precision_score(y_test, y_pred),
+            'recall': recall_score(y_test, y_pred), 'f1': f1_score(y_test, y_pred)}
+
+def _fit_and_score(task, model_name, model, X_train, X_test, y_train, y_test):
+    """Fit one model and record its metrics, fit/predict wall time and peak RSS growth."""
+    with PeakMemorySampler() as memory:
+        start = time.perf_counter()
+        model.fit(X_train, y_train)
+        fit_time = time.perf_counter() - start
+        start = time.perf_counter()
+        y_pred = model.predict(X_test)
+        predict_time = time.perf_counter() - start
+    metrics = _severity_metrics(y_test, y_pred) if task == 'severity' else _probability_metrics(y_test, y_pred)
+    peak = memory.peak_delta_bytes
+    row = {'task': task, 'model': model_name, **metrics, 'fit_time_s': fit_time,
+           'predict_time_s': predict_time, 'peak_memory_mb': peak / 2 ** 20 if peak is not None else np.nan}
+    return row, model
 
 class ModelEvaluator:
     """Class to evaluate and train machine learning models for severity and probability prediction."""
 
-    def __init__(self):
+    def __init__(self, n_jobs=None):
         """Initialize with model dictionaries for severity and probability."""
         self.severity_models = {
             'LinearRegression': LinearRegression(),
             'DecisionTree': DecisionTreeRegressor(random_state=42),
-            'RandomForest': RandomForestRegressor(random_state=42),
-            'XGBoost': XGBRegressor(random_state=42)
+            'RandomForest': RandomForestRegressor(random_state=42, n_jobs=n_jobs),
+            'XGBoost': XGBRegressor(random_state=42, n_jobs=n_jobs)
         }
         self.probability_models = {
             'LogisticRegression': LogisticRegression(class_weight='balanced', max_iter=1000, random_state=42),
             'DecisionTree': DecisionTreeClassifier(max_depth=5, random_state=42),
-            'RandomForest': RandomForestClassifier(n_estimators=50, max_depth=5, random_state=42),
-            'XGBoost': XGBClassifier(n_estimators=50, max_depth=3, random_state=42)
+            'RandomForest': RandomForestClassifier(n_estimators=50, max_depth=5, random_state=42, n_jobs=n_jobs),
+            'XGBoost': XGBClassifier(n_estimators=50, max_depth=3, random_state=42, n_jobs=n_jobs)
         }
+        self.tuning_results = {}
 
     def train_evaluate_severity(self, X_train, X_test, y_train, y_test, model_name):
         """Train and evaluate a severity model."""
         model = self.severity_models[model_name]
+        X_train, X_test = to_model_matrix(X_train), to_model_matrix(X_test)
         model.fit(X_train, y_train)
         y_pred = model.predict(X_test)
-        rmse = np.sqrt(mean_squared_error(y_test, y_pred))
-        r2 = r2_score(y_test, y_pred)
-        return rmse, r2, model
+        metrics = _severity_metrics(y_test, y_pred)
+        return metrics['rmse'], metrics['r2'], model
 
     def train_evaluate_probability(self, X_train, X_test, y_train, y_test, model_name):
         """Train and evaluate a probability model."""
         model = self.probability_models[model_name]
+        X_train, X_test = to_model_matrix(X_train), to_model_matrix(X_test)
         model.fit(X_train, y_train)
         y_pred = model.predict(X_test)
-        accuracy = accuracy_score(y_test, y_pred)
-        precision = precision_score(y_test, y_pred)
-        recall = recall_score(y_test, y_pred)
-        f1 = f1_score(y_test, y_pred)
-        return accuracy, precision, recall, f1, model
\ No newline at end of file
+        metrics = _probability_metrics(y_test, y_pred)
+        return metrics['accuracy'], metrics['precision'], metrics['recall'], metrics['f1'], model
+
+    def run_all(self, severity_data=None, probability_data=None, n_jobs=-1, memmap_dir=None, cache=None):
+        """
+        Train every severity and probability model concurrently and compare cost and quality.
+
+        Training data is converted once and shared read-only with the worker
+        processes: arrays above 1 MB are memory-mapped by joblib instead of being
+        copied into each worker. The core budget is split between concurrent
+        models and the n_jobs of the ensemble models inside them.
+
+        Args:
+            severity_data (tuple, optional): (X_train, X_test, y_train, y_test) for severity models.
+            probability_data (tuple, optional): (X_train, X_test, y_train, y_test) for probability models.
+            n_jobs (int): Total core budget; -1 uses all cores.
+            memmap_dir (str, optional): Folder for the memory-mapped arrays (joblib default if None).
+            cache (ArtifactCache, optional): Reuse fitted models and their metrics for unchanged
+                data, model parameters and code; only models whose inputs changed are trained.
+
+        Returns:
+            pd.DataFrame: One row per model with its metrics, fit_time_s, predict_time_s,
+                peak_memory_mb (peak RSS growth of the worker while fitting and predicting) and
+                cached (whether the row was served from the cache, with its original costs).
+                Fitted models replace the entries in severity_models / probability_models.
+        """
+        jobs = []
+        for task, data, models in (('severity', severity_data, self.severity_models),
+                                   ('probability', probability_data, self.probability_models)):
+            if data is None:
+                continue
+            X_train, X_test, y_train, y_test = data
+            shared = (to_model_matrix(X_train), to_model_matrix(X_test), np.asarray(y_train), np.asarray(y_test))
+            data_key = cache.key('model-data', shared) if cache is not None else None
+            jobs.extend((task, name, model, shared, data_key) for name, model in models.items())
+        if not jobs:
+            raise ValueError("Provide severity_data and/or probability_data")
+
+        outputs, keys = {}, {}
+        if cache is not None:
+            for i, (task, name, model, _, data_key) in enumerate(jobs):
+                # n_jobs only changes speed, so it is left out of the key.
+                params = {k: v for k, v in model.get_params().items() if k != 'n_jobs'}
+                keys[i] = cache.key('model-fit', task, name, type(model).__name__, params, data_key,
+                                    code_fingerprint(ModelEvaluator))
+                cached = cache.get(keys[i])
+                if cached is not None:
+                    outputs[i] = cached
+                    cache.hits += 1
+        pending = [i for i in range(len(jobs)) if i not in outputs]
+
+        budget = os.cpu_count() if n_jobs is None or n_jobs < 0 else n_jobs
+        workers = max(1, min(len(pending), budget))
+        threads_per_model = max(1, budget // workers)
+        tasks = []
+        for i in pending:
+            task, name, model, shared, _ = jobs[i]
+            model = clone(model)
+            if isinstance(model, _PARALLEL_MODELS):
+                model.set_params(n_jobs=threads_per_model)
+            tasks.append(delayed(_fit_and_score)(task, name, model, *shared))
+        if tasks:
+            fitted = Parallel(n_jobs=workers, max_nbytes='1M', mmap_mode='r', temp_folder=memmap_dir)(tasks)
+            for i, output in zip(pending, fitted):
+                outputs[i] = output
+                if cache is not None:
+                    cache.put(keys[i], output)
+                    cache.misses += 1
+
+        rows = []
+        for i, (task, name, _, _, _) in enumerate(jobs):
+            row, model = outputs[i]
+            (self.severity_models if task == 'severity' else self.probability_models)[name] = model
+            rows.append({**row, 'cached': i not in pending})
+        return pd.DataFrame(rows)
+
+    def tune(self, task, X, y, months=None, model_names=None, method='hyperband', n_splits=3, n_jobs=-1,
+             search_spaces=None, random_state=42, **kwargs):
+        """
+        Tune the models of one task under a fixed compute budget and keep the best settings.
+
+        Candidates are sampled from SEARCH_SPACES (or search_spaces) and raced
+        with successive halving / Hyperband on growing row subsamples, so poor
+        settings are dropped after cheap fits; XGBoost stops early on a slice of
+        its training rows. Trials run in parallel within the n_jobs core budget.
+
+        Args:
+            task (str): 'severity' (RMSE) or 'probability' (F1).
+            X: Feature matrix (DataFrame with sparse columns, array or CSR).
+            y: Target.
+            months (array-like, optional): TransactionMonth per row; gives expanding-window time
+                folds instead of shuffled K-fold.
+            model_names (Sequence[str], optional): Models to tune; every model with a search space if None.
+            method (str): 'hyperband' or 'halving'.
+            n_splits (int): Cross-validation folds.
+            n_jobs (int): Total core budget; -1 uses all cores.
+            search_spaces (Dict, optional): Model name -> parameter space, overriding SEARCH_SPACES[task].
+            random_state (int): Seed of sampling, subsamples and folds.
+            **kwargs: Passed to the search (eta, min_rows, early_stopping_rounds, ...); n_candidates and
+                min_fraction only apply to method='halving', as Hyperband sets them per bracket.
+
+        Returns:
+            pd.DataFrame: One row per tuned model with cv_rmse or cv_f1, n_trials, tune_time_s and
+                best_params. Refit models replace the entries in severity_models / probability_models,
+                and full results (with the trials table) are kept in tuning_results[(task, name)].
+        """
+        if task not in ('severity', 'probability'):
+            raise ValueError("task must be 'severity' or 'probability'")
+        models = self.severity_models if task == 'severity' else self.probability_models
+        spaces = search_spaces if search_spaces is not None else SEARCH_SPACES[task]
+        names = [name for name in (model_names or models) if name in spaces]
+        if not names:
+            raise ValueError(f"No search space for models {list(model_names or models)}")
+        X, y = to_model_matrix(X), np.asarray(y)
+        folds = time_folds(months, n_splits) if months is not None else random_folds(len(y), n_splits, random_state)
+        metric = 'cv_rmse' if task == 'severity' else 'cv_f1'
+        rows = []
+        for name in names:
+            result = tune_model(models[name], spaces[name], X, y, task, folds, method, n_jobs=n_jobs,
+                                random_state=random_state, **kwargs)
+            models[name] = result['estimator']
+            self.tuning_results[(task, name)] = result
+            rows.append({'task': task, 'model': name, metric: result['best_rmse' if task == 'severity' else 'best_f1'],
+                         'n_trials': len(result['trials']), 'tune_time_s': result['tune_time_s'],
+                         'best_params': result['best_params']})
+        return pd.DataFrame(rows)
@@ -0,0 +1,83 @@
+"""Lightweight resource measurement helpers."""
+
+import os
+import sys
+import threading
+from typing import Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def current_rss() -> Optional[int]:
+    """
+    Return the resident set size of this process in bytes.
+
+    Reads /proc/self/statm where available; elsewhere falls back to the
+    process high-water mark from getrusage, or None if neither exists.
+    """
+    try:
+        with open('/proc/self/statm', encoding='ascii') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        pass
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+class PeakMemorySampler:
+    """
+    Context manager that samples RSS on a background thread and records the peak.
+
+    Unlike tracemalloc this also sees native allocations (BLAS, XGBoost, Arrow).
+
+    Attributes:
+        baseline_bytes (int): RSS when the block was entered.
+        peak_bytes (int): Highest RSS observed inside the block.
+        peak_delta_bytes (int): peak_bytes - baseline_bytes.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.baseline_bytes = None
+        self.peak_bytes = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def peak_delta_bytes(self) -> Optional[int]:
+        """Peak growth over the baseline, or None if RSS is unavailable."""
+        if self.peak_bytes is None or self.baseline_bytes is None:
+            return None
+        return max(self.peak_bytes - self.baseline_bytes, 0)
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            rss = current_rss()
+            if rss is not None and rss > self.peak_bytes:
+                self.peak_bytes = rss
+
+    def __enter__(self):
+        self.baseline_bytes = current_rss()
+        self.peak_bytes = self.baseline_bytes
+        if self.baseline_bytes is not None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            rss = current_rss()
+            if rss is not None and rss > self.peak_bytes:
+                self.peak_bytes = rss
+        return False
@@ -0,0 +1,217 @@
+"""Synthetic insurance data matching the insurance_data.txt schema, for tests and benchmarks."""
+
+import os
+from typing import Dict, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from .data_loader import INSURANCE_SCHEMA
+
+# (values, weights) per categorical column, roughly following the portfolio mix.
+_CATEGORIES: Dict[str, Tuple[Sequence, Sequence[float]]] = {
+    'Citizenship': ([' ', 'ZA', 'AF', 'ZW'], [0.89, 0.09, 0.01, 0.01]),
+    'LegalType': (['Individual', 'Close Corporation', 'Private company', 'Public company', 'Partnership',
+                   'Sole proprietor'], [0.90, 0.05, 0.03, 0.01, 0.005, 0.005]),
+    'Title': (['Mr', 'Mrs', 'Ms', 'Miss', 'Dr'], [0.93, 0.04, 0.02, 0.008, 0.002]),
+    'Language': (['English'], [1.0]),
+    'Bank': (['First National Bank', 'Standard Bank', 'ABSA Bank', 'Nedbank', 'Capitec Bank', 'Investec Bank'],
+             [0.28, 0.25, 0.20, 0.15, 0.10, 0.02]),
+    'AccountType': (['Current account', 'Savings account', 'Transmission account'], [0.60, 0.30, 0.10]),
+    'MaritalStatus': (['Not specified', 'Single', 'Married'], [0.99, 0.007, 0.003]),
+    'Gender': (['Not specified', 'Male', 'Female'], [0.95, 0.04, 0.01]),
+    'Country': (['South Africa'], [1.0]),
+    'Province': (['Gauteng', 'Western Cape', 'KwaZulu-Natal', 'North West', 'Mpumalanga', 'Eastern Cape',
+                  'Limpopo', 'Free State', 'Northern Cape'],
+                 [0.39, 0.17, 0.17, 0.14, 0.05, 0.03, 0.025, 0.008, 0.007]),
+    'ItemType': (['Mobility - Motor'], [1.0]),
+    'VehicleType': (['Passenger Vehicle', 'Medium Commercial', 'Heavy Commercial', 'Light Commercial', 'Bus'],
+                    [0.94, 0.05, 0.007, 0.002, 0.001]),
+    'make': (['TOYOTA', 'MERCEDES-BENZ', 'VOLKSWAGEN', 'NISSAN', 'FORD', 'HYUNDAI', 'ISUZU', 'MAZDA', 'AUDI',
+              'BMW', 'RENAULT', 'KIA', 'HONDA', 'CHEVROLET', 'SUZUKI'],
+             [0.80, 0.06, 0.03, 0.02, 0.015, 0.015, 0.01, 0.008, 0.006, 0.006, 0.004, 0.003, 0.002, 0.0005, 0.0005]),
+    'bodytype': (['B/S', 'S/D', 'H/B', 'P/V', 'D/S', 'S/C'], [0.90, 0.04, 0.03, 0.02, 0.007, 0.003]),
+    'TermFrequency': (['Monthly', 'Annual'], [0.99, 0.01]),
+    'ExcessSelected': (['Mobility - Windscreen', 'No excess', 'Mobility - Metered Taxis - R2000',
+                        'Mobility - Metered Taxis - R1000', 'Mobility - Metered Taxis - R5000',
+                        'Mobility - Metered Taxis - R2500'], [0.40, 0.27, 0.18, 0.08, 0.05, 0.02]),
+    'CoverCategory': (['Passenger Liability', 'Windscreen', 'Third Party', 'Own damage', 'Keys and Alarms',
+                       'Signage and Vehicle Wraps', 'Emergency Charges', 'Cleaning and Removal of Accident Debris',
+                       'Income Protector', 'Accidental Death', 'Cash Takeaways', 'Basic Excess Waiver',
+                       'Fire and Theft', 'Standalone passenger liability'],
+                      [0.10, 0.10, 0.10, 0.10, 0.10, 0.10, 0.10, 0.10, 0.03, 0.03, 0.03, 0.03, 0.02, 0.02]),
+    'CoverGroup': (['Comprehensive - Taxi', 'Basic Excess Waiver', 'Income Protector', 'Standalone passenger liability',
+                    'Metered Taxis - Third Party'], [0.94, 0.02, 0.02, 0.01, 0.01]),
+    'Section': (['Motor Comprehensive', 'Optional Extended Covers', 'Own Damage', 'Third Party'],
+                [0.70, 0.20, 0.07, 0.03]),
+    'Product': (['Mobility Metered Taxis: Monthly', 'Mobility Commercial Cover: Monthly',
+                 'Standalone passenger liability'], [0.62, 0.37, 0.01]),
+    'StatutoryClass': (['Commercial'], [1.0]),
+    'StatutoryRiskType': (['IFRS Constant'], [1.0]),
+}
+
+_BOOLEAN_RATES = {
+    'IsVATRegistered': 0.006, 'AlarmImmobiliser': 0.99, 'TrackingDevice': 0.35, 'NewVehicle': 0.10,
+    'WrittenOff': 0.05, 'Rebuilt': 0.05, 'Converted': 0.05, 'CrossBorder': 0.001,
+}
+
+# Relative claim propensity by segment, so models and hypothesis tests find signal.
+_PROVINCE_RISK = {'Gauteng': 1.3, 'Western Cape': 0.9, 'KwaZulu-Natal': 1.1, 'North West': 0.7}
+_VEHICLE_RISK = {'Heavy Commercial': 1.8, 'Medium Commercial': 1.2, 'Bus': 1.5}
+
+N_POSTAL_CODES = 888
+N_MODELS = 400
+
+
+def _choice(rng: np.random.Generator, column: str, n_rows: int) -> pd.Categorical:
+    values, weights = _CATEGORIES[column]
+    weights = np.asarray(weights, dtype=float)
+    codes = rng.choice(len(values), n_rows, p=weights / weights.sum())
+    return pd.Categorical.from_codes(codes, categories=list(values))
+
+
+def _zipf_codes(rng: np.random.Generator, n_values: int, n_rows: int, exponent: float = 1.1) -> np.ndarray:
+    """Codes 0..n_values-1 with a long-tailed (Zipf-like) frequency profile."""
+    weights = 1.0 / np.arange(1, n_values + 1) ** exponent
+    return rng.choice(n_values, n_rows, p=weights / weights.sum())
+
+
+def _generate_block(rng: np.random.Generator, n_rows: int, total_rows: int, claim_rate: float,
+                    months: pd.DatetimeIndex) -> pd.DataFrame:
+    """One block of rows; identifier cardinalities are scaled by the full dataset size."""
+    n_policies = max(10, total_rows // 140)
+    n_covers = max(10, total_rows // 9)
+    df = pd.DataFrame({
+        'UnderwrittenCoverID': rng.integers(1, n_covers + 1, n_rows),
+        'PolicyID': rng.integers(1, n_policies + 1, n_rows),
+        'TransactionMonth': months[np.sort(rng.integers(0, len(months), n_rows))],
+    })
+    for col in ('IsVATRegistered', 'Citizenship', 'LegalType', 'Title', 'Language', 'Bank', 'AccountType',
+                'MaritalStatus', 'Gender', 'Country', 'Province'):
+        df[col] = _choice(rng, col, n_rows) if col in _CATEGORIES else rng.random(n_rows) < _BOOLEAN_RATES[col]
+    # Postal codes: long-tailed over ~900 codes; zones derived from the code.
+    postal_codes = 1 + 9 * np.arange(N_POSTAL_CODES)
+    postal = postal_codes[_zipf_codes(rng, N_POSTAL_CODES, n_rows)]
+    df['PostalCode'] = postal
+    df['MainCrestaZone'] = pd.Categorical([f'Zone {code // 1000}' for code in range(10)])[postal // 1000]
+    df['SubCrestaZone'] = pd.Categorical([f'Zone {code // 100}' for code in range(100)])[postal // 100]
+    df['ItemType'] = _choice(rng, 'ItemType', n_rows)
+    df['mmcode'] = rng.integers(4_000_000, 65_000_000, n_rows)
+    df['VehicleType'] = _choice(rng, 'VehicleType', n_rows)
+    df['RegistrationYear'] = np.clip(np.round(rng.normal(2010, 3, n_rows)), 1987, 2015).astype(int)
+    df['make'] = _choice(rng, 'make', n_rows)
+    df['Model'] = pd.Categorical([f'MODEL {i}' for i in range(N_MODELS)])[_zipf_codes(rng, N_MODELS, n_rows)]
+    df['Cylinders'] = rng.choice([4, 6, 8], n_rows, p=[0.97, 0.025, 0.005])
+    df['cubiccapacity'] = np.round(rng.normal(2600, 400, n_rows).clip(800, 8000))
+    df['kilowatts'] = np.round(rng.normal(110, 15, n_rows).clip(40, 300))
+    df['bodytype'] = _choice(rng, 'bodytype', n_rows)
+    df['NumberOfDoors'] = rng.choice([4, 3, 2, 5], n_rows, p=[0.95, 0.03, 0.015, 0.005])
+    df['VehicleIntroDate'] = pd.Categorical([f'{m}/1/{y}' for y in range(2000, 2016) for m in (1, 6)])[
+        rng.integers(0, 32, n_rows)]
+    df['CustomValueEstimate'] = np.where(rng.random(n_rows) < 0.22, rng.lognormal(12, 0.5, n_rows), np.nan)
+    for col in ('AlarmImmobiliser', 'TrackingDevice'):
+        df[col] = rng.random(n_rows) < _BOOLEAN_RATES[col]
+    df['CapitalOutstanding'] = np.round(rng.lognormal(11, 1.5, n_rows) * (rng.random(n_rows) < 0.6))
+    for col in ('NewVehicle', 'WrittenOff', 'Rebuilt', 'Converted', 'CrossBorder'):
+        flags = pd.array(rng.random(n_rows) < _BOOLEAN_RATES[col], dtype='boolean')
+        # These flags are mostly unrecorded in the source.
+        flags[rng.random(n_rows) < 0.6] = pd.NA
+        df[col] = flags
+    df['NumberOfVehiclesInFleet'] = np.nan
+    sum_insured = np.round(rng.lognormal(10, 2.2, n_rows).clip(0.01, 12_700_000), 2)
+    df['SumInsured'] = sum_insured
+    df['TermFrequency'] = _choice(rng, 'TermFrequency', n_rows)
+    premium_per_term = np.round(np.sqrt(sum_insured) * rng.lognormal(-0.5, 0.6, n_rows), 4).clip(0, 74_000)
+    df['CalculatedPremiumPerTerm'] = premium_per_term
+    for col in ('ExcessSelected', 'CoverCategory'):
+        df[col] = _choice(rng, col, n_rows)
+    df['CoverType'] = df['CoverCategory'].astype(str).replace({'Own damage': 'Own Damage'}).astype('category')
+    for col in ('CoverGroup', 'Section', 'Product', 'StatutoryClass', 'StatutoryRiskType'):
+        df[col] = _choice(rng, col, n_rows)
+
+    # Premium earned in the month: ~40% of rows earn nothing.
+    earned = rng.random(n_rows) >= 0.4
+    df['TotalPremium'] = np.where(earned, premium_per_term / 1.14 * rng.uniform(0.8, 1.0, n_rows), 0.0)
+    # Sparse, heavy-tailed claims with segment-dependent frequency.
+    risk = (df['Province'].astype(str).map(_PROVINCE_RISK).fillna(1.0).to_numpy()
+            * df['VehicleType'].astype(str).map(_VEHICLE_RISK).fillna(1.0).to_numpy())
+    has_claim = rng.random(n_rows) < claim_rate * risk / risk.mean()
+    df['TotalClaims'] = np.where(has_claim, np.round(rng.lognormal(9.5, 1.4, n_rows), 2), 0.0)
+    return df[list(INSURANCE_SCHEMA)]
+
+
+def _typed(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast to the dtypes the loader produces."""
+    for col, kind in INSURANCE_SCHEMA.items():
+        if kind == 'category' and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+        elif kind != 'category' and not kind.startswith('datetime'):
+            df[col] = df[col].astype(kind)
+    return df
+
+
+def _months(start_month: str, n_months: int) -> pd.DatetimeIndex:
+    return pd.date_range(start_month, periods=n_months, freq='MS')
+
+
+def generate_insurance_data(n_rows: int, random_state: int = 42, claim_rate: float = 0.0028,
+                            start_month: str = '2013-10-01', n_months: int = 23) -> pd.DataFrame:
+    """
+    Generate synthetic policy rows with the insurance_data.txt columns and loader dtypes.
+
+    Claims are sparse (claim_rate of rows, higher in Gauteng and for commercial
+    vehicles) and lognormally heavy-tailed; PostalCode follows a long-tailed
+    profile over ~900 codes and identifier cardinalities grow with n_rows.
+
+    Args:
+        n_rows (int): Number of rows.
+        random_state (int): Seed.
+        claim_rate (float): Share of rows with a claim.
+        start_month (str): First TransactionMonth.
+        n_months (int): Number of months covered.
+
+    Returns:
+        pd.DataFrame: Rows in TransactionMonth order, typed as INSURANCE_SCHEMA.
+    """
+    rng = np.random.default_rng(random_state)
+    df = _generate_block(rng, n_rows, n_rows, claim_rate, _months(start_month, n_months))
+    return _typed(df)
+
+
+def write_insurance_data(path: str, n_rows: int, random_state: int = 42, chunksize: int = 1_000_000,
+                         claim_rate: float = 0.0028, start_month: str = '2013-10-01',
+                         n_months: int = 23) -> str:
+    """
+    Write synthetic rows as a pipe-delimited file in the raw insurance_data.txt format.
+
+    Rows are generated and written in blocks of chunksize, each block with its
+    own seed spawned from random_state, so 10M-row files need bounded memory.
+
+    Args:
+        path (str): Output path.
+        n_rows (int): Number of rows.
+        random_state (int): Seed.
+        chunksize (int): Rows generated per block.
+        claim_rate (float): Share of rows with a claim.
+        start_month (str): First TransactionMonth.
+        n_months (int): Number of months covered.
+
+    Returns:
+        str: The output path.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    months = _months(start_month, n_months)
+    n_blocks = max(1, -(-n_rows // chunksize))
+    seeds = np.random.SeedSequence(random_state).spawn(n_blocks)
+    options = pacsv.WriteOptions(include_header=False, delimiter='|', quoting_style='none')
+    with open(path, 'wb') as f:
+        f.write(('|'.join(INSURANCE_SCHEMA) + '\n').encode())
+        for block, seed in enumerate(seeds):
+            size = min(chunksize, n_rows - block * chunksize)
+            df = _generate_block(np.random.default_rng(seed), size, n_rows, claim_rate, months)
+            df['TransactionMonth'] = df['TransactionMonth'].dt.strftime('%Y-%m-%d %H:%M:%S')
+            for col, kind in INSURANCE_SCHEMA.items():
+                if kind == 'boolean':
+                    df[col] = pd.Series(df[col], dtype='boolean').map({True: 'Yes', False: 'No'})
+            pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), f, options)
+    return path
@@ -0,0 +1,300 @@
+"""Budgeted hyperparameter search: successive halving and Hyperband over row subsamples."""
+
+import inspect
+import math
+import os
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from scipy.stats import loguniform, randint, uniform
+from sklearn.base import clone
+from sklearn.metrics import f1_score, mean_squared_error
+from sklearn.model_selection import KFold, ParameterSampler, TimeSeriesSplit
+
+Fold = Tuple[np.ndarray, np.ndarray]
+
+# Search spaces per task and ModelEvaluator model name; lists are sampled
+# uniformly, scipy distributions with rvs. Models without a space are not tuned.
+SEARCH_SPACES = {
+    'severity': {
+        'DecisionTree': {'max_depth': [3, 5, 8, 12, None], 'min_samples_leaf': [1, 5, 20, 50, 100]},
+        'RandomForest': {'n_estimators': [50, 100, 200], 'max_depth': [5, 10, 20, None],
+                         'min_samples_leaf': [1, 5, 20], 'max_features': [0.3, 0.6, 1.0]},
+        'XGBoost': {'max_depth': randint(2, 9), 'learning_rate': loguniform(0.01, 0.3),
+                    'subsample': uniform(0.5, 0.5), 'colsample_bytree': uniform(0.5, 0.5),
+                    'min_child_weight': loguniform(1, 100), 'reg_lambda': loguniform(0.1, 100)},
+    },
+    'probability': {
+        'LogisticRegression': {'C': loguniform(1e-3, 1e2)},
+        'DecisionTree': {'max_depth': [3, 5, 8, 12], 'min_samples_leaf': [1, 20, 100],
+                         'class_weight': [None, 'balanced']},
+        'RandomForest': {'n_estimators': [50, 100, 200], 'max_depth': [5, 10, 20, None],
+                         'min_samples_leaf': [1, 5, 20], 'class_weight': [None, 'balanced_subsample']},
+        'XGBoost': {'max_depth': randint(2, 9), 'learning_rate': loguniform(0.01, 0.3),
+                    'subsample': uniform(0.5, 0.5), 'colsample_bytree': uniform(0.5, 0.5),
+                    'min_child_weight': loguniform(1, 100), 'scale_pos_weight': loguniform(1, 300)},
+    },
+}
+
+
+def time_folds(months, n_splits: int = 3) -> List[Fold]:
+    """
+    Expanding-window folds over calendar months.
+
+    Each fold trains on all months before its validation block, so no fold
+    validates on data older than what it trained on. Rows without a month are
+    left out of every fold.
+
+    Args:
+        months (array-like): TransactionMonth (or any date) per row.
+        n_splits (int): Number of folds.
+
+    Returns:
+        List[Fold]: (train row indices, validation row indices) per fold.
+    """
+    periods = pd.to_datetime(pd.Series(months), errors='coerce').dt.to_period('M')
+    unique = np.sort(periods.dropna().unique())
+    if len(unique) <= n_splits:
+        raise ValueError(f"Need more than {n_splits} distinct months for {n_splits} time folds")
+    codes = pd.Index(unique).get_indexer(periods)
+    folds = []
+    for train_months, val_months in TimeSeriesSplit(n_splits).split(unique):
+        folds.append((np.flatnonzero(np.isin(codes, train_months)), np.flatnonzero(np.isin(codes, val_months))))
+    return folds
+
+
+def random_folds(n_rows: int, n_splits: int = 3, random_state: int = 42) -> List[Fold]:
+    """Shuffled K-fold indices, for data without a time order."""
+    return list(KFold(n_splits, shuffle=True, random_state=random_state).split(np.arange(n_rows)))
+
+
+def _score(task: str, y_true, y_pred) -> float:
+    """Score to maximise: -RMSE for severity, F1 for probability."""
+    if task == 'severity':
+        return -float(np.sqrt(mean_squared_error(y_true, y_pred)))
+    return float(f1_score(y_true, y_pred, zero_division=0))
+
+
+def _subsample(train: np.ndarray, y: np.ndarray, fraction: float, task: str, seed: int) -> np.ndarray:
+    """
+    First fraction of a seeded permutation of the training rows.
+
+    The permutation depends only on the seed, so the subsamples of later
+    rounds contain those of earlier rounds. Probability subsamples are taken
+    per class so rare claims stay represented, and keep the permutation order
+    so the classes stay mixed in any slice (such as the early-stopping rows).
+    """
+    order = train[np.random.default_rng(seed).permutation(len(train))]
+    if fraction >= 1:
+        return order
+    if task == 'probability':
+        keep = np.zeros(len(order), dtype=bool)
+        for label in np.unique(y[order]):
+            positions = np.flatnonzero(y[order] == label)
+            keep[positions[:max(1, math.ceil(fraction * len(positions)))]] = True
+        return order[keep]
+    return order[:max(1, math.ceil(fraction * len(order)))]
+
+
+def _is_boosted(model) -> bool:
+    return hasattr(model, 'get_booster')
+
+
+def _run_trial(task: str, estimator, params: Dict, X, y: np.ndarray, fold: Fold, fraction: float, seed: int,
+               threads: int, early_stopping_rounds: Optional[int], max_boost_rounds: int) -> Dict:
+    """Fit one candidate on a subsample of one fold's training rows and score it on the fold's validation rows."""
+    train, val = fold
+    rows = _subsample(train, y, fraction, task, seed)
+    model = clone(estimator).set_params(**params)
+    if 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=threads)
+    if task == 'probability' and len(np.unique(y[rows])) < 2:
+        return {'score': np.nan, 'n_estimators': None, 'rows': len(rows), 'fit_time_s': 0.0}
+    n_estimators = None
+    start = time.perf_counter()
+    if early_stopping_rounds and _is_boosted(model):
+        # Hold out part of the training subsample to stop on, keeping the fold's validation rows unseen.
+        n_stop = max(1, len(rows) // 7)
+        stop_rows, fit_rows = rows[:n_stop], rows[n_stop:]
+        model.set_params(n_estimators=max_boost_rounds, early_stopping_rounds=early_stopping_rounds)
+        model.fit(X[fit_rows], y[fit_rows], eval_set=[(X[stop_rows], y[stop_rows])], verbose=False)
+        n_estimators = model.best_iteration + 1
+    else:
+        model.fit(X[rows], y[rows])
+    fit_time = time.perf_counter() - start
+    return {'score': _score(task, y[val], model.predict(X[val])), 'n_estimators': n_estimators,
+            'rows': len(rows), 'fit_time_s': fit_time}
+
+
+def _evaluate(task, estimator, candidates: List[Dict], X, y, folds: Sequence[Fold], fraction: float,
+              n_jobs: int, random_state: int, early_stopping_rounds, max_boost_rounds) -> List[Dict]:
+    """Run every candidate on every fold in parallel; return per-candidate mean results."""
+    budget = os.cpu_count() if n_jobs is None or n_jobs < 0 else n_jobs
+    n_tasks = len(candidates) * len(folds)
+    workers = max(1, min(n_tasks, budget))
+    threads = max(1, budget // workers)
+    results = Parallel(n_jobs=workers, max_nbytes='1M', mmap_mode='r')(
+        delayed(_run_trial)(task, estimator, params, X, y, fold, fraction, random_state + f, threads,
+                            early_stopping_rounds, max_boost_rounds)
+        for params in candidates for f, fold in enumerate(folds))
+    summaries = []
+    for i in range(len(candidates)):
+        trials = results[i * len(folds):(i + 1) * len(folds)]
+        scores = np.array([trial['score'] for trial in trials], dtype='float64')
+        stops = [trial['n_estimators'] for trial in trials if trial['n_estimators'] is not None]
+        summaries.append({
+            'score': np.nanmean(scores) if np.isfinite(scores).any() else -np.inf,
+            'score_std': np.nanstd(scores) if np.isfinite(scores).any() else np.nan,
+            'n_estimators': float(np.mean(stops)) if stops else None,
+            'rows': int(np.mean([trial['rows'] for trial in trials])),
+            'fit_time_s': float(sum(trial['fit_time_s'] for trial in trials)),
+        })
+    return summaries
+
+
+def _sample_candidates(param_space: Dict, n_candidates: int, random_state: int) -> List[Dict]:
+    """Sample parameter settings; an all-list space yields at most its grid size, without repeats."""
+    if not param_space:
+        return [{}]
+    if all(isinstance(values, (list, tuple)) for values in param_space.values()):
+        n_candidates = min(n_candidates, math.prod(len(values) for values in param_space.values()))
+    return list(ParameterSampler(param_space, n_candidates, random_state=random_state))
+
+
+def _default_min_fraction(folds: Sequence[Fold], min_rows: int, eta: int, n_candidates: int) -> float:
+    smallest = min(len(train) for train, _ in folds)
+    rounds = max(0, math.floor(math.log(max(n_candidates, 1)) / math.log(eta) + 1e-9))
+    return min(1.0, max(min_rows / max(smallest, 1), eta ** -rounds))
+
+
+def _result(task: str, trials: pd.DataFrame) -> Dict:
+    """Best candidate among those evaluated on the full training rows."""
+    final = trials[trials['fraction'] >= 1]
+    best = final.loc[final['score'].idxmax()] if len(final) else trials.loc[trials['score'].idxmax()]
+    result = {'best_params': best['params'], 'best_score': best['score'], 'best_n_estimators': best['n_estimators'],
+              'trials': trials}
+    if task == 'severity':
+        result['best_rmse'] = -best['score']
+    else:
+        result['best_f1'] = best['score']
+    return result
+
+
+def successive_halving(estimator, param_space: Dict, X, y, task: str, folds: Sequence[Fold],
+                       n_candidates: int = 27, eta: int = 3, min_fraction: Optional[float] = None,
+                       min_rows: int = 500, early_stopping_rounds: Optional[int] = 20, max_boost_rounds: int = 1000,
+                       n_jobs: int = -1, random_state: int = 42, bracket: int = 0) -> Dict:
+    """
+    Successive halving over row subsamples.
+
+    All candidates start on a small fraction of each fold's training rows;
+    after every round only the best 1/eta continue, on eta times more rows,
+    until the last round uses the full training rows. Boosted models are
+    stopped early on a slice of their training subsample.
+
+    Args:
+        estimator: Unfitted scikit-learn compatible model.
+        param_space (Dict): Parameter lists or scipy distributions.
+        X: Feature matrix (array or CSR).
+        y (np.ndarray): Target.
+        task (str): 'severity' (scored by RMSE) or 'probability' (scored by F1).
+        folds (Sequence[Fold]): From time_folds or random_folds.
+        n_candidates (int): Parameter settings sampled.
+        eta (int): Halving rate.
+        min_fraction (float, optional): Row fraction of the first round; derived from
+            n_candidates, eta and min_rows if None.
+        min_rows (int): Smallest training subsample when min_fraction is derived.
+        early_stopping_rounds (int, optional): Rounds without improvement before a boosted model stops.
+        max_boost_rounds (int): Upper bound on boosting rounds when stopping early.
+        n_jobs (int): Core budget shared by concurrent trials; -1 uses all cores.
+        random_state (int): Seed of the parameter sampling and subsamples.
+        bracket (int): Label recorded in the trials table (used by hyperband).
+
+    Returns:
+        Dict: best_params, best_score (higher is better), best_rmse or best_f1,
+            best_n_estimators (mean early-stopping point) and trials (one row per candidate and round).
+    """
+    y = np.asarray(y)
+    candidates = _sample_candidates(param_space, n_candidates, random_state)
+    if min_fraction is None:
+        min_fraction = _default_min_fraction(folds, min_rows, eta, len(candidates))
+    n_rounds = math.floor(math.log(1 / min_fraction) / math.log(eta) + 1e-9) + 1
+    ids = list(range(len(candidates)))
+    records = []
+    for round_ in range(n_rounds):
+        fraction = float(eta ** (round_ - n_rounds + 1))
+        summaries = _evaluate(task, estimator, [candidates[i] for i in ids], X, y, folds, fraction, n_jobs,
+                              random_state, early_stopping_rounds, max_boost_rounds)
+        for i, summary in zip(ids, summaries):
+            records.append({'bracket': bracket, 'round': round_, 'candidate': i, 'fraction': fraction,
+                            **summary, 'params': candidates[i]})
+        if round_ < n_rounds - 1:
+            ranked = sorted(zip(ids, summaries), key=lambda item: item[1]['score'], reverse=True)
+            ids = [i for i, _ in ranked[:max(1, len(ids) // eta)]]
+    return _result(task, pd.DataFrame(records))
+
+
+def hyperband(estimator, param_space: Dict, X, y, task: str, folds: Sequence[Fold], eta: int = 3,
+              min_rows: int = 500, early_stopping_rounds: Optional[int] = 20, max_boost_rounds: int = 1000,
+              n_jobs: int = -1, random_state: int = 42) -> Dict:
+    """
+    Hyperband: successive halving brackets trading candidate count against starting subsample size.
+
+    The most aggressive bracket starts many candidates on about min_rows rows;
+    the last one trains a few candidates on the full rows only, hedging against
+    settings whose ranking on small samples is misleading. Arguments and
+    result are as for successive_halving.
+    """
+    smallest = min(len(train) for train, _ in folds)
+    s_max = math.floor(math.log(max(smallest / min_rows, 1)) / math.log(eta) + 1e-9)
+    trials = []
+    for s in range(s_max, -1, -1):
+        n_candidates = math.ceil((s_max + 1) / (s + 1) * eta ** s)
+        result = successive_halving(estimator, param_space, X, y, task, folds, n_candidates, eta, float(eta ** -s),
+                                    min_rows, early_stopping_rounds, max_boost_rounds, n_jobs, random_state + s,
+                                    bracket=s)
+        trials.append(result['trials'])
+    return _result(task, pd.concat(trials, ignore_index=True))
+
+
+def tune_model(estimator, param_space: Dict, X, y, task: str, folds: Sequence[Fold], method: str = 'hyperband',
+               refit: bool = True, **kwargs) -> Dict:
+    """
+    Search one model's hyperparameters and refit the best setting on all rows.
+
+    Args:
+        estimator: Unfitted model whose parameters are searched.
+        param_space (Dict): Parameter lists or scipy distributions.
+        X: Feature matrix.
+        y: Target.
+        task (str): 'severity' or 'probability'.
+        folds (Sequence[Fold]): Cross-validation folds.
+        method (str): 'hyperband' or 'halving'.
+        refit (bool): Fit the best setting on every row in the folds.
+        **kwargs: Passed to hyperband / successive_halving; arguments the method does not take raise ValueError.
+
+    Returns:
+        Dict: The search result plus estimator (refit model, unfitted if refit is False) and tune_time_s.
+    """
+    start = time.perf_counter()
+    searches = {'hyperband': hyperband, 'halving': successive_halving}
+    if method not in searches:
+        raise ValueError("method must be 'hyperband' or 'halving'")
+    unknown = set(kwargs) - set(inspect.signature(searches[method]).parameters)
+    if unknown:
+        raise ValueError(f"method={method!r} does not accept {sorted(unknown)}")
+    if method == 'hyperband':
+        result = hyperband(estimator, param_space, X, y, task, folds, **kwargs)
+    elif method == 'halving':
+        result = successive_halving(estimator, param_space, X, y, task, folds, **kwargs)
+    model = clone(estimator).set_params(**result['best_params'])
+    if _is_boosted(model) and result['best_n_estimators'] is not None:
+        model.set_params(n_estimators=max(1, round(result['best_n_estimators'])))
+    if refit:
+        rows = np.unique(np.concatenate([np.concatenate(fold) for fold in folds]))
+        model.fit(X[rows], np.asarray(y)[rows])
+    result['estimator'] = model
+    result['tune_time_s'] = time.perf_counter() - start
+    return result
@@ -1,17 +1,123 @@
 """Visualization utilities for insurance data EDA."""
 
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence
 import os
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+# Two-sided 95% normal quantile used for the analytic confidence intervals.
+Z_95 = 1.959963984540054
+
 def setup_plot_style():
     """Configure Seaborn and Matplotlib plot styles."""
     sns.set_style('whitegrid')
     plt.rcParams['figure.figsize'] = (10, 6)
 
-def plot_numerical_distribution(df: pd.DataFrame, col: str, save_path: Optional[str] = None):
+def _finish(save_path: Optional[str], show: bool):
+    """Save the current figure if requested, then show it or release it."""
+    if save_path:
+        os.makedirs(os.path.dirname(save_path) or '.', exist_ok=True)
+        plt.savefig(save_path)
+    if show:
+        plt.show()
+    else:
+        plt.close()
+
+def mean_ci(df: pd.DataFrame, group_cols, value_col: str, z: float = Z_95) -> pd.DataFrame:
+    """
+    Per-group mean of a column with a normal-approximation confidence interval.
+
+    Non-finite values (e.g. loss ratios of zero-premium rows) are ignored.
+
+    Args:
+        df (pd.DataFrame): Input dataset.
+        group_cols (str or List[str]): Grouping column(s).
+        value_col (str): Column to average.
+        z (float): Normal quantile of the interval.
+
+    Returns:
+        pd.DataFrame: Group columns plus n, mean, lower and upper.
+    """
+    values = df[value_col].astype('float64')
+    values = values.where(np.isfinite(values))
+    keys = [group_cols] if isinstance(group_cols, str) else list(group_cols)
+    stats = values.groupby([df[col] for col in keys], observed=True).agg(['count', 'mean', 'std'])
+    half = z * stats['std'].fillna(0) / np.sqrt(stats['count'].where(stats['count'] > 0))
+    return pd.DataFrame({'n': stats['count'], 'mean': stats['mean'],
+                         'lower': stats['mean'] - half, 'upper': stats['mean'] + half}).reset_index()
+
+def proportion_ci(successes, n, z: float = Z_95):
+    """Wilson score interval of a proportion; returns (lower, upper) arrays."""
+    successes = np.asarray(successes, dtype='float64')
+    n = np.asarray(n, dtype='float64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = successes / n
+        denominator = 1 + z ** 2 / n
+        centre = (p + z ** 2 / (2 * n)) / denominator
+        half = z * np.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2)) / denominator
+    return np.clip(centre - half, 0, 1), np.clip(centre + half, 0, 1)
+
+def ratio_ci(numerator_sum, denominator_sum, numerator_sumsq, denominator_sumsq, cross_sum, n, z: float = Z_95):
+    """
+    Delta-method interval of a ratio of sums, e.g. loss ratio = sum(claims) / sum(premium).
+
+    Only per-group sums, sums of squares and the cross-product sum are needed,
+    so the interval can be computed from pre-aggregated data such as a SegmentCube.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Ratio, lower and upper bound.
+    """
+    num, den = np.asarray(numerator_sum, dtype='float64'), np.asarray(denominator_sum, dtype='float64')
+    n = np.asarray(n, dtype='float64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = num / np.where(den != 0, den, np.nan)
+        # Sample variance of the residuals y - ratio * x, whose mean is zero by construction.
+        residual_ss = (np.asarray(numerator_sumsq) - 2 * ratio * np.asarray(cross_sum)
+                       + ratio ** 2 * np.asarray(denominator_sumsq))
+        residual_var = np.maximum(residual_ss, 0) / np.where(n > 1, n - 1, np.nan)
+        half = z * np.sqrt(residual_var / n) / np.abs(den / n)
+    return ratio, ratio - half, ratio + half
+
+def box_stats(df: pd.DataFrame, group_col: str, value_col: str, groups: Optional[Sequence] = None,
+              whis: float = 1.5) -> List[Dict]:
+    """
+    Box-plot statistics per group for Axes.bxp, computed with grouped quantiles.
+
+    Whiskers reach the most extreme values within whis x IQR of the box, as in
+    matplotlib's boxplot; individual outliers are not drawn.
+
+    Args:
+        df (pd.DataFrame): Input dataset.
+        group_col (str): Grouping column.
+        value_col (str): Numerical column.
+        groups (Sequence, optional): Groups to include, in drawing order; all observed groups if None.
+        whis (float): Whisker reach as a multiple of the IQR.
+
+    Returns:
+        List[Dict]: One dict per group with label, med, q1, q3, whislo, whishi and fliers.
+    """
+    values = df[value_col].astype('float64')
+    keys = df[group_col]
+    if groups is not None:
+        keep = keys.isin(list(groups))
+        values, keys = values[keep], keys[keep]
+    grouped = values.groupby(keys, observed=True)
+    quartiles = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    iqr = quartiles[0.75] - quartiles[0.25]
+    low_fence = (quartiles[0.25] - whis * iqr).reindex(keys).to_numpy()
+    high_fence = (quartiles[0.75] + whis * iqr).reindex(keys).to_numpy()
+    inside = values.where((values.to_numpy() >= low_fence) & (values.to_numpy() <= high_fence))
+    whiskers = inside.groupby(keys, observed=True).agg(['min', 'max'])
+    order = list(groups) if groups is not None else list(quartiles.index)
+    return [{'label': str(group), 'med': quartiles.at[group, 0.5], 'q1': quartiles.at[group, 0.25],
+             'q3': quartiles.at[group, 0.75], 'whislo': whiskers.at[group, 'min'],
+             'whishi': whiskers.at[group, 'max'], 'fliers': []}
+            for group in order if group in quartiles.index]
+
+def plot_numerical_distribution(df: pd.DataFrame, col: str, save_path: Optional[str] = None,
+                                sample_size: Optional[int] = None, show: bool = True):
     """
     Plot histogram with KDE for a numerical column.
 
@@ -19,18 +125,21 @@ def plot_numerical_distribution(df: pd.DataFrame, col: str, save_path: Optional[
         df (pd.DataFrame): Input dataset.
         col (str): Column name.
         save_path (str, optional): Path to save the plot.
+        sample_size (int, optional): Plot a random sample of at most this many values; the KDE is
+            the costly part on large columns.
+        show (bool): Display the figure; False closes it after saving (batch use).
     """
+    values = df[col].dropna()
+    if sample_size and len(values) > sample_size:
+        values = values.sample(sample_size, random_state=42)
     plt.figure()
-    sns.histplot(df[col].dropna(), kde=True)
+    sns.histplot(values, kde=True)
     plt.title(f'Distribution of {col}')
     plt.xlabel(col)
     plt.ylabel('Frequency')
-    if save_path:
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
-        plt.savefig(save_path)
-    plt.show()
+    _finish(save_path, show)
 
-def plot_categorical_distribution(df: pd.DataFrame, col: str, save_path: Optional[str] = None):
+def plot_categorical_distribution(df: pd.DataFrame, col: str, save_path: Optional[str] = None, show: bool = True):
     """
     Plot bar chart for a categorical column.
 
@@ -38,60 +147,57 @@ def plot_categorical_distribution(df: pd.DataFrame, col: str, save_path: Optiona
         df (pd.DataFrame): Input dataset.
         col (str): Column name.
         save_path (str, optional): Path to save the plot.
+        show (bool): Display the figure; False closes it after saving (batch use).
     """
+    counts = df[col].value_counts()
     plt.figure()
-    sns.countplot(y=col, data=df, order=df[col].value_counts().index)
+    sns.barplot(x=counts.to_numpy(), y=counts.index.astype(str), orient='h')
     plt.title(f'Distribution of {col}')
     plt.xlabel('Count')
     plt.ylabel(col)
-    if save_path:
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
-        plt.savefig(save_path)
-    plt.show()
+    _finish(save_path, show)
 
-def plot_loss_ratio_by_category(df: pd.DataFrame, category: str, save_path: Optional[str] = None):
+def plot_loss_ratio_by_category(df: pd.DataFrame, category: str, save_path: Optional[str] = None, show: bool = True):
     """
     Plot Loss Ratio by a categorical column.
 
+    Bars are the mean LossRatio per category with a 95% normal-approximation
+    interval, computed in one grouped pass instead of by bootstrapping.
+
     Args:
         df (pd.DataFrame): Input dataset with LossRatio column.
         category (str): Categorical column name.
         save_path (str, optional): Path to save the plot.
+        show (bool): Display the figure; False closes it after saving (batch use).
     """
+    stats = mean_ci(df, category, 'LossRatio')
     plt.figure()
-    sns.barplot(x='LossRatio', y=category, data=df, errorbar='ci')
+    plt.barh(stats[category].astype(str), stats['mean'],
+             xerr=[stats['mean'] - stats['lower'], stats['upper'] - stats['mean']], capsize=3)
+    plt.gca().invert_yaxis()
     plt.title(f'Loss Ratio by {category}')
     plt.xlabel('Loss Ratio (Claims/Premium)')
     plt.ylabel(category)
-    if save_path:
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
-        plt.savefig(save_path)
-    plt.show()
+    _finish(save_path, show)
 
-def plot_temporal_trend(df: pd.DataFrame, date_col: str, save_path: Optional[str] = None):
+def plot_temporal_trend(df: pd.DataFrame, date_col: str, save_path: Optional[str] = None, show: bool = True):
     """
     Plot monthly claim frequency trend.
 
     Args:
-        df (pd.DataFrame): Input dataset.
+        df (pd.DataFrame): Input dataset (not modified).
         date_col (str): Date column name.
         save_path (str, optional): Path to save the plot.
+        show (bool): Display the figure; False closes it after saving (batch use).
     """
-    # Convert date column to datetime and handle NaT
-    df = df.dropna(subset=[date_col])
-    df['Month'] = pd.to_datetime(df[date_col]).dt.to_period('M').dt.to_timestamp()
-    
-    # Debug: Check data before grouping
-    print("Data after datetime conversion:", df[[date_col, 'TotalClaims']].head())
-    
-    # Group by Month and count claims
-    monthly_trends = df.groupby('Month').agg({'TotalClaims': 'count'}).reset_index()
-    print("Monthly Trends:", monthly_trends)
-    
+    # Group by calendar month without adding columns to the caller's frame
+    months = pd.to_datetime(df[date_col], errors='coerce').dt.to_period('M').dt.to_timestamp()
+    monthly_trends = df['TotalClaims'].groupby(months).count().rename('ClaimCount').reset_index()
+
     if monthly_trends.empty:
         print("Warning: No data available for plotting.")
         return
-    
+
     monthly_trends.columns = ['Month', 'ClaimCount']
 
     plt.figure(figsize=(12, 6))
@@ -100,12 +206,9 @@ def plot_temporal_trend(df: pd.DataFrame, date_col: str, save_path: Optional[str
     plt.title('Monthly Claim Frequency')
     plt.xlabel('Month')
     plt.ylabel('Number of Claims')
-    if save_path:
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
-        plt.savefig(save_path)
-    plt.show()
+    _finish(save_path, show)
 
-def plot_correlation_matrix(df: pd.DataFrame, cols: List[str], save_path: Optional[str] = None):
+def plot_correlation_matrix(df: pd.DataFrame, cols: List[str], save_path: Optional[str] = None, show: bool = True):
     """
     Plot correlation matrix heatmap.
 
@@ -113,55 +216,59 @@ def plot_correlation_matrix(df: pd.DataFrame, cols: List[str], save_path: Option
         df (pd.DataFrame): Input dataset.
         cols (List[str]): List of numerical columns.
         save_path (str, optional): Path to save the plot.
+        show (bool): Display the figure; False closes it after saving (batch use).
     """
     plt.figure(figsize=(8, 6))
     correlation_matrix = df[cols].corr()
     sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', vmin=-1, vmax=1)
     plt.title('Correlation Matrix of Numerical Features')
-    if save_path:
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
-        plt.savefig(save_path)
-    plt.show()
+    _finish(save_path, show)
 
-def plot_creative_visualizations(df: pd.DataFrame, save_dir: str):
+def plot_creative_visualizations(df: pd.DataFrame, save_dir: str, sample_size: Optional[int] = 100_000,
+                                 show: bool = True):
     """
     Generate three creative visualizations for EDA.
 
     Args:
-        df (pd.DataFrame): Input dataset.
+        df (pd.DataFrame): Input dataset (not modified).
         save_dir (str): Directory to save plots.
+        sample_size (int, optional): Rows sampled per make for the violin plot's KDEs; None uses all rows.
+        show (bool): Display the figures; False closes them after saving (batch use).
     """
     os.makedirs(save_dir, exist_ok=True)
 
-    # 1. Loss Ratio by Province and Gender (Stacked Bar Plot)
-    plt.figure(figsize=(12, 8))
-    sns.catplot(x='LossRatio', y='Province', hue='Gender', kind='bar', data=df, height=6, aspect=1.5)
-    plt.title('Loss Ratio by Province and Gender', fontsize=14)
-    plt.xlabel('Loss Ratio (Claims/Premium)', fontsize=12)
-    plt.ylabel('Province', fontsize=12)
-    plt.savefig(os.path.join(save_dir, 'loss_ratio_province_gender.png'))
-    plt.show()
+    # 1. Loss Ratio by Province and Gender (grouped bars with 95% intervals)
+    stats = mean_ci(df, ['Province', 'Gender'], 'LossRatio')
+    means = stats.pivot(index='Province', columns='Gender', values='mean')
+    errors = stats.assign(half=stats['upper'] - stats['mean']).pivot(index='Province', columns='Gender', values='half')
+    fig, ax = plt.subplots(figsize=(12, 8))
+    means.plot.barh(xerr=errors, capsize=2, ax=ax)
+    ax.invert_yaxis()
+    ax.set_title('Loss Ratio by Province and Gender', fontsize=14)
+    ax.set_xlabel('Loss Ratio (Claims/Premium)', fontsize=12)
+    ax.set_ylabel('Province', fontsize=12)
+    _finish(os.path.join(save_dir, 'loss_ratio_province_gender.png'), show)
 
     # 2. Claim Severity by Vehicle Make (Violin Plot)
-    top_makes = df['make'].value_counts().index[:10]  # Changed from 'Make' to 'make'
+    top_makes = df['make'].value_counts().index[:10]
+    subset = df.loc[df['make'].isin(top_makes), ['make', 'TotalClaims']]
+    if sample_size:
+        subset = subset.sample(frac=1, random_state=42).groupby('make', observed=True).head(sample_size)
     plt.figure(figsize=(12, 6))
-    sns.violinplot(x='make', y='TotalClaims', data=df[df['make'].isin(top_makes)], inner='quartile')  # Changed from 'Make' to 'make'
+    sns.violinplot(x='make', y='TotalClaims', data=subset, order=list(top_makes), inner='quartile')
     plt.title('Claim Severity Distribution by Top Vehicle Makes', fontsize=14)
     plt.xlabel('Vehicle Make', fontsize=12)
     plt.ylabel('Total Claims (Rand)', fontsize=12)
     plt.xticks(rotation=45)
-    plt.savefig(os.path.join(save_dir, 'claim_severity_make_violin.png'))
-    plt.show()
+    _finish(os.path.join(save_dir, 'claim_severity_make_violin.png'), show)
 
     # 3. Claim Frequency Heatmap
-    df['Month'] = pd.to_datetime(df['TransactionMonth']).dt.month
-    df['Year'] = pd.to_datetime(df['TransactionMonth']).dt.year
-    claim_pivot = df.pivot_table(index='Month', columns='Year', values='TotalClaims', aggfunc='count')
+    dates = pd.to_datetime(df['TransactionMonth'])
+    claim_pivot = df['TotalClaims'].groupby([dates.dt.month.rename('Month'), dates.dt.year.rename('Year')]).count()
+    claim_pivot = claim_pivot.unstack('Year')
     plt.figure(figsize=(10, 6))
     sns.heatmap(claim_pivot, annot=True, fmt='.0f', cmap='YlGnBu')
     plt.title('Claim Frequency by Month and Year', fontsize=14)
     plt.xlabel('Year', fontsize=12)
     plt.ylabel('Month', fontsize=12)
-    plt.savefig(os.path.join(save_dir, 'claim_frequency_heatmap.png'))
-    plt.show()
-    
\ No newline at end of file
+    _finish(os.path.join(save_dir, 'claim_frequency_heatmap.png'), show)
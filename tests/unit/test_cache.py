@@ -0,0 +1,90 @@
+"""Unit tests for cache module."""
+
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from src.utils.cache import ArtifactCache, fingerprint
+from src.utils.data_preprocessing import DataPreprocessor
+from src.utils.modeling_utils import ModelEvaluator
+
+@pytest.fixture
+def cache(tmp_path):
+    """Empty cache in a temporary directory."""
+    return ArtifactCache(str(tmp_path / 'artifacts'))
+
+def test_fingerprint_tracks_content():
+    """Test equal frames share a fingerprint and any value or dtype change alters it."""
+    df = pd.DataFrame({'a': [1, 2, 3], 'b': ['x', 'y', 'z']})
+    assert fingerprint(df) == fingerprint(df.copy())
+    assert fingerprint(df) != fingerprint(df.assign(a=[1, 2, 4]))
+    assert fingerprint(df) != fingerprint(df.astype({'a': 'float64'}))
+
+def test_get_or_compute_computes_once(cache):
+    """Test a missing entry is computed and stored, then served from disk."""
+    calls = []
+    key = cache.key('square', np.arange(5))
+
+    def compute():
+        calls.append(1)
+        return np.arange(5) ** 2
+
+    first = cache.get_or_compute(key, compute)
+    second = cache.get_or_compute(key, compute)
+    np.testing.assert_array_equal(first, second)
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert key in cache
+
+def test_evict_removes_least_recently_used(tmp_path):
+    """Test the cache drops the oldest unused entries once over its size bound."""
+    cache = ArtifactCache(str(tmp_path / 'artifacts'), max_bytes=10 ** 9)
+    for i in range(3):
+        cache.put(f'entry-{i}', np.zeros(10_000) + i)
+    # Touch entry-0 so entry-1 becomes the least recently used.
+    for i, mtime in enumerate((3, 1, 2)):
+        os.utime(cache._path(f'entry-{i}'), (mtime, mtime))
+    cache.max_bytes = 2 * cache.entries()['bytes'].max()
+    assert cache.evict() == 1
+    assert 'entry-1' not in cache
+    assert 'entry-0' in cache and 'entry-2' in cache
+
+def test_memoize_reuses_results(cache):
+    """Test a memoized function runs once per distinct argument."""
+    calls = []
+
+    @cache.memoize
+    def total(values):
+        calls.append(1)
+        return float(np.sum(values))
+
+    assert total(np.arange(4)) == 6.0
+    assert total(np.arange(4)) == 6.0
+    assert total(np.arange(5)) == 10.0
+    assert len(calls) == 2
+
+def test_preprocess_cache_restores_fitted_state(cache):
+    """Test a cached preprocess returns the same output and leaves the preprocessor fitted."""
+    df = pd.DataFrame({'Province': ['A', 'B', 'A', None], 'TotalPremium': [1.0, None, 3.0, 4.0],
+                       'TotalClaims': [0.0, 2.0, 0.0, 1.0]})
+    expected = DataPreprocessor(['Province']).preprocess(df, cache=cache)
+    restored = DataPreprocessor(['Province'])
+    output = restored.preprocess(df, cache=cache)
+    assert cache.hits == 1
+    pd.testing.assert_frame_equal(output, expected)
+    pd.testing.assert_frame_equal(restored.transform(df), expected)
+
+def test_run_all_serves_unchanged_models_from_cache(cache):
+    """Test a second run_all on the same data trains nothing and flags every row as cached."""
+    rng = np.random.default_rng(0)
+    X = rng.random((80, 4))
+    y = (rng.random(80) < 0.4).astype(int)
+    data = (X[:60], X[60:], y[:60], y[60:])
+
+    evaluator = ModelEvaluator()
+    evaluator.probability_models = {'LogisticRegression': evaluator.probability_models['LogisticRegression']}
+    first = evaluator.run_all(probability_data=data, n_jobs=1, cache=cache)
+    second = evaluator.run_all(probability_data=data, n_jobs=1, cache=cache)
+    assert not first['cached'].any() and second['cached'].all()
+    pd.testing.assert_frame_equal(first.drop(columns='cached'), second.drop(columns='cached'))
+    assert hasattr(evaluator.probability_models['LogisticRegression'], 'coef_')
@@ -0,0 +1,100 @@
+"""Unit tests for cube module."""
+
+import os
+import pytest
+import pandas as pd
+import numpy as np
+from src.core.cube import SegmentCube, load_segment_cube, get_cube_path
+from src.core.eda import InsuranceEDA
+from src.stats.hypothesis_testing import segment_data
+from src.stats.sufficient_stats import group_moments
+
+@pytest.fixture
+def sample_df():
+    """Create a sample DataFrame covering two provinces, genders and months."""
+    rng = np.random.default_rng(0)
+    n = 500
+    return pd.DataFrame({
+        'Province': pd.Categorical(rng.choice(['Gauteng', 'Western Cape'], n)),
+        'Gender': rng.choice(['Male', 'Female', 'Not specified'], n),
+        'TransactionMonth': pd.to_datetime(rng.choice(['2015-01-01', '2015-02-01', '2015-03-01'], n)),
+        'TotalPremium': rng.exponential(100, n),
+        'TotalClaims': np.where(rng.random(n) < 0.2, rng.exponential(500, n), 0.0),
+    })
+
+def test_rollup_matches_raw_groupby(sample_df):
+    """Test roll-ups reproduce loss ratio, frequency and variance computed from rows."""
+    cube = SegmentCube.build(sample_df, ['Province', 'Gender', 'TransactionMonth'])
+    rolled = cube.rollup(['Province', 'Gender'], include_variance=True).set_index(['Province', 'Gender'])
+    grouped = sample_df.groupby(['Province', 'Gender'], observed=True)
+    expected_ratio = grouped['TotalClaims'].sum() / grouped['TotalPremium'].sum()
+    np.testing.assert_allclose(rolled['loss_ratio'].sort_index(), expected_ratio.sort_index())
+    np.testing.assert_allclose(rolled['claims_var'].sort_index(), grouped['TotalClaims'].var().sort_index())
+    np.testing.assert_allclose(rolled['claim_frequency'].sort_index(),
+                               grouped['TotalClaims'].apply(lambda s: (s > 0).mean()).sort_index())
+    overall = sample_df['TotalClaims'].sum() / sample_df['TotalPremium'].sum()
+    assert cube.loss_ratio() == pytest.approx(overall)
+
+def test_from_chunks_matches_build(sample_df):
+    """Test chunked construction gives the same cube as a single pass."""
+    dims = ['Province', 'Gender', 'TransactionMonth']
+    whole = SegmentCube.build(sample_df, dims).rollup(dims)
+    chunked = SegmentCube.from_chunks([sample_df.iloc[:200], sample_df.iloc[200:]], dims).rollup(dims)
+    pd.testing.assert_frame_equal(whole, chunked)
+
+def test_segment_summary_matches_segment_data(sample_df):
+    """Test the cube answers segment_data in the same layout."""
+    cube = SegmentCube.build(sample_df, ['Province', 'Gender'])
+    expected = segment_data(sample_df, 'Gender')
+    result = cube.segment_summary('Gender')
+    assert list(result.columns) == list(expected.columns)
+    np.testing.assert_allclose(result.iloc[:, 1:].to_numpy(dtype=float), expected.iloc[:, 1:].to_numpy(dtype=float))
+
+def test_eda_loss_ratio_by_uses_cube(sample_df):
+    """Test InsuranceEDA answers loss ratio queries from a cube over the available dimensions."""
+    eda = InsuranceEDA(sample_df)
+    ratio = eda.loss_ratio_by('Province')
+    assert eda.segment_cube().dimensions == ['Province', 'Gender', 'TransactionMonth']
+    assert set(ratio.index) == {'Gauteng', 'Western Cape'}
+
+def test_missing_measures_drop_the_whole_row(sample_df):
+    """Test rows missing premium or claims are left out of counts as well as sums."""
+    df = sample_df.copy()
+    df.loc[:9, 'TotalPremium'] = np.nan
+    df.loc[10:19, 'TotalClaims'] = np.nan
+    total = SegmentCube.build(df, ['Gender']).rollup(include_variance=True).iloc[0]
+    valid = df.dropna(subset=['TotalPremium', 'TotalClaims'])
+    assert total['policy_count'] == len(valid)
+    assert total['premium_sum'] == pytest.approx(valid['TotalPremium'].sum())
+    assert total['margin_var'] == pytest.approx((valid['TotalPremium'] - valid['TotalClaims']).var())
+
+def test_load_segment_cube_persists(sample_df, tmp_path):
+    """Test the cube is built once from the source file and saved next to the cache."""
+    data_path = tmp_path / 'insurance_data.txt'
+    sample_df.to_csv(data_path, sep='|', index=False)
+    dims = ['Province', 'Gender', 'TransactionMonth']
+    cube = load_segment_cube(str(data_path), cache_dir=str(tmp_path / 'cache'), dimensions=dims)
+    assert os.path.exists(get_cube_path(str(data_path), str(tmp_path / 'cache')))
+    reloaded = load_segment_cube(str(data_path), cache_dir=str(tmp_path / 'cache'), dimensions=dims)
+    pd.testing.assert_frame_equal(reloaded.rollup(['Gender']), cube.rollup(['Gender']))
+
+def test_load_rejects_cube_missing_measures(sample_df, tmp_path):
+    """Test a persisted cube without the current measures is reported as stale."""
+    path = str(tmp_path / 'cube.parquet')
+    SegmentCube.build(sample_df, ['Gender']).cells.drop(columns=['severity_sumsq']).to_parquet(path, index=False)
+    with pytest.raises(ValueError, match='severity_sumsq'):
+        SegmentCube.load(path)
+
+@pytest.mark.parametrize('metric', ['claims', 'premium', 'margin', 'severity', 'frequency'])
+def test_moments_match_group_moments(sample_df, metric):
+    """Test cube moments equal group_moments computed from the rows."""
+    values = {
+        'claims': sample_df['TotalClaims'],
+        'premium': sample_df['TotalPremium'],
+        'margin': sample_df['TotalPremium'] - sample_df['TotalClaims'],
+        'severity': sample_df['TotalClaims'].where(sample_df['TotalClaims'] > 0),
+        'frequency': (sample_df['TotalClaims'] > 0).astype(float),
+    }[metric]
+    expected = group_moments(values, sample_df['Gender']).sort_index()
+    result = SegmentCube.build(sample_df, ['Gender']).moments('Gender', metric).sort_index()
+    np.testing.assert_allclose(result.to_numpy(dtype=float), expected.to_numpy(dtype=float))
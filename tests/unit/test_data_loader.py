@@ -1,7 +1,9 @@
 """Unit tests for data_loader module."""
 
+import os
 import pytest
-from src.utils.data_loader import load_insurance_data
+import pandas as pd
+from src.utils.data_loader import load_insurance_data, iter_insurance_chunks, get_cache_path
 
 def test_load_insurance_data_missing_file():
     """Test loading a non-existent file raises FileNotFoundError."""
@@ -13,4 +15,78 @@ def test_load_insurance_data_empty_file(tmp_path):
     empty_file = tmp_path / "empty.csv"
     empty_file.write_text("")
     with pytest.raises(ValueError):
-        load_insurance_data(str(empty_file))
\ No newline at end of file
+        load_insurance_data(str(empty_file))
+
+@pytest.fixture
+def sample_file(tmp_path):
+    """Write a small pipe-delimited file in the insurance_data.txt layout."""
+    path = tmp_path / "insurance_data.txt"
+    path.write_text(
+        "PolicyID|TransactionMonth|Province|NewVehicle|WrittenOff|Cylinders|TotalPremium|TotalClaims\n"
+        "1|2015-03-01 00:00:00|Gauteng|Yes|No|4|21.93|0\n"
+        "2|2015-04-01 00:00:00|Western Cape|No||6|10.5|150.0\n"
+        "3|2015-04-01 00:00:00|Gauteng||Yes|4|bad|0\n"
+    )
+    return str(path)
+
+def test_load_insurance_data_applies_schema(sample_file, tmp_path):
+    """Test columns are cast to the declared schema dtypes."""
+    df = load_insurance_data(sample_file, cache_dir=str(tmp_path / "cache"))
+    assert str(df['PolicyID'].dtype) == 'Int32'
+    assert str(df['Province'].dtype) == 'category'
+    assert str(df['NewVehicle'].dtype) == 'boolean'
+    assert str(df['Cylinders'].dtype) == 'float32'
+    assert pd.api.types.is_datetime64_any_dtype(df['TransactionMonth'])
+    assert df['TotalPremium'].isna().sum() == 1
+    assert bool(df['WrittenOff'].iloc[2])
+
+def test_load_insurance_data_uses_columnar_cache(sample_file, tmp_path, monkeypatch):
+    """Test a repeat load is served from the Parquet cache without parsing text."""
+    cache_dir = str(tmp_path / "cache")
+    first = load_insurance_data(sample_file, cache_dir=cache_dir)
+    assert os.path.exists(get_cache_path(sample_file, cache_dir))
+
+    def fail_read_csv(*args, **kwargs):
+        raise AssertionError("text parser should not run on a cache hit")
+
+    monkeypatch.setattr(pd, "read_csv", fail_read_csv)
+    second = load_insurance_data(sample_file, cache_dir=cache_dir)
+    pd.testing.assert_frame_equal(first, second)
+
+def test_cache_key_uses_dvc_md5(sample_file, tmp_path):
+    """Test the cache file is keyed on the md5 recorded in the .dvc pointer."""
+    size = os.path.getsize(sample_file)
+    with open(sample_file + ".dvc", "w", encoding="utf-8") as f:
+        f.write(f"outs:\n- md5: {'ab' * 16}\n  size: {size}\n  path: insurance_data.txt\n")
+    assert "abababababababab" in get_cache_path(sample_file, str(tmp_path))
+
+@pytest.mark.parametrize("use_cache", [True, False])
+def test_load_insurance_data_projection_and_filters(sample_file, tmp_path, use_cache):
+    """Test columns= and filters= return only the requested columns and matching rows."""
+    df = load_insurance_data(
+        sample_file,
+        columns=['TotalPremium', 'TotalClaims'],
+        filters=[('Province', '==', 'Gauteng'), ('TransactionMonth', '>=', '2015-04-01')],
+        use_cache=use_cache,
+        cache_dir=str(tmp_path / "cache"),
+    )
+    assert df.columns.tolist() == ['TotalPremium', 'TotalClaims']
+    assert len(df) == 1
+
+def test_load_insurance_data_unknown_column(sample_file, tmp_path):
+    """Test requesting a column that is not in the file raises ValueError."""
+    with pytest.raises(ValueError):
+        load_insurance_data(sample_file, columns=['NotAColumn'], cache_dir=str(tmp_path))
+
+@pytest.mark.parametrize("use_cache", [True, False])
+def test_iter_insurance_chunks(sample_file, tmp_path, use_cache):
+    """Test chunks are typed, bounded in size and cover the filtered rows."""
+    cache_dir = str(tmp_path / "cache")
+    if use_cache:
+        load_insurance_data(sample_file, cache_dir=cache_dir)
+    chunks = list(iter_insurance_chunks(sample_file, chunksize=2, columns=['TotalClaims'],
+                                        filters=[('Province', '==', 'Gauteng')],
+                                        use_cache=use_cache, cache_dir=cache_dir))
+    assert all(len(chunk) <= 2 for chunk in chunks)
+    assert sum(len(chunk) for chunk in chunks) == 2
+    assert chunks[0].columns.tolist() == ['TotalClaims']
@@ -0,0 +1,58 @@
+"""Unit tests for data_preprocessing module."""
+
+import pytest
+import pandas as pd
+import numpy as np
+from src.utils.data_preprocessing import DataPreprocessor
+
+@pytest.fixture
+def train_df():
+    """Create a small training frame with missing values."""
+    return pd.DataFrame({
+        'VehicleType': ['Car', 'Bus', None, 'Car', 'Taxi'],
+        'TotalPremium': [100.0, np.nan, 300.0, 50.0, 20.0],
+        'TotalClaims': [0.0, 10.0, 0.0, 0.0, 5.0],
+    })
+
+def test_transform_uses_fitted_layout(train_df):
+    """Test new batches map into the training layout, unseen categories encoding as zeros."""
+    preprocessor = DataPreprocessor(categorical_cols=['VehicleType']).fit(train_df)
+    train = preprocessor.transform(train_df, sparse=False)
+    new = preprocessor.transform(pd.DataFrame({
+        'VehicleType': ['Truck', 'Taxi'],
+        'TotalPremium': [np.nan, 10.0],
+        'TotalClaims': [0.0, 0.0],
+    }), sparse=False)
+    assert new.columns.tolist() == train.columns.tolist()
+    assert new['TotalPremium'].iloc[0] == 75.0  # training median
+    assert not new.loc[0, ['VehicleType_Car', 'VehicleType_Taxi']].any()
+    assert new.loc[1, 'VehicleType_Taxi']
+
+def test_transform_does_not_modify_input(train_df):
+    """Test transform leaves the caller's frame untouched."""
+    original = train_df.copy()
+    DataPreprocessor(categorical_cols=['VehicleType']).fit_transform(train_df)
+    pd.testing.assert_frame_equal(train_df, original)
+
+def test_save_and_load_roundtrip(train_df, tmp_path):
+    """Test persisted state reproduces the same transform."""
+    preprocessor = DataPreprocessor(categorical_cols=['VehicleType']).fit(train_df)
+    path = tmp_path / "preprocessor.joblib"
+    preprocessor.save(path)
+    restored = DataPreprocessor.load(path)
+    pd.testing.assert_frame_equal(restored.transform(train_df, sparse=False),
+                                  preprocessor.transform(train_df, sparse=False))
+
+def test_transform_requires_fit(train_df):
+    """Test transform on an unfitted preprocessor raises ValueError."""
+    with pytest.raises(ValueError):
+        DataPreprocessor().transform(train_df)
+
+def test_transform_sparse_matches_dense_layout(train_df):
+    """Test the CSR design matrix equals the dense transform, column for column."""
+    preprocessor = DataPreprocessor(categorical_cols=['VehicleType']).fit(train_df)
+    matrix, names = preprocessor.transform_sparse(train_df)
+    dense = preprocessor.transform(train_df, sparse=False)
+    assert matrix.format == 'csr'
+    assert names.tolist() == dense.columns.tolist()
+    np.testing.assert_allclose(matrix.toarray(), dense.astype(float).to_numpy())
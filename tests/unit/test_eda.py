@@ -4,6 +4,7 @@ import pytest
 import pandas as pd
 import numpy as np
 from src.core.eda import InsuranceEDA
+from src.core.outliers import unpack_mask
 
 @pytest.fixture
 def sample_df():
@@ -27,4 +28,21 @@ def test_calculate_loss_ratio(sample_df):
     eda = InsuranceEDA(sample_df)
     loss_ratio = eda.calculate_loss_ratio(sample_df['TotalClaims'], sample_df['TotalPremium'])
     assert len(loss_ratio) == len(sample_df)
-    assert loss_ratio.iloc[0] == 0.5  # 50/100
\ No newline at end of file
+    assert loss_ratio.iloc[0] == 0.5  # 50/100
+
+@pytest.mark.parametrize('method, threshold', [('iqr', 1.5), ('zscore', 2.0)])
+def test_detect_outliers_all_matches_single_column(method, threshold):
+    """Test the multi-column detector agrees with detect_outliers for every column."""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'TotalPremium': rng.lognormal(4, 1, 300),
+        'TotalClaims': np.where(rng.random(300) < 0.1, rng.lognormal(7, 1, 300), 0.0),
+        'SumInsured': pd.array(np.where(rng.random(300) < 0.05, None, rng.integers(1, 10_000, 300)), dtype='Int32'),
+    })
+    eda = InsuranceEDA(df)
+    summary, packed = eda.detect_outliers_all(method=method, threshold=threshold, return_mask=True)
+    mask = unpack_mask(packed, len(summary))
+    for i, col in enumerate(summary.index):
+        expected = eda.detect_outliers(col, method, threshold).fillna(False).to_numpy(dtype=bool)
+        np.testing.assert_array_equal(mask[:, i], expected)
+        assert summary.loc[col, 'n_outliers'] == expected.sum()
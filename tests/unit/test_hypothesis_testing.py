@@ -0,0 +1,97 @@
+"""Unit tests for hypothesis_testing module."""
+
+import pytest
+import pandas as pd
+import numpy as np
+from src.stats import hypothesis_testing as ht
+from src.stats.batch_testing import HypothesisSpec, run_hypothesis_batch
+
+@pytest.fixture
+def claims_df():
+    """Create a zero-inflated claims DataFrame with three provinces."""
+    rng = np.random.default_rng(0)
+    n = 1000
+    df = pd.DataFrame({
+        'Province': rng.choice(['Gauteng', 'KwaZulu-Natal', 'Western Cape'], n),
+        'TotalClaims': np.where(rng.random(n) < 0.1, rng.exponential(1000, n), 0.0),
+        'TotalPremium': rng.random(n) * 100,
+    })
+    df.loc[3, 'TotalPremium'] = np.nan
+    return df
+
+def _chunks(df, size=97):
+    return (df.iloc[i:i + size] for i in range(0, len(df), size))
+
+def test_calculate_metrics_streaming_matches_in_memory(claims_df):
+    """Test streamed metrics equal the in-memory calculation."""
+    expected = ht.calculate_metrics(claims_df)
+    streamed = ht.calculate_metrics_streaming(_chunks(claims_df))
+    for key, value in expected.items():
+        assert streamed[key] == pytest.approx(value)
+
+def test_segment_data_streaming_matches_in_memory(claims_df):
+    """Test streamed segmentation has the same layout and values as segment_data."""
+    expected = ht.segment_data(claims_df, 'Province')
+    streamed = ht.segment_data_streaming(_chunks(claims_df), 'Province')
+    pd.testing.assert_frame_equal(streamed, expected)
+
+def test_segment_data_streaming_variance(claims_df):
+    """Test variances folded from sums of squares match pandas."""
+    streamed = ht.segment_data_streaming(_chunks(claims_df), 'Province', include_variance=True)
+    expected = claims_df.groupby('Province')['TotalClaims'].var().to_numpy()
+    np.testing.assert_allclose(streamed[('TotalClaims', 'var')].to_numpy(), expected)
+
+@pytest.mark.parametrize("is_categorical", [True, False])
+def test_summary_backend_matches_rows_backend(claims_df, is_categorical):
+    """Test statistics from group summaries equal the row-level implementation."""
+    summary, _ = ht.test_hypothesis(claims_df, 'Province', 'TotalClaims', is_categorical, tukey='summary')
+    rows, _ = ht.test_hypothesis(claims_df, 'Province', 'TotalClaims', is_categorical, backend='rows')
+    assert summary['p_value'] == pytest.approx(rows['p_value'])
+    if not is_categorical:
+        assert summary['anova_statistic'] == pytest.approx(rows['anova_statistic'])
+        tukey = summary['tukey_results']
+        np.testing.assert_allclose(tukey['meandiff'], rows['tukey_results'].meandiffs)
+        np.testing.assert_allclose(tukey['p-adj'], rows['tukey_results'].pvalues, atol=1e-3)
+
+@pytest.mark.parametrize("equal_var", [True, False])
+def test_summary_ttest_with_series_metric(claims_df, equal_var):
+    """Test a two-group t-test on a Series metric without copying rows."""
+    two = claims_df[claims_df['Province'].isin(['Gauteng', 'Western Cape'])]
+    margin = claims_df['TotalPremium'] - claims_df['TotalClaims']
+    summary, out = ht.test_hypothesis(two, 'Province', margin, equal_var=equal_var)
+    rows, _ = ht.test_hypothesis(two, 'Province', margin, equal_var=equal_var, backend='rows')
+    assert summary['statistic'] == pytest.approx(rows['statistic'])
+    assert out is two
+
+def test_summary_backend_keeps_statsmodels_tukey_by_default(claims_df):
+    """Test the default Tukey result is the statsmodels object of the row-level backend."""
+    summary, _ = ht.test_hypothesis(claims_df, 'Province', 'TotalClaims')
+    rows, _ = ht.test_hypothesis(claims_df, 'Province', 'TotalClaims', backend='rows')
+    assert type(summary['tukey_results']) is type(rows['tukey_results'])
+    np.testing.assert_array_equal(summary['tukey_results'].reject, rows['tukey_results'].reject)
+
+def test_run_hypothesis_batch_matches_single_tests(claims_df):
+    """Test the batch runner reproduces individual test_hypothesis p-values."""
+    specs = [
+        ('Province', 'claims', 'auto'),
+        ('Province', 'frequency', 'chi2'),
+        HypothesisSpec('Province', 'margin', 'welch', groups=['Gauteng', 'Western Cape']),
+    ]
+    results = run_hypothesis_batch(specs, df=claims_df, n_jobs=2)
+    assert results['test'].tolist() == ['anova', 'chi2', 'welch']
+
+    anova, _ = ht.test_hypothesis(claims_df, 'Province', 'TotalClaims')
+    chi2, _ = ht.test_hypothesis(claims_df, 'Province', 'TotalClaims', is_categorical=True)
+    assert results['p_value'].iloc[0] == pytest.approx(anova['p_value'])
+    assert results['p_value'].iloc[1] == pytest.approx(chi2['p_value'])
+    assert (results['p_adjusted'] >= results['p_value']).all()
+
+@pytest.mark.parametrize("spec", [
+    ('Province', 'margin', 'chi2'),
+    ('Province', 'claims', 'ttest'),
+    HypothesisSpec('Province', 'margin', 'welch', groups=['Gauteng']),
+])
+def test_run_hypothesis_batch_rejects_unusable_specs(claims_df, spec):
+    """Test chi2 with a non-frequency metric and t-tests without exactly two groups raise ValueError."""
+    with pytest.raises(ValueError):
+        run_hypothesis_batch([spec], df=claims_df)
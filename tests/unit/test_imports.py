@@ -0,0 +1,43 @@
+"""Import tests for the src package: heavy dependencies load lazily."""
+
+import json
+import os
+import subprocess
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+HEAVY = ('matplotlib', 'seaborn', 'statsmodels', 'shap', 'sklearn', 'xgboost')
+
+# Import time itself is tracked by benchmarks/bench_imports.py rather than asserted here.
+PROBE = """
+import json, sys
+import {module}
+print(json.dumps({{'heavy': sorted({{m.split('.')[0] for m in sys.modules}} & set({heavy!r}))}}))
+"""
+
+def _probe(module):
+    """Import a module in a fresh interpreter and report the heavy dependencies it loaded."""
+    output = subprocess.run([sys.executable, '-c', PROBE.format(module=module, heavy=HEAVY)], cwd=ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def test_data_loader_import_is_light():
+    """Test importing data_loader loads no plotting or modelling libraries."""
+    assert _probe('src.utils.data_loader')['heavy'] == []
+
+@pytest.mark.parametrize('module', ['src', 'src.core', 'src.stats.hypothesis_testing', 'src.stats.batch_testing',
+                                    'src.stats.resampling',
+                                    'src.utils.model_interpretation'])
+def test_heavy_dependencies_load_lazily(module):
+    """Test plotting, Tukey and SHAP dependencies are not loaded until a function needs them."""
+    assert _probe(module)['heavy'] == []
+
+def test_lazy_attributes_resolve():
+    """Test submodules and plotting helpers are still reachable from the package namespaces."""
+    import src
+    import src.utils
+    assert src.eda.InsuranceEDA is not None
+    assert callable(src.utils.plot_temporal_trend)
+    with pytest.raises(AttributeError):
+        getattr(src.utils, 'missing_name')
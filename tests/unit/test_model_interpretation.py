@@ -0,0 +1,50 @@
+"""Unit tests for model_interpretation module."""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse as sp
+from sklearn.linear_model import LinearRegression
+from xgboost import XGBRegressor
+from src.utils.model_interpretation import fast_shap_values, get_top_features, plot_shap_summary, sample_rows
+
+def _data():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.random((400, 6)), columns=[f'f{i}' for i in range(6)])
+    y = 3 * X['f0'] + X['f1'] + rng.normal(0, 0.1, 400)
+    return X, y
+
+def test_sample_rows_keeps_rare_strata():
+    """Test stratified sampling keeps at least one row of a rare stratum."""
+    strata = np.zeros(1000, dtype=int)
+    strata[7] = 1
+    rows = sample_rows(1000, 50, strata=strata)
+    assert 7 in rows
+    assert len(rows) <= 51
+
+def test_fast_shap_values_tree_model_on_sparse_input():
+    """Test tree models are explained from CSR input with names passed separately."""
+    X, y = _data()
+    model = XGBRegressor(n_estimators=20, max_depth=3).fit(X.to_numpy(), y)
+    explanation = fast_shap_values(model, None, sp.csr_matrix(X.to_numpy()), feature_names=X.columns.tolist(),
+                                   n_explain=100, batch_size=30, n_jobs=2)
+    assert explanation.values.shape == (100, 6)
+    assert get_top_features(explanation, top_n=1)['feature_name'].iloc[0] == 'f0'
+
+def test_fast_shap_values_linear_model_with_background():
+    """Test linear models are explained against a summarised background."""
+    X, y = _data()
+    model = LinearRegression().fit(X, y)
+    explanation = fast_shap_values(model, X, X, n_explain=50, background_size=10)
+    assert explanation.values.shape == (50, 6)
+    assert get_top_features(explanation, top_n=2)['feature_name'].tolist() == ['f0', 'f1']
+
+def test_plot_shap_summary_saves_and_closes_without_show(tmp_path):
+    """Test show=False writes the summary and leaves no open figure."""
+    import matplotlib.pyplot as plt
+    X, y = _data()
+    model = XGBRegressor(n_estimators=10, max_depth=2).fit(X, y)
+    explanation = fast_shap_values(model, None, X, n_explain=50)
+    path = tmp_path / 'shap.png'
+    plot_shap_summary(explanation, save_path=str(path), show=False)
+    assert path.exists()
+    assert plt.get_fignums() == []
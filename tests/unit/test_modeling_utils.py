@@ -0,0 +1,54 @@
+"""Unit tests for modeling_utils module."""
+
+import pandas as pd
+import numpy as np
+from scipy import sparse as sp
+from src.utils.modeling_utils import ModelEvaluator, to_model_matrix
+
+def test_to_model_matrix_keeps_sparse_columns_sparse():
+    """Test pandas sparse columns become CSR instead of being densified."""
+    X = pd.DataFrame({
+        'TotalPremium': [1.0, 2.0, 3.0],
+        'Bank_A': pd.arrays.SparseArray([True, False, False], fill_value=False),
+    })
+    matrix = to_model_matrix(X)
+    assert sp.issparse(matrix) and matrix.format == 'csr'
+    np.testing.assert_array_equal(matrix.toarray(), [[1.0, 1.0], [2.0, 0.0], [3.0, 0.0]])
+
+def test_to_model_matrix_keeps_column_order():
+    """Test mixed dense and sparse columns keep their frame order in the CSR matrix."""
+    X = pd.DataFrame({
+        'Bank_A': pd.arrays.SparseArray([1.0, 0.0, 0.0], fill_value=0.0),
+        'TotalPremium': [1.0, 2.0, 3.0],
+        'SumInsured': [4.0, 5.0, 6.0],
+        'Bank_B': pd.arrays.SparseArray([0.0, 1.0, 0.0], fill_value=0.0),
+    })
+    expected = [[1.0, 1.0, 4.0, 0.0], [0.0, 2.0, 5.0, 1.0], [0.0, 3.0, 6.0, 0.0]]
+    np.testing.assert_array_equal(to_model_matrix(X).toarray(), expected)
+
+def test_train_evaluate_probability_accepts_csr():
+    """Test probability models train directly on a CSR matrix."""
+    rng = np.random.default_rng(0)
+    X = sp.random(200, 30, density=0.1, format='csr', random_state=0)
+    y = (rng.random(200) < 0.3).astype(int)
+    accuracy, _, _, _, model = ModelEvaluator().train_evaluate_probability(
+        X[:150], X[150:], y[:150], y[150:], 'LogisticRegression')
+    assert 0.0 <= accuracy <= 1.0
+    assert hasattr(model, 'coef_')
+
+def test_run_all_reports_metrics_and_costs():
+    """Test run_all trains every model and returns metrics with timing and memory columns."""
+    rng = np.random.default_rng(0)
+    X = rng.random((120, 5))
+    y_severity = rng.exponential(100, 120)
+    y_claim = (rng.random(120) < 0.4).astype(int)
+    evaluator = ModelEvaluator()
+    results = evaluator.run_all(
+        severity_data=(X[:90], X[90:], y_severity[:90], y_severity[90:]),
+        probability_data=(X[:90], X[90:], y_claim[:90], y_claim[90:]),
+        n_jobs=2,
+    )
+    assert len(results) == 8
+    assert {'rmse', 'f1', 'fit_time_s', 'predict_time_s', 'peak_memory_mb'} <= set(results.columns)
+    assert (results['fit_time_s'] > 0).all()
+    assert hasattr(evaluator.severity_models['XGBoost'], 'feature_importances_')
@@ -0,0 +1,42 @@
+"""Unit tests for outliers module."""
+
+import pytest
+import pandas as pd
+import numpy as np
+from src.core.outliers import QuantileSketch, detect_outliers_frame, detect_outliers_streaming
+
+@pytest.fixture
+def numeric_df():
+    """Create a skewed numeric sample."""
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'TotalPremium': rng.lognormal(4, 1, 20_000),
+        'SumInsured': rng.normal(5000, 1000, 20_000),
+    })
+
+def test_quantile_sketch_is_accurate_and_mergeable():
+    """Test sketched quantiles stay within a small rank error, also after merging."""
+    values = np.random.default_rng(1).exponential(1.0, 100_000)
+    left = QuantileSketch(k=200, random_state=0).update(values[:50_000])
+    right = QuantileSketch(k=200, random_state=1).update(values[50_000:])
+    merged = left.merge(right)
+    assert merged.n == values.size
+    assert sum(level.size for level in merged.levels) < 1000
+    for q, estimate in zip([0.25, 0.5, 0.75, 0.99], merged.quantile([0.25, 0.5, 0.75, 0.99])):
+        assert abs((values <= estimate).mean() - q) < 0.02
+
+def test_streaming_zscore_matches_in_memory(numeric_df):
+    """Test z-score detection over chunks gives the same bounds and mask as in memory."""
+    chunks = lambda: (numeric_df.iloc[i:i + 3000] for i in range(0, len(numeric_df), 3000))
+    summary, packed = detect_outliers_streaming(chunks, list(numeric_df.columns), 'zscore', 3.0, return_mask=True)
+    expected, expected_packed = detect_outliers_frame(numeric_df, list(numeric_df.columns), 'zscore', 3.0,
+                                                      return_mask=True)
+    np.testing.assert_allclose(summary[['lower', 'upper']], expected[['lower', 'upper']])
+    np.testing.assert_array_equal(packed, expected_packed)
+
+def test_streaming_iqr_is_close_to_exact(numeric_df):
+    """Test sketched IQR fences give outlier counts close to the exact ones."""
+    chunks = lambda: (numeric_df.iloc[i:i + 3000] for i in range(0, len(numeric_df), 3000))
+    summary = detect_outliers_streaming(chunks, list(numeric_df.columns), 'iqr', 1.5)
+    expected = detect_outliers_frame(numeric_df, list(numeric_df.columns), 'iqr', 1.5)
+    np.testing.assert_allclose(summary['outlier_rate'], expected['outlier_rate'], atol=0.01)
@@ -0,0 +1,50 @@
+"""Unit tests for the pipeline runner."""
+
+import json
+import pytest
+import pandas as pd
+import numpy as np
+from src.services.pipeline import Pipeline, Stage, build_insurance_pipeline
+
+def test_pipeline_runs_in_dependency_order_and_reports(tmp_path):
+    """Test stages receive their dependencies' outputs and the report records each stage."""
+    pipeline = Pipeline([
+        Stage('double', lambda df: df * 2, ('load',)),
+        Stage('load', lambda: pd.DataFrame({'x': np.arange(10.0)})),
+        Stage('head', lambda df: df.head(3), ('double',)),
+    ])
+    outputs, report = pipeline.run(profile=['double'], trace_memory=['head'],
+                                   report_path=str(tmp_path / 'report.json'))
+    assert pipeline.order == ['load', 'double', 'head']
+    assert outputs['head']['x'].tolist() == [0.0, 2.0, 4.0]
+    records = {record['stage']: record for record in json.loads((tmp_path / 'report.json').read_text())['stages']}
+    assert records['head']['rows_in'] == 10 and records['head']['rows_out'] == 3
+    assert records['load']['output_mb'] > 0 and records['load']['wall_s'] >= 0
+    assert 'profile_top' in records['double'] and 'tracemalloc_peak_mb' in records['head']
+
+def test_pipeline_rejects_cycles():
+    """Test a dependency cycle is reported at construction."""
+    with pytest.raises(ValueError, match='cycle'):
+        Pipeline([Stage('a', lambda b: b, ('b',)), Stage('b', lambda a: a, ('a',))])
+
+def test_insurance_pipeline_end_to_end(tmp_path):
+    """Test the declared modelling pipeline runs on a small source file."""
+    rng = np.random.default_rng(0)
+    n = 400
+    pd.DataFrame({
+        'PolicyID': np.arange(n),
+        'TransactionMonth': '2015-03-01 00:00:00',
+        'Province': rng.choice(['Gauteng', 'Western Cape'], n),
+        'Gender': rng.choice(['Male', 'Female'], n),
+        'RegistrationYear': rng.integers(2000, 2015, n),
+        'SumInsured': rng.exponential(1000, n),
+        'TotalPremium': rng.exponential(100, n),
+        'TotalClaims': np.where(rng.random(n) < 0.3, rng.exponential(500, n), 0.0),
+    }).to_csv(tmp_path / 'insurance_data.txt', sep='|', index=False)
+    pipeline = build_insurance_pipeline(str(tmp_path / 'insurance_data.txt'), models=['XGBoost'], n_jobs=1,
+                                        shap_rows=50)
+    outputs, report = pipeline.run()
+    assert [record['stage'] for record in report['stages']] == [
+        'load', 'handle_missing', 'feature_engineering', 'encode', 'split', 'train', 'shap']
+    assert set(outputs['train']['results']['task']) == {'severity', 'probability'}
+    assert len(outputs['shap']) > 0
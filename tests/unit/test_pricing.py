@@ -0,0 +1,89 @@
+"""Unit tests for the frequency-severity pricing model."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression, LogisticRegression
+from src.models.pricing import FrequencySeverityModel, loaded_premium
+from src.services.scoring import ScoringService
+from src.utils.data_preprocessing import DataPreprocessor
+
+@pytest.fixture
+def book():
+    """Policies whose claim rate and claim size both grow with SumInsured."""
+    rng = np.random.default_rng(0)
+    n = 2_000
+    df = pd.DataFrame({
+        'SumInsured': rng.uniform(0, 1, n),
+        'VehicleType': rng.choice(['Passenger Vehicle', 'Bus'], n),
+    })
+    claims = np.where(rng.random(n) < 0.05 + 0.2 * df['SumInsured'], 1000 + 5000 * df['SumInsured'], 0.0)
+    return df, claims
+
+def test_loaded_premium_formula():
+    """Test premium is expected loss times one plus the expense and profit loadings."""
+    np.testing.assert_allclose(loaded_premium([0.5], [100.0], 0.10, 0.05), [57.5])
+
+def test_severity_is_fitted_on_claimants_only(book):
+    """Test the severity model learns claim size given a claim rather than the zero-inflated average."""
+    df, claims = book
+    model = FrequencySeverityModel(LogisticRegression(), LinearRegression()).fit(df[['SumInsured']], claims)
+    assert model.n_claimants_ == int((claims > 0).sum())
+    severity = model.predict_severity(pd.DataFrame({'SumInsured': [0.0, 1.0]}))
+    np.testing.assert_allclose(severity, [1000.0, 6000.0], rtol=1e-6)
+
+def test_price_combines_both_parts(book):
+    """Test price returns probability x severity as expected loss and the loaded premium, on the input index."""
+    df, claims = book
+    X = df[['SumInsured']].set_axis(df.index + 100)
+    model = FrequencySeverityModel(LogisticRegression(), LinearRegression(), expense_loading=0.2,
+                                   profit_margin=0.1).fit(X, claims)
+    priced = model.price(X)
+    assert priced.index.equals(X.index)
+    np.testing.assert_allclose(priced['expected_loss'], model.predict_frequency(X) * model.predict_severity(X))
+    np.testing.assert_allclose(priced['premium'], priced['expected_loss'] * 1.3)
+    np.testing.assert_allclose(model.predict_premium(X), priced['premium'])
+    # Loss cost should roughly match the observed claims of the book.
+    assert priced['expected_loss'].sum() == pytest.approx(claims.sum(), rel=0.1)
+
+def test_default_models_train_on_sparse_matrix(book):
+    """Test the default XGBoost parts fit and price a CSR design matrix."""
+    df, claims = book
+    X = DataPreprocessor(categorical_cols=['VehicleType']).fit(df).transform_sparse(df)[0]
+    premium = FrequencySeverityModel(n_jobs=1).fit(X, claims).predict_premium(X)
+    assert premium.shape == (len(df),) and (premium >= 0).all()
+
+def test_scoring_service_accepts_pricing_model(book):
+    """Test ScoringService scores with a FrequencySeverityModel and its loaded premium."""
+    df, claims = book
+    preprocessor = DataPreprocessor(categorical_cols=['VehicleType']).fit(df)
+    X = preprocessor.transform_sparse(df)[0]
+    model = FrequencySeverityModel(LogisticRegression(), LinearRegression()).fit(X, claims)
+    scored = ScoringService(preprocessor, pricing_model=model, batch_size=500).score(df)
+    np.testing.assert_allclose(scored['premium'], model.predict_premium(X))
+    with pytest.raises(ValueError):
+        ScoringService(preprocessor)
+
+def test_scoring_service_uses_pricing_model_loadings(book):
+    """Test the service prices with the pricing model's own loadings unless they are overridden."""
+    df, claims = book
+    preprocessor = DataPreprocessor(categorical_cols=['VehicleType']).fit(df)
+    X = preprocessor.transform_sparse(df)[0]
+    model = FrequencySeverityModel(LogisticRegression(), LinearRegression(), expense_loading=0.2,
+                                   profit_margin=0.1).fit(X, claims)
+    service = ScoringService(preprocessor, pricing_model=model)
+    assert (service.expense_loading, service.profit_margin) == (0.2, 0.1)
+    np.testing.assert_allclose(service.score(df)['premium'], model.predict_premium(X))
+    overridden = ScoringService(preprocessor, pricing_model=model, expense_loading=0.0, profit_margin=0.0)
+    np.testing.assert_allclose(overridden.score(df)['premium'], model.predict_expected_loss(X))
+
+def test_model_pair_and_pricing_model_quote_the_same_premium(book):
+    """Test a severity/probability pair and the equivalent FrequencySeverityModel are priced identically."""
+    df, claims = book
+    preprocessor = DataPreprocessor(categorical_cols=['VehicleType']).fit(df)
+    X = preprocessor.transform_sparse(df)[0]
+    model = FrequencySeverityModel(LogisticRegression(), LinearRegression(), expense_loading=0.2,
+                                   profit_margin=0.1).fit(X, claims)
+    pair = ScoringService(preprocessor, model.severity_model_, model.frequency_model_, expense_loading=0.2,
+                          profit_margin=0.1).score(df)
+    pd.testing.assert_frame_equal(pair, ScoringService(preprocessor, pricing_model=model).score(df))
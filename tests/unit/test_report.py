@@ -0,0 +1,58 @@
+"""Unit tests for the headless report renderer and aggregate plot helpers."""
+
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from src.core.cube import SegmentCube
+from src.services.report import generate_eda_report
+from src.utils.synthetic import generate_insurance_data
+from src.utils.visualizations import box_stats, plot_temporal_trend, proportion_ci, ratio_ci
+
+@pytest.fixture
+def insurance_df():
+    """Small synthetic insurance dataset."""
+    return generate_insurance_data(5_000, random_state=1)
+
+def test_ratio_ci_matches_row_level_delta_method():
+    """Test the interval from sums equals the delta-method interval computed from the rows."""
+    rng = np.random.default_rng(0)
+    x = rng.gamma(2.0, 50.0, 400)
+    y = x * rng.uniform(0, 2, 400)
+    ratio, lower, upper = ratio_ci(y.sum(), x.sum(), (y ** 2).sum(), (x ** 2).sum(), (x * y).sum(), len(x))
+    expected_ratio = y.sum() / x.sum()
+    se = np.std(y - expected_ratio * x, ddof=1) / np.sqrt(len(x)) / x.mean()
+    assert ratio == pytest.approx(expected_ratio)
+    assert upper - ratio == pytest.approx(1.959963984540054 * se)
+    assert ratio - lower == pytest.approx(upper - ratio)
+
+def test_proportion_ci_brackets_estimate():
+    """Test the Wilson interval contains the observed rate and stays within [0, 1]."""
+    lower, upper = proportion_ci([0, 5, 50], [50, 50, 50])
+    assert lower[0] == pytest.approx(0, abs=1e-12) and upper[2] == pytest.approx(1)
+    assert lower[1] < 0.1 < upper[1]
+
+def test_box_stats_match_matplotlib(insurance_df):
+    """Test grouped box statistics equal matplotlib's per-group boxplot_stats."""
+    from matplotlib.cbook import boxplot_stats
+    stats = box_stats(insurance_df, 'Province', 'TotalPremium')
+    for entry in stats:
+        values = insurance_df.loc[insurance_df['Province'].astype(str) == entry['label'], 'TotalPremium'].to_numpy()
+        expected = boxplot_stats(values)[0]
+        for key in ('med', 'q1', 'q3', 'whislo', 'whishi'):
+            assert entry[key] == pytest.approx(expected[key])
+
+def test_generate_eda_report_writes_figures(insurance_df, tmp_path):
+    """Test the report renders every figure from the cube and row statistics into the output directory."""
+    cube = SegmentCube.build(insurance_df, ['Province', 'Gender', 'TransactionMonth'])
+    report = generate_eda_report(insurance_df, cube, out_dir=str(tmp_path), n_jobs=1)
+    assert {'loss_ratio_by_Province', 'claim_frequency_by_Gender', 'loss_ratio_province_gender',
+            'monthly_claim_frequency', 'distribution_TotalClaims', 'claim_severity_make_box'} <= set(report['name'])
+    assert all(os.path.getsize(path) > 0 for path in report['path'])
+
+def test_plot_temporal_trend_leaves_frame_unchanged(insurance_df, tmp_path):
+    """Test the trend plot no longer adds columns to the caller's frame and saves without showing."""
+    before = insurance_df.copy()
+    plot_temporal_trend(insurance_df, 'TransactionMonth', str(tmp_path / 'trend.png'), show=False)
+    pd.testing.assert_frame_equal(insurance_df, before)
+    assert (tmp_path / 'trend.png').exists()
@@ -0,0 +1,70 @@
+"""Unit tests for the bootstrap and permutation engine."""
+
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from src.stats.resampling import compare_segments, group_segments
+
+@pytest.fixture
+def segments():
+    """Two provinces where Gauteng claims more often than Western Cape."""
+    rng = np.random.default_rng(0)
+    n = 20_000
+    province = rng.choice(['Gauteng', 'Western Cape'], n)
+    rate = np.where(province == 'Gauteng', 0.08, 0.04)
+    return pd.DataFrame({
+        'Province': province,
+        'TotalPremium': np.round(rng.gamma(2.0, 50.0, n), 2),
+        'TotalClaims': np.where(rng.random(n) < rate, np.round(rng.lognormal(7, 1, n), 2), 0.0),
+    })
+
+def test_group_segments_keeps_exact_totals(segments):
+    """Test grouping on rounded values keeps per-segment row counts and premium and claims totals."""
+    arrays = group_segments(segments, 'Province', ['Gauteng', 'Western Cape'], significant_digits=2)
+    assert arrays.values.shape[0] < len(segments)
+    sums = arrays.counts @ arrays.values
+    for i, label in enumerate(arrays.labels):
+        rows = segments[segments['Province'] == label]
+        np.testing.assert_allclose(sums[i, :3], [len(rows), rows['TotalPremium'].sum(), rows['TotalClaims'].sum()])
+
+def test_compare_segments_estimates_and_intervals(segments):
+    """Test point estimates match direct computation and the frequency difference is detected."""
+    result = compare_segments(segments, 'Province', ['Gauteng', 'Western Cape'], n_resamples=2_000, n_jobs=1)
+    gauteng = segments[segments['Province'] == 'Gauteng']
+    assert result.loc['loss_ratio', 'estimate_a'] == pytest.approx(
+        gauteng['TotalClaims'].sum() / gauteng['TotalPremium'].sum())
+    assert result.loc['margin', 'estimate_a'] == pytest.approx(
+        (gauteng['TotalPremium'] - gauteng['TotalClaims']).mean())
+    frequency = result.loc['frequency']
+    assert frequency['ci_lower'] < frequency['difference'] < frequency['ci_upper']
+    assert frequency['ci_lower'] > 0
+    assert frequency['p_value'] < 0.01
+
+def test_permutation_p_value_under_null(segments):
+    """Test the permutation test does not reject when segments are a random split of the same rows."""
+    shuffled = segments.assign(Province=np.random.default_rng(1).permutation(segments['Province'].to_numpy()))
+    null = shuffled[shuffled['TotalClaims'] == 0].assign(TotalClaims=0.0)
+    result = compare_segments(pd.concat([null, shuffled[shuffled['TotalClaims'] > 0]]), 'Province',
+                              statistics=['frequency'], n_resamples=1_000, n_jobs=1)
+    assert result.loc['frequency', 'p_value'] > 0.05
+
+def test_results_reproducible_across_n_jobs(segments):
+    """Test a fixed seed gives identical results regardless of the number of workers."""
+    kwargs = dict(groups=['Gauteng', 'Western Cape'], n_resamples=600, block_size=100, random_state=7)
+    serial = compare_segments(segments, 'Province', n_jobs=1, **kwargs)
+    parallel = compare_segments(segments, 'Province', n_jobs=2, **kwargs)
+    pd.testing.assert_frame_equal(serial, parallel)
+
+def test_rejects_bad_inputs(segments):
+    """Test more than two segments and unknown statistics raise ValueError."""
+    with pytest.raises(ValueError, match='exactly two'):
+        compare_segments(segments.assign(Province=np.arange(len(segments)) % 3), 'Province')
+    with pytest.raises(ValueError, match='Unknown statistics'):
+        compare_segments(segments, 'Province', statistics=['severity'])
+
+def test_ten_thousand_resamples_in_seconds(segments):
+    """Test 10k bootstrap resamples and permutations of all statistics finish within seconds."""
+    start = time.perf_counter()
+    compare_segments(segments, 'Province', n_resamples=10_000, n_jobs=1)
+    assert time.perf_counter() - start < 10
@@ -0,0 +1,65 @@
+"""Unit tests for the scoring service."""
+
+import json
+import threading
+import urllib.request
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression, LogisticRegression
+from src.models.pricing import loaded_premium
+from src.services.scoring import ScoringService, make_server, risk_premium
+from src.utils.data_preprocessing import DataPreprocessor
+
+@pytest.fixture
+def service():
+    """Create a scoring service on a small fitted preprocessor and models."""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'SumInsured': rng.exponential(1000, 200),
+        'VehicleType': rng.choice(['Passenger Vehicle', 'Bus', 'Heavy Commercial'], 200),
+    })
+    preprocessor = DataPreprocessor(categorical_cols=['VehicleType']).fit(df)
+    X = preprocessor.transform_sparse(df)[0]
+    severity_model = LinearRegression().fit(X, rng.exponential(100, 200))
+    probability_model = LogisticRegression().fit(X, (rng.random(200) < 0.3).astype(int))
+    return ScoringService(preprocessor, severity_model, probability_model, batch_size=64), df
+
+def test_risk_premium_formula():
+    """Test premium is probability x severity plus expense and profit loading on severity."""
+    np.testing.assert_allclose(risk_premium([0.5], [100.0], 0.10, 0.05), [65.0])
+
+def test_score_batches_and_reports_latency(service):
+    """Test records are scored in micro-batches with latency statistics recorded."""
+    scoring, df = service
+    scored = scoring.score(df)
+    assert scored.index.equals(df.index)
+    np.testing.assert_allclose(
+        scored['premium'], loaded_premium(scored['claim_probability'], scored['predicted_severity']))
+    report = scoring.latency_report()
+    assert report['batches'] == 4 and report['rows'] == 200
+    assert report['p99_ms'] >= report['p50_ms'] > 0
+
+def test_score_accepts_records_and_bundle_roundtrip(service, tmp_path):
+    """Test scoring a list of dicts matches the frame result after save/load."""
+    scoring, df = service
+    scoring.save(tmp_path / 'bundle.joblib')
+    loaded = ScoringService.load(tmp_path / 'bundle.joblib')
+    records = df.head(5).to_dict(orient='records')
+    pd.testing.assert_frame_equal(loaded.score(records), scoring.score(df.head(5)))
+
+def test_http_score_endpoint(service):
+    """Test the HTTP server scores a JSON list of records."""
+    scoring, df = service
+    server = make_server(scoring, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        body = json.dumps(df.head(3).to_dict(orient='records')).encode()
+        request = urllib.request.Request(f'http://127.0.0.1:{server.server_port}/score', data=body)
+        with urllib.request.urlopen(request, timeout=10) as response:
+            result = json.loads(response.read())
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert len(result) == 3 and set(result[0]) == {'claim_probability', 'predicted_severity', 'premium'}
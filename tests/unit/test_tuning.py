@@ -0,0 +1,85 @@
+"""Unit tests for tuning module."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.tree import DecisionTreeRegressor
+from xgboost import XGBClassifier
+from src.utils.modeling_utils import ModelEvaluator
+from src.utils.tuning import _subsample, hyperband, random_folds, successive_halving, time_folds
+
+@pytest.fixture
+def regression_data():
+    """Noisy non-linear regression data with a monthly time stamp."""
+    rng = np.random.default_rng(0)
+    X = rng.random((1_200, 4))
+    y = 100 * np.sin(6 * X[:, 0]) + 50 * X[:, 1] + rng.normal(0, 10, 1_200)
+    months = pd.Series(pd.date_range('2014-01-01', periods=12, freq='MS')).repeat(100).to_numpy()
+    return X, y, months
+
+def test_time_folds_train_before_validation(regression_data):
+    """Test every fold validates on months strictly after its training months."""
+    _, _, months = regression_data
+    folds = time_folds(months, n_splits=3)
+    assert len(folds) == 3
+    for train, val in folds:
+        assert months[train].max() < months[val].min()
+    assert len(folds[0][0]) < len(folds[-1][0])
+
+def test_successive_halving_narrows_to_full_rows(regression_data):
+    """Test candidates are cut by eta each round and the last round trains on the full rows."""
+    X, y, _ = regression_data
+    space = {'max_depth': [1, 2, 4, 8, None], 'min_samples_leaf': [1, 10, 50]}
+    result = successive_halving(DecisionTreeRegressor(random_state=0), space, X, y, 'severity',
+                                random_folds(len(y), 3), n_candidates=9, eta=3, min_rows=50, n_jobs=1)
+    per_round = result['trials'].groupby('round')['candidate'].count().tolist()
+    assert per_round == [9, 3, 1]
+    assert result['trials']['fraction'].max() == 1.0
+    assert result['best_rmse'] == pytest.approx(-result['trials'].query('fraction == 1')['score'].max())
+    assert result['best_params']['max_depth'] not in (1, 2)
+
+def test_hyperband_runs_every_bracket(regression_data):
+    """Test Hyperband runs one bracket per starting subsample size."""
+    X, y, _ = regression_data
+    result = hyperband(DecisionTreeRegressor(random_state=0), {'max_depth': [1, 2, 4, 8, None]}, X, y, 'severity',
+                       random_folds(len(y), 2), eta=3, min_rows=100, n_jobs=1)
+    assert sorted(result['trials']['bracket'].unique()) == [0, 1]
+
+def test_tune_refits_models_with_time_folds(regression_data):
+    """Test ModelEvaluator.tune replaces the model with a refit, early-stopped XGBoost."""
+    X, y, months = regression_data
+    evaluator = ModelEvaluator()
+    summary = evaluator.tune('severity', X, y, months=months, model_names=['XGBoost', 'LinearRegression'],
+                             method='halving', n_candidates=3, min_rows=200, n_jobs=1)
+    assert summary['model'].tolist() == ['XGBoost']
+    assert summary.loc[0, 'cv_rmse'] > 0
+    model = evaluator.severity_models['XGBoost']
+    result = evaluator.tuning_results[('severity', 'XGBoost')]
+    assert model.get_params()['n_estimators'] == round(result['best_n_estimators'])
+    assert model.predict(X[:5]).shape == (5,)
+
+def test_probability_subsample_mixes_classes():
+    """Test stratified subsamples keep both classes in their leading early-stopping slice."""
+    y = (np.arange(10_000) % 20 == 0).astype(int)
+    rows = _subsample(np.arange(10_000), y, 1 / 9, 'probability', seed=0)
+    assert y[rows].sum() == int(np.ceil(500 / 9))
+    assert 0 < y[rows[:len(rows) // 7]].sum() < len(rows) // 7
+    assert set(rows) <= set(_subsample(np.arange(10_000), y, 1 / 3, 'probability', seed=0))
+
+def test_tune_probability_xgboost():
+    """Test tuning an early-stopped XGBoost classifier on rare claims scores F1 and refits."""
+    rng = np.random.default_rng(0)
+    X = rng.random((3_000, 3))
+    y = (rng.random(3_000) < 0.02 + 0.2 * X[:, 0]).astype(int)
+    evaluator = ModelEvaluator()
+    summary = evaluator.tune('probability', X, y, model_names=['XGBoost'], min_rows=300, n_jobs=1)
+    assert 0 < summary.loc[0, 'cv_f1'] <= 1
+    trials = evaluator.tuning_results[('probability', 'XGBoost')]['trials']
+    assert trials.query('fraction < 1')['n_estimators'].notna().all()
+    assert isinstance(evaluator.probability_models['XGBoost'], XGBClassifier)
+
+def test_tune_rejects_arguments_of_other_method(regression_data):
+    """Test halving-only arguments raise a clear error with method='hyperband'."""
+    X, y, _ = regression_data
+    with pytest.raises(ValueError, match='n_candidates'):
+        ModelEvaluator().tune('severity', X, y, model_names=['XGBoost'], n_candidates=5, n_jobs=1)